@@ -1,43 +1,32 @@
 #!/usr/bin/env python3
-"""Convert Kairos Wallet logo from PDF to PNG at multiple sizes."""
+"""
+Convert Kairos Wallet logo from PDF to PNG at multiple sizes.
+Portable: rasterizes with pdfium (`pip install pypdfium2`), so it runs on
+Linux CI as well as macOS. Each page is rasterized once at the resolution
+the largest output needs, cached by PDF hash, and every size is derived
+from a resize pyramid. Multi-page brand kits render pages in parallel.
+
+Usage: python3 convert-logo.py [brand.pdf] [--pages 1,2] [--out DIR]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
 import os
-import Quartz
-
-pdf_path = os.path.expanduser("~/Downloads/Kairos 2.pdf")
-output_dir = os.path.dirname(os.path.abspath(__file__))
-
-# Open PDF
-pdf_url = Quartz.CFURLCreateFromFileSystemRepresentation(
-    None, pdf_path.encode(), len(pdf_path.encode()), False
-)
-pdf_doc = Quartz.CGPDFDocumentCreateWithURL(pdf_url)
-page = Quartz.CGPDFDocumentGetPage(pdf_doc, 1)
-rect = Quartz.CGPDFPageGetBoxRect(page, Quartz.kCGPDFMediaBox)
-print(f"PDF page size: {rect.size.width} x {rect.size.height}")
-
-# Render at high resolution
-scale = 4
-width = int(rect.size.width * scale)
-height = int(rect.size.height * scale)
-
-cs = Quartz.CGColorSpaceCreateDeviceRGB()
-ctx = Quartz.CGBitmapContextCreate(
-    None, width, height, 8, width * 4, cs, Quartz.kCGImageAlphaPremultipliedLast
-)
-
-# Transparent background
-Quartz.CGContextSetRGBFillColor(ctx, 0, 0, 0, 0)
-Quartz.CGContextFillRect(ctx, Quartz.CGRectMake(0, 0, width, height))
-
-# Scale and draw PDF
-Quartz.CGContextScaleCTM(ctx, scale, scale)
-Quartz.CGContextDrawPDFPage(ctx, page)
-
-# Get rendered image
-image = Quartz.CGBitmapContextCreateImage(ctx)
-
-# Save at multiple sizes
-sizes = [
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import build_metrics
+from output_store import CACHE_ROOT, OutputStore
+from resize_pyramid import ResizePyramid
+
+DEFAULT_PDF = os.path.expanduser("~/Downloads/Kairos 2.pdf")
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+RASTER_CACHE = os.path.join(CACHE_ROOT, "pdf-raster")
+
+# Full-resolution output scale (points → pixels), as the Quartz version used
+FULL_SCALE = 4
+
+SIZES = [
     (512, "logo-512.png"),
     (192, "logo-192.png"),
     (180, "logo-180.png"),
@@ -45,36 +34,105 @@ sizes = [
     (16, "favicon-16.png"),
 ]
 
-for size, name in sizes:
-    out_path = os.path.join(output_dir, name)
-    url = Quartz.CFURLCreateFromFileSystemRepresentation(
-        None, out_path.encode(), len(out_path.encode()), False
-    )
-    dest = Quartz.CGImageDestinationCreateWithURL(url, "public.png", 1, None)
-
-    # Resize
-    resize_ctx = Quartz.CGBitmapContextCreate(
-        None, size, size, 8, size * 4, cs, Quartz.kCGImageAlphaPremultipliedLast
-    )
-    Quartz.CGContextSetInterpolationQuality(
-        resize_ctx, Quartz.kCGInterpolationHigh
-    )
-    Quartz.CGContextDrawImage(
-        resize_ctx, Quartz.CGRectMake(0, 0, size, size), image
-    )
-    resized = Quartz.CGBitmapContextCreateImage(resize_ctx)
-
-    Quartz.CGImageDestinationAddImage(dest, resized, None)
-    Quartz.CGImageDestinationFinalize(dest)
-    print(f"Created {name} ({size}x{size})")
-
-# Full resolution
-out_path = os.path.join(output_dir, "logo-full.png")
-url = Quartz.CFURLCreateFromFileSystemRepresentation(
-    None, out_path.encode(), len(out_path.encode()), False
-)
-dest = Quartz.CGImageDestinationCreateWithURL(url, "public.png", 1, None)
-Quartz.CGImageDestinationAddImage(dest, image, None)
-Quartz.CGImageDestinationFinalize(dest)
-print(f"Created logo-full.png ({width}x{height})")
-print("Done!")
+
+def pdf_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def raster_scale(page_w, page_h):
+    """Smallest scale that covers logo-full and the largest square output."""
+    largest = max(size for size, _ in SIZES)
+    return max(FULL_SCALE, largest / min(page_w, page_h))
+
+
+def page_asset(page_no):
+    """Build metrics name of a page's output set."""
+    return f"kairos-wallet/logo-p{page_no}"
+
+
+def rasterize_page(pdf_path, digest, index):
+    """
+    Render one page (cached by PDF hash); returns (cached PNG path, scale,
+    the page's build metrics Asset).
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        with build_metrics.asset(page_asset(index + 1)) as item:
+            page = pdf[index]
+            w, h = page.get_size()
+            scale = raster_scale(w, h)
+            cached = os.path.join(RASTER_CACHE, f"{digest[:32]}-p{index + 1}-x{scale:g}.png")
+            if os.path.exists(cached):
+                build_metrics.cache_hit()
+            else:
+                # Transparent background, like the premultiplied Quartz context
+                bitmap = page.render(scale=scale, fill_color=(0, 0, 0, 0), may_draw_forms=True)
+                img = bitmap.to_pil().convert("RGBA")
+                os.makedirs(RASTER_CACHE, exist_ok=True)
+                tmp = f"{cached}.{os.getpid()}.tmp"
+                img.save(tmp, "PNG")
+                os.replace(tmp, cached)
+        print(f"PDF page {index + 1} size: {w} x {h} (raster x{scale:g})")
+        return cached, scale, item
+    finally:
+        pdf.close()
+
+
+def page_count(pdf_path):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def export_page(raster_path, scale, page_no, store, output_dir):
+    pyramid = ResizePyramid(raster_path)
+    # Page 1 keeps the historical file names; later pages get a -pN suffix
+    suffix = "" if page_no == 1 else f"-p{page_no}"
+
+    for size, name in SIZES:
+        stem, ext = os.path.splitext(name)
+        store.save_image(pyramid.get(size), os.path.join(output_dir, f"{stem}{suffix}{ext}"))
+        print(f"Created {stem}{suffix}{ext} ({size}x{size})")
+
+    # Full resolution (FULL_SCALE x the page size)
+    w, h = pyramid.size
+    full = pyramid.get((round(w * FULL_SCALE / scale), round(h * FULL_SCALE / scale)))
+    store.save_image(full, os.path.join(output_dir, f"logo-full{suffix}.png"))
+    print(f"Created logo-full{suffix}.png ({full.width}x{full.height})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rasterize a brand PDF into logo PNGs.")
+    parser.add_argument("pdf", nargs="?", default=DEFAULT_PDF)
+    parser.add_argument("--pages", help="comma-separated 1-based pages (default: all)")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="output directory")
+    args = parser.parse_args(argv)
+
+    digest = pdf_digest(args.pdf)
+    pages = [int(p) for p in args.pages.split(",")] if args.pages else list(range(1, page_count(args.pdf) + 1))
+
+    with ProcessPoolExecutor(min(len(pages), os.cpu_count() or 1)) as pool:
+        rasters = list(pool.map(rasterize_page, [args.pdf] * len(pages), [digest] * len(pages),
+                                [p - 1 for p in pages]))
+
+    store = OutputStore()
+    for page_no, (raster, scale, item) in zip(pages, rasters):
+        build_metrics.add(item)
+        # Merged with the rasterization measured in the worker
+        with build_metrics.asset(page_asset(page_no)):
+            export_page(raster, scale, page_no, store, args.out)
+    print(f"Done! {store.summary()}")
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("convert-logo", main))
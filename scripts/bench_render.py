@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Render benchmarks for the generated marketing assets.
+Each benchmark has variants (e.g. the copying Pillow path and the
+zero-copy Canvas path) run on identical input; every variant reports its
+best wall time plus the pixel buffers it allocated and the bytes it
+pasted/copied, counted by canvas.track().
+
+Usage: python3 scripts/bench_render.py [bench ...] [--repeat N] [--json] [--list]
+"""
+
+from PIL import Image
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from canvas import track
+from golden_check import load_script
+
+BENCHES = {}
+
+
+def bench(name):
+    """Register a function returning {variant: zero-argument callable}."""
+    def register(fn):
+        BENCHES[name] = fn
+        return fn
+    return register
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmarks
+# ═══════════════════════════════════════════════════════════════
+def _banner_variants(name):
+    banners = load_script("generate_promo_banners.py")
+    dlist = getattr(banners, f"record_{name}_banner")()
+    out = os.path.join(tempfile.mkdtemp(prefix="bench-"), f"{name}.png")
+
+    def pillow():
+        # The pre-Canvas path: layers composited into new images, RGB via convert
+        img = Image.new(dlist.mode, dlist.size, dlist.color)
+        dlist.replay(img)
+        img.convert("RGB").save(out)
+
+    def canvas():
+        dlist.render_canvas().save_png(out)
+
+    return {"pillow": pillow, "canvas": canvas}
+
+
+@bench("banner-main")
+def _main():
+    return _banner_variants("main")
+
+
+@bench("banner-telegram")
+def _telegram():
+    return _banner_variants("telegram")
+
+
+@bench("banner-trading")
+def _trading():
+    return _banner_variants("trading")
+
+
+@bench("logo-prep")
+def _logo():
+    banners = load_script("generate_promo_banners.py")
+    from icon_masks import apply_mask
+
+    def pillow():
+        logo = Image.open(banners.LOGO_PATH).convert("RGBA").resize((64, 64), Image.LANCZOS)
+        apply_mask(logo, "circle")
+
+    def canvas():
+        banners.load_logo.cache_clear()
+        banners.load_logo(64)
+
+    return {"pillow": pillow, "canvas": canvas}
+
+
+@bench("price-card")
+def _price_card():
+    banners = load_script("generate_promo_banners.py")
+    import price_cards
+    buf = price_cards.PairBuffer("BTC/USDT")
+    for tick in price_cards.random_walk(["BTC/USDT"], 10, 2400, start=0, seed=1):
+        buf.add(tick.ts, tick.price)
+    quote = price_cards.quote_for(buf)
+    out = os.path.join(tempfile.mkdtemp(prefix="bench-"), "card.png")
+
+    def full():
+        banners.record_trading_banner(**quote).render_canvas().save_png(out)
+
+    def cached():
+        price_cards.render_card(quote, out)
+
+    return {"full": full, "cached": cached}
+
+
+@bench("pair-cards-33")
+def _pair_cards():
+    banners = load_script("generate_promo_banners.py")
+    import price_cards
+    entries = price_cards.load_pairs()
+    out = tempfile.mkdtemp(prefix="bench-")
+
+    def single():
+        # One card the direct way, as the yardstick for the batch
+        banners.record_trading_banner(**price_cards.pair_quote(entries[0])).render_canvas().save_png(
+            os.path.join(out, "single.png"))
+
+    def batch():
+        price_cards.render_batch(entries, out)
+
+    return {"single": single, "batch": batch}
+
+
+@bench("sprite-atlas")
+def _sprite_atlas():
+    import random
+    import sprite_atlas
+    from output_store import OutputStore
+    rng = random.Random(7)
+    sizes = [(s, s) for s in rng.choices([16, 24, 32, 48, 64], k=240)]
+    sizes += [(rng.randint(12, 96), rng.randint(12, 96)) for _ in range(60)]
+    manifest = sprite_atlas.load_manifest()
+    out = tempfile.mkdtemp(prefix="bench-")
+
+    def pack():
+        sprite_atlas.pack(sizes, padding=2, max_size=1024)
+
+    def rebuild():
+        # Warm tile and sheet caches: what an unchanged run costs
+        cache = sprite_atlas.load_cache()
+        index = sprite_atlas.SourceIndex(cache.setdefault("sources", {}))
+        for name, spec in manifest["atlases"].items():
+            sprite_atlas.build_atlas(name, dict(spec, out=out), OutputStore(), index, cache)
+
+    return {"pack-300": pack, "rebuild": rebuild}
+
+
+@bench("text-layout-1000")
+def _text_layout():
+    import random
+    import text_layout
+    banners = load_script("generate_promo_banners.py")
+    rng = random.Random(3)
+    words = ("Algorithmic trading bots 150× leverage 33+ pairs USD stablecoin multi-chain "
+             "wallet gasless approvals 0.08% fee verified on BscScan WalletConnect").split()
+    texts = [" ".join(rng.choices(words, k=rng.randint(3, 16))) for _ in range(1000)]
+    fonts = [banners.get_font(s) for s in (18, 16, 14, 12)]
+
+    def pillow():
+        # Shrink-to-fit measuring every candidate line with font.getlength
+        for text in texts:
+            for font in fonts:
+                rest, lines = text.split(), []
+                while rest and len(lines) < 2:
+                    line = rest.pop(0)
+                    while rest and font.getlength(f"{line} {rest[0]}") <= 300:
+                        line += " " + rest.pop(0)
+                    lines.append(line)
+                if not rest:
+                    break
+
+    def cached():
+        for text in texts:
+            text_layout.fit_text(text, fonts, 300, max_lines=2)
+
+    return {"pillow": pillow, "cached": cached}
+
+
+@bench("banner-effects")
+def _effects():
+    banners = load_script("generate_promo_banners.py")
+    dlist = banners.record_telegram_banner(shadows=True)
+
+    # Glows and card shadows at each effect quality
+    return {q: (lambda q=q: dlist.render_canvas(quality=q)) for q in ("full", "high", "draft")}
+
+
+@bench("banners-3-locales")
+def _localized():
+    import localize_banners
+    locales = ["es", "pt", "zh"]
+    docs = [localize_banners.load_locale(locale) for locale in locales]
+    out = tempfile.mkdtemp(prefix="bench-")
+
+    def full():
+        # Every banner recorded and rendered from scratch in every locale
+        for doc in docs:
+            for name in localize_banners.BANNERS:
+                localize_banners.record(name, doc).render_canvas().save_png(
+                    localize_banners.banner_path(out, doc["locale"], name))
+
+    def shared():
+        localize_banners.render_locales(locales, out_dir=out)
+
+    return {"full": full, "shared": shared}
+
+
+@bench("server-card")
+def _server_card():
+    import render_server
+    params = {"pair": "SOL/USDT", "price": 189.63, "change": 5.41, "span": "24h"}
+    render_server.render("card", params, "full")  # static layer rendered up front, as in a worker
+
+    def full():
+        render_server.record_card(params).render_canvas().png_bytes()
+
+    def template():
+        render_server.render("card", params, "full")
+
+    return {"full": full, "template": template}
+
+
+# ═══════════════════════════════════════════════════════════════
+# Runner
+# ═══════════════════════════════════════════════════════════════
+def measure(fn, repeat):
+    fn()  # warm caches (fonts, masks) so they count for neither variant
+    with track() as stats:
+        fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return dict(stats.as_dict(), seconds=best)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the asset renderers.")
+    parser.add_argument("benches", nargs="*", help="benchmark names (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per variant (best is kept)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHES))
+        return 0
+    unknown = [b for b in args.benches if b not in BENCHES]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = []
+    for name in args.benches or list(BENCHES):
+        for variant, fn in BENCHES[name]().items():
+            results.append(dict(measure(fn, args.repeat), bench=name, variant=variant))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    mb = 1 / (1 << 20)
+    print(f"  {'benchmark':<18} {'variant':<8} {'ms':>8} {'allocs':>7} {'MB alloc':>9} {'copies':>7} {'MB copied':>10}")
+    for r in results:
+        print(f"  {r['bench']:<18} {r['variant']:<8} {r['seconds'] * 1000:8.1f} {r['allocs']:7d} "
+              f"{r['alloc_bytes'] * mb:9.1f} {r['copies']:7d} {r['copy_bytes'] * mb:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
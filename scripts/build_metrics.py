@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Build metrics history for the asset scripts.
+Every run of an asset script appends a row per asset to a local SQLite
+database (.asset-cache/build-metrics.sqlite): render and encode seconds,
+bytes written per format, the process's peak RSS when the asset was done,
+and cache hits. `report` reads the history back: per-script trends, the
+slowest and largest assets of the latest runs, and every asset whose cost
+regressed beyond a threshold against the rolling median of its earlier
+runs.
+
+Scripts run main() inside a recording and wrap each asset in asset();
+Canvas, DisplayList and OutputStore report encode time and output bytes
+to the innermost open asset themselves, and do nothing outside one.
+Worker processes measure with asset() too and return the Asset for the
+parent to add():
+
+    with build_metrics.asset("favicon.ico"):
+        ...
+
+    if __name__ == "__main__":
+        sys.exit(build_metrics.run_script("make-favicons", main))
+
+Set ASSET_METRICS_DB to use another database, or to "off" to record nothing.
+
+Usage: python3 scripts/build_metrics.py report [--script NAME] [--window N]
+                                               [--threshold X] [--top N]
+"""
+
+from contextlib import contextmanager
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.environ.get("ASSET_METRICS_DB") or os.path.join(ROOT, ".asset-cache", "build-metrics.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    script TEXT NOT NULL,
+    started REAL NOT NULL,
+    seconds REAL NOT NULL,
+    peak_rss INTEGER,
+    children_rss INTEGER,
+    argv TEXT,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assets (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    asset TEXT NOT NULL,
+    render_s REAL,
+    encode_s REAL,
+    bytes INTEGER NOT NULL,
+    peak_rss INTEGER,
+    cache_hits INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    asset TEXT NOT NULL,
+    format TEXT NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_script ON runs(script, started);
+CREATE INDEX IF NOT EXISTS assets_run ON assets(run_id);
+"""
+
+
+def enabled():
+    return DB_PATH.lower() != "off"
+
+
+def peak_rss(children=False):
+    """High-water resident set size in bytes (None where getrusage is missing)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)  # kB elsewhere
+
+
+def output_format(path):
+    return os.path.splitext(path)[1].lstrip(".").lower() or "bin"
+
+
+# ═══════════════════════════════════════════════════════════════
+# Recording
+# ═══════════════════════════════════════════════════════════════
+class Asset:
+    """Metrics of one asset; picklable, so workers can return it."""
+
+    def __init__(self, name):
+        self.name = name
+        self.render_s = 0.0
+        self.encode_s = 0.0
+        self.outputs = {}  # format: bytes
+        self.cache_hits = 0
+        self.peak_rss = None
+
+    @property
+    def bytes(self):
+        return sum(self.outputs.values())
+
+    def merge(self, other):
+        self.render_s += other.render_s
+        self.encode_s += other.encode_s
+        for fmt, n in other.outputs.items():
+            self.outputs[fmt] = self.outputs.get(fmt, 0) + n
+        self.cache_hits += other.cache_hits
+        self.peak_rss = max(filter(None, (self.peak_rss, other.peak_rss)), default=None)
+
+
+class Run:
+    def __init__(self, script, argv):
+        self.script = script
+        self.argv = argv
+        self.started = time.time()
+        self.status = None  # "ok" unless set or the block raises
+        self.assets = {}  # name: Asset
+        self._lock = threading.Lock()
+
+    def add(self, item):
+        """Add an asset; parts measured under the same name are summed."""
+        with self._lock:
+            if item.name in self.assets:
+                self.assets[item.name].merge(item)
+            else:
+                self.assets[item.name] = item
+
+
+_runs = []  # Runs of the enclosing recording() blocks
+_local = threading.local()  # .assets: this thread's enclosing asset() blocks
+
+
+def _open_assets():
+    try:
+        return _local.assets
+    except AttributeError:
+        _local.assets = []
+        return _local.assets
+
+
+@contextmanager
+def recording(script, argv=None, db=None):
+    """Collect the assets built inside the block and store them as one run."""
+    run = Run(script, sys.argv[1:] if argv is None else list(argv))
+    _runs.append(run)
+    t0 = time.perf_counter()
+    try:
+        yield run
+    except BaseException as e:
+        if not (isinstance(e, SystemExit) and not e.code):
+            run.status = "failed"
+        raise
+    finally:
+        _runs.remove(run)
+        if enabled():
+            try:
+                save_run(run, time.perf_counter() - t0, run.status or "ok", db or DB_PATH)
+            except sqlite3.Error as e:
+                print(f"⚠️  build metrics not recorded: {e}", file=sys.stderr)
+
+
+def run_script(script, main, argv=None):
+    """main(argv) inside a recording, for `sys.exit(run_script(...))`."""
+    with recording(script, argv) as run:
+        code = main(argv)
+        if code:
+            run.status = "failed"
+    return code
+
+
+@contextmanager
+def asset(name):
+    """
+    Measure one asset: wall time inside the block less the time spent
+    encoding is its render time. Asset blocks are per thread; the asset is
+    added to the innermost recording, if any.
+    """
+    item = Asset(name)
+    stack = _open_assets()
+    stack.append(item)
+    t0 = time.perf_counter()
+    try:
+        yield item
+    finally:
+        stack.remove(item)
+        item.render_s = max(time.perf_counter() - t0 - item.encode_s, 0.0)
+        item.peak_rss = peak_rss()
+        add(item)
+
+
+def add(item):
+    """Add an Asset measured elsewhere (e.g. returned by a worker process)."""
+    if _runs:
+        _runs[-1].add(item)
+
+
+@contextmanager
+def encoding():
+    """Count the block as encode time of the innermost asset."""
+    stack = _open_assets()
+    if not stack:
+        yield
+        return
+    item = stack[-1]
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        item.encode_s += time.perf_counter() - t0
+
+
+def output(nbytes, fmt):
+    """Count bytes written in a format against the innermost asset."""
+    stack = _open_assets()
+    if stack:
+        outputs = stack[-1].outputs
+        outputs[fmt] = outputs.get(fmt, 0) + nbytes
+
+
+def output_file(path):
+    if _open_assets():
+        output(os.path.getsize(path), output_format(path))
+
+
+def cache_hit(n=1):
+    """Count outputs of the innermost asset served from a cache instead of rendered."""
+    stack = _open_assets()
+    if stack:
+        stack[-1].cache_hits += n
+
+
+# ═══════════════════════════════════════════════════════════════
+# Storage
+# ═══════════════════════════════════════════════════════════════
+def connect(path=DB_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=30)
+    db.executescript(SCHEMA)
+    return db
+
+
+def save_run(run, seconds, status, path=DB_PATH):
+    db = connect(path)
+    try:
+        with db:
+            run_id = db.execute(
+                "INSERT INTO runs (script, started, seconds, peak_rss, children_rss, argv, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run.script, run.started, seconds, peak_rss(), peak_rss(children=True),
+                 json.dumps(run.argv), status)).lastrowid
+            db.executemany(
+                "INSERT INTO assets (run_id, asset, render_s, encode_s, bytes, peak_rss, cache_hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, a.name, a.render_s, a.encode_s, a.bytes, a.peak_rss, a.cache_hits)
+                 for a in run.assets.values()])
+            db.executemany(
+                "INSERT INTO outputs (run_id, asset, format, bytes) VALUES (?, ?, ?, ?)",
+                [(run_id, a.name, fmt, n) for a in run.assets.values() for fmt, n in sorted(a.outputs.items())])
+    finally:
+        db.close()
+    return run_id
+
+
+# ═══════════════════════════════════════════════════════════════
+# Report
+# ═══════════════════════════════════════════════════════════════
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values):
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1
+    return "".join(SPARKS[round((v - lo) / span * (len(SPARKS) - 1))] for v in values)
+
+
+def _size(n):
+    if n is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def _ms(s):
+    return f"{s * 1000:.1f} ms"
+
+
+def load_history(db, script=None, window=10):
+    """
+    {script: [run rows, oldest first]} holding the latest window + 1 runs
+    that finished, each with its assets as {name: row}.
+    """
+    db.row_factory = sqlite3.Row
+    scripts = [script] if script else [r[0] for r in db.execute("SELECT DISTINCT script FROM runs ORDER BY script")]
+    history = {}
+    for name in scripts:
+        runs = [dict(r) for r in db.execute(
+            "SELECT * FROM runs WHERE script = ? AND status = 'ok' ORDER BY started DESC LIMIT ?",
+            (name, window + 1))][::-1]
+        for run in runs:
+            run["assets"] = {a["asset"]: dict(a, outputs={}) for a in db.execute(
+                "SELECT * FROM assets WHERE run_id = ?", (run["id"],))}
+            for o in db.execute("SELECT asset, format, bytes FROM outputs WHERE run_id = ?", (run["id"],)):
+                if o["asset"] in run["assets"]:
+                    run["assets"][o["asset"]]["outputs"][o["format"]] = o["bytes"]
+        if runs:
+            history[name] = runs
+    return history
+
+
+def regressions(history, threshold, min_seconds=0.005):
+    """
+    [(script, asset, metric, latest, median)] for every asset of a
+    script's latest run whose time, bytes or peak RSS exceeds threshold ×
+    the median of the same asset over the earlier runs. Times are only
+    compared with runs that had as many cache hits (a render is not a
+    regression of a cache hit), and times under min_seconds are noise.
+    """
+    found = []
+    metrics = {
+        "time": lambda a: (a["render_s"] or 0) + (a["encode_s"] or 0),
+        "bytes": lambda a: a["bytes"],
+        "peak RSS": lambda a: a["peak_rss"],
+    }
+    for script, runs in history.items():
+        latest, earlier = runs[-1], runs[:-1]
+        for name, row in latest["assets"].items():
+            past = [run["assets"][name] for run in earlier if name in run["assets"]]
+            for metric, value in metrics.items():
+                now = value(row)
+                same = [a for a in past if metric != "time" or a["cache_hits"] == row["cache_hits"]]
+                before = [v for v in map(value, same) if v is not None]
+                if now is None or not before:
+                    continue
+                median = statistics.median(before)
+                if metric == "time" and now < min_seconds:
+                    continue
+                if median > 0 and now > median * threshold:
+                    found.append((script, name, metric, now, median))
+    return found
+
+
+def report(db, script=None, window=10, threshold=1.25, top=10):
+    history = load_history(db, script, window)
+    if not history:
+        print("No build metrics recorded yet.")
+        return []
+
+    print(f"📈 Trends (last {window + 1} runs)")
+    print(f"  {'script':<24} {'runs':>4} {'seconds':>9} {'median':>9} {'bytes':>10} {'peak RSS':>10}  time")
+    for name, runs in history.items():
+        seconds = [r["seconds"] for r in runs]
+        total = sum(a["bytes"] for a in runs[-1]["assets"].values())
+        print(f"  {name:<24} {len(runs):>4} {seconds[-1]:9.2f} {statistics.median(seconds):9.2f} "
+              f"{_size(total):>10} {_size(runs[-1]['peak_rss']):>10}  {sparkline(seconds)}")
+
+    latest = [(name, a) for name, runs in history.items() for a in runs[-1]["assets"].values()]
+
+    print(f"\n🐢 Slowest assets (latest runs)")
+    for name, a in sorted(latest, key=lambda x: -((x[1]["render_s"] or 0) + (x[1]["encode_s"] or 0)))[:top]:
+        hits = f"  {a['cache_hits']} cached" if a["cache_hits"] else ""
+        print(f"  {_ms((a['render_s'] or 0) + (a['encode_s'] or 0)):>10}  render {_ms(a['render_s'] or 0):>10}  "
+              f"encode {_ms(a['encode_s'] or 0):>10}  {name}: {a['asset']}{hits}")
+
+    print(f"\n📦 Largest assets (latest runs)")
+    for name, a in sorted(latest, key=lambda x: -x[1]["bytes"])[:top]:
+        formats = ", ".join(f"{fmt} {_size(n)}" for fmt, n in sorted(a["outputs"].items()))
+        print(f"  {_size(a['bytes']):>10}  {name}: {a['asset']}  ({formats})")
+
+    found = regressions(history, threshold)
+    print(f"\n🔺 Regressions (> {threshold:g}× rolling median)")
+    for name, item, metric, now, median in found:
+        fmt = _ms if metric == "time" else _size
+        print(f"  ⚠️  {name}: {item}  {metric} {fmt(now)} vs median {fmt(median)} ({now / median:.2f}×)")
+    if not found:
+        print("  ✅ none")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build metrics history of the asset scripts.")
+    parser.add_argument("--db", default=DB_PATH, help="metrics database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rep = commands.add_parser("report", help="trends, slowest/largest assets and regressions")
+    rep.add_argument("--script", help="only this script's runs")
+    rep.add_argument("--window", type=int, default=10, help="earlier runs in the rolling median")
+    rep.add_argument("--threshold", type=float, default=1.25,
+                     help="flag assets costing more than this × their rolling median")
+    rep.add_argument("--top", type=int, default=10, help="assets listed as slowest and largest")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No build metrics recorded yet ({os.path.relpath(args.db, ROOT)} is missing).")
+        return 0
+    db = sqlite3.connect(args.db)
+    try:
+        found = report(db, args.script, args.window, args.threshold, args.top)
+    finally:
+        db.close()
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,386 @@
+"""
+Batch PDF form inspector.
+Takes PDF files or directories, resolves only the objects it needs (catalog,
+AcroForm, field tree) instead of walking the document, lists every AcroForm
+field and the XFA packets, and writes JSON/CSV summaries. Files are parsed
+across a process pool and results are cached by file hash, so unchanged
+PDFs are not re-parsed.
+
+With --xfa DIR, XFA packets are also streamed (inflate in chunks → pull
+parser, finished elements dropped as soon as they are flattened) into one
+CSV of template fields, bindings and dataset values per PDF, so memory
+stays bounded however large the packets are.
+
+Usage: python3 scripts/check_pdf.py PATH [PATH ...] [--json out.json] [--csv out.csv] [--xfa DIR]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zlib
+
 from PyPDF2 import PdfReader
 
-reader = PdfReader('/Users/kaizenllc/Downloads/RMSBX.pdf')
-catalog = reader.trailer['/Root'].get_object()
-
-if '/AcroForm' in catalog:
-    acroform = catalog['/AcroForm'].get_object()
-    print('AcroForm found:', list(acroform.keys()))
-    if '/XFA' in acroform:
-        print('XFA form detected (Adobe LiveCycle)')
-        xfa = acroform['/XFA']
-        if isinstance(xfa, list):
-            for i, item in enumerate(xfa):
-                if isinstance(item, str):
-                    print(f'  [{i}] key: {item}')
-                else:
-                    try:
-                        data = item.get_object().get_data()[:500]
-                        print(f'  [{i}] data preview: {data[:300]}')
-                    except Exception as e:
-                        print(f'  [{i}] error: {e}')
+from output_store import CACHE_ROOT, atomic_write, sha256_file
+
+CACHE_DIR = os.path.join(CACHE_ROOT, "pdf-inspect")
+CACHE_VERSION = 2
+
+CSV_COLUMNS = ["file", "field", "type", "value", "flags", "kids"]
+XFA_COLUMNS = ["packet", "path", "name", "type", "binding", "value"]
+
+# Inflate at most this many bytes per step, so decoded data never piles up
+XFA_CHUNK = 1 << 16
+# Template containers that contribute a name to a field's path
+XFA_CONTAINERS = {"subform", "subformSet", "exclGroup", "area", "field", "draw"}
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_text(v) for v in value]
+    return str(value)
+
+
+def _resolve(value):
+    """The direct object behind a possibly indirect value."""
+    return value.get_object() if hasattr(value, "get_object") else value
+
+
+# Field attributes a terminal field takes from its ancestors when unset
+INHERITED = ("/FT", "/Ff", "/V")
+
+
+def iter_fields(fields, parent_name="", inherited=None):
+    """
+    Walk the AcroForm field tree depth-first, resolving each indirect
+    object only when it is reached. Yields one dict per terminal field;
+    names are fully qualified and /FT, /Ff and /V are inherited from
+    ancestors.
+    """
+    inherited = inherited or {}
+    for ref in _resolve(fields) or []:
+        obj = _resolve(ref)
+        partial = _resolve(obj.get("/T"))
+        name = f"{parent_name}.{partial}" if parent_name and partial else (partial or parent_name)
+        attrs = {key: _resolve(obj[key]) if key in obj else inherited.get(key) for key in INHERITED}
+        kids = _resolve(obj.get("/Kids")) or []
+        # Kids without /T are widget annotations of this field, not subfields
+        subfields = [k for k in kids if "/T" in _resolve(k)]
+        if subfields:
+            yield from iter_fields(subfields, name, attrs)
+            continue
+        yield {
+            "field": _text(name),
+            "type": _text(attrs["/FT"]),
+            "value": _text(attrs["/V"]),
+            "flags": int(attrs["/Ff"] or 0),
+            "kids": len(kids),
+        }
+
+
+def inspect_pdf(path):
+    """Summarize one PDF's form structure."""
+    result = {"file": path, "acroform": False, "xfa": False, "xfa_packets": [], "fields": []}
+    try:
+        reader = PdfReader(path, strict=False)
+        catalog = reader.trailer["/Root"].get_object()
+        pages = _resolve(catalog.get("/Pages"))
+        result["pages"] = int(_resolve(pages.get("/Count", 0))) if pages else 0
+        if "/AcroForm" not in catalog:
+            result["catalog_keys"] = list(catalog.keys())
+            return result
+        acroform = catalog["/AcroForm"].get_object()
+        result["acroform"] = True
+        result["acroform_keys"] = list(acroform.keys())
+        xfa = _resolve(acroform.get("/XFA"))
+        if xfa is not None:
+            result["xfa"] = True
+            # Packet names only: the streams themselves are never decoded here
+            if isinstance(xfa, list):
+                result["xfa_packets"] = [str(_resolve(item)) for item in xfa[0::2]]
+            else:
+                result["xfa_packets"] = ["<single stream>"]
+        result["fields"] = list(iter_fields(acroform.get("/Fields")))
+    except Exception as e:  # a broken PDF must not stop the batch
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def inspect_cached(path):
+    """inspect_pdf, memoized on disk by the file's SHA-256."""
+    digest = sha256_file(path)
+    cache_path = os.path.join(CACHE_DIR, f"{digest}.json")
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("cache_version") == CACHE_VERSION:
+            cached["file"] = path
+            cached["cached"] = True
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    result = inspect_pdf(path)
+    result["sha256"] = digest
+    result["cache_version"] = CACHE_VERSION
+    if "error" not in result:
+        atomic_write(cache_path, json.dumps(result).encode())
+    result["cached"] = False
+    return result
+
+
+# ═══════════════════════════════════════════════════════════════
+# XFA streaming extraction
+# ═══════════════════════════════════════════════════════════════
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_stream_chunks(stream, chunk=XFA_CHUNK):
+    """
+    Decoded bytes of a PDF stream in bounded chunks. Plain FlateDecode is
+    inflated incrementally from the raw stream data; anything else falls
+    back to PyPDF2's decoder and is sliced.
+    """
+    filters = stream.get("/Filter")
+    filters = list(filters) if isinstance(filters, list) else [filters] if filters else []
+    if filters == ["/FlateDecode"] and "/DecodeParms" not in stream:
+        raw = stream._data  # still encoded; get_data() would inflate it all at once
+        inflater = zlib.decompressobj()
+        for pos in range(0, len(raw), chunk):
+            data = inflater.decompress(raw[pos:pos + chunk], chunk)
+            while data:
+                yield data
+                data = inflater.decompress(inflater.unconsumed_tail, chunk)
+        tail = inflater.flush()
+        if tail:
+            yield tail
+        return
+    if not filters:
+        data = stream._data
+    else:
+        data = stream.get_data()
+    for pos in range(0, len(data), chunk):
+        yield data[pos:pos + chunk]
+
+
+class XfaFlattener:
+    """
+    Pull-parser consumer that turns an XDP document into rows.
+    template → one row per <field> (path, ui type, <bind>, default value);
+    datasets → one row per leaf data element (path, value).
+    Every element is detached from its parent once flattened, so only the
+    currently open branch is held in memory.
+    """
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.parser = ET.XMLPullParser(events=("start", "end"))
+        self.stack = []       # open elements
+        self.has_kids = []    # per open element; children are detached as they close
+        self.names = []       # template container names / data element names
+        self.packet = None
+        self.packet_depth = 0
+        self.in_field = 0
+        self.rows = 0
+
+    def feed(self, data):
+        self.parser.feed(data)
+        self._drain()
+
+    def close(self):
+        self.parser.close()
+        self._drain()
+
+    def _drain(self):
+        for event, elem in self.parser.read_events():
+            if event == "start":
+                self._start(elem)
+            else:
+                self._end(elem)
+
+    def _start(self, elem):
+        tag = _local(elem.tag)
+        if self.has_kids:
+            self.has_kids[-1] = True
+        self.stack.append(elem)
+        self.has_kids.append(False)
+        if self.packet is None and tag in ("template", "datasets"):
+            self.packet, self.packet_depth = tag, len(self.stack)
+        elif self.packet == "template" and tag in XFA_CONTAINERS:
+            self.names.append(elem.get("name", ""))
+            self.in_field += tag == "field"
+        elif self.packet == "datasets" and len(self.stack) > self.packet_depth + 1:
+            # Skip the <xfa:data> wrapper itself
+            self.names.append(tag)
+
+    def _end(self, elem):
+        tag = _local(elem.tag)
+        self.stack.pop()
+        had_kids = self.has_kids.pop()
+        depth = len(self.stack) + 1
+        if self.packet == "template":
+            if tag == "field":
+                self._field_row(elem)
+                self.in_field -= 1
+            if tag in XFA_CONTAINERS and depth > self.packet_depth:
+                self.names.pop()
+        elif self.packet == "datasets" and depth > self.packet_depth + 1:
+            if not had_kids and elem.text and elem.text.strip():
+                self._row("datasets", name=tag, value=elem.text.strip())
+            self.names.pop()
+        if depth == self.packet_depth:
+            self.packet = None
+        # Field internals are needed until the field closes; all else goes now
+        if self.stack and not (self.in_field and tag != "field"):
+            self.stack[-1].remove(elem)
+
+    def _row(self, packet, name, type=None, binding=None, value=None):
+        self.emit({"packet": packet, "path": ".".join(n for n in self.names if n), "name": name,
+                   "type": type, "binding": binding, "value": value})
+        self.rows += 1
+
+    def _field_row(self, field):
+        ui_type = binding = value = None
+        for child in field:
+            kind = _local(child.tag)
+            if kind == "ui" and len(child):
+                ui_type = _local(child[0].tag)
+            elif kind == "bind":
+                binding = child.get("ref") or child.get("match")
+            elif kind == "value" and len(child):
+                value = (child[0].text or "").strip() or None
+        self._row("template", name=field.get("name", ""), type=ui_type, binding=binding, value=value)
+
+
+def extract_xfa(path, out_path):
+    """Stream a PDF's XFA packets into a CSV; returns extraction stats."""
+    start = time.perf_counter()
+    stats = {"file": path, "rows": 0, "bytes": 0}
+    reader = PdfReader(path, strict=False)
+    acroform = _resolve(reader.trailer["/Root"].get_object().get("/AcroForm"))
+    xfa = _resolve(acroform.get("/XFA")) if acroform else None
+    if xfa is None:
+        return dict(stats, seconds=time.perf_counter() - start)
+    # An XFA array is [name, stream, ...] whose streams concatenate to one XDP
+    streams = [_resolve(xfa[i + 1]) for i in range(0, len(xfa), 2)] if isinstance(xfa, list) else [xfa]
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=XFA_COLUMNS)
+        writer.writeheader()
+        flattener = XfaFlattener(writer.writerow)
+        for stream in streams:
+            for data in iter_stream_chunks(stream):
+                stats["bytes"] += len(data)
+                flattener.feed(data)
+        flattener.close()
+    stats["rows"] = flattener.rows
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _extract_job(args):
+    path, out_dir = args
+    out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".xfa.csv")
+    try:
+        return extract_xfa(path, out_path)
+    except Exception as e:
+        return {"file": path, "rows": 0, "bytes": 0, "seconds": 0.0, "error": f"{type(e).__name__}: {e}"}
+
+
+def collect(paths):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            for dirpath, _, names in os.walk(p):
+                files += [os.path.join(dirpath, n) for n in names if n.lower().endswith(".pdf")]
         else:
-            print('XFA is not a list, type:', type(xfa))
-    if '/Fields' in acroform:
-        fields = acroform['/Fields']
-        print(f'Fields: {len(fields)}')
-        for f in fields[:10]:
-            obj = f.get_object()
-            print(f'  Field: T={obj.get("/T")}, FT={obj.get("/FT")}')
-else:
-    print('No AcroForm found')
-    print('Catalog keys:', list(catalog.keys()))
+            files.append(p)
+    return sorted(set(files))
+
+
+def write_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for r in results:
+            for field in r["fields"]:
+                row = dict(field, file=r["file"])
+                row["value"] = json.dumps(row["value"]) if isinstance(row["value"], list) else row["value"]
+                writer.writerow(row)
+
+
+def print_summary(r):
+    status = "cached" if r.get("cached") else "parsed"
+    print(f"{r['file']} ({status})")
+    if "error" in r:
+        print(f"  error: {r['error']}")
+        return
+    if not r["acroform"]:
+        print("  No AcroForm found")
+        print("  Catalog keys:", r.get("catalog_keys"))
+        return
+    print("  AcroForm found:", r["acroform_keys"])
+    if r["xfa"]:
+        print("  XFA form detected (Adobe LiveCycle), packets:", ", ".join(r["xfa_packets"]))
+    print(f"  Fields: {len(r['fields'])}")
+    for field in r["fields"]:
+        print(f"    Field: T={field['field']}, FT={field['type']}, V={field['value']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect AcroForm/XFA structure of PDF forms.")
+    parser.add_argument("paths", nargs="+", help="PDF files or directories")
+    parser.add_argument("--json", help="write all results to this JSON file")
+    parser.add_argument("--csv", help="write one row per field to this CSV file")
+    parser.add_argument("--xfa", metavar="DIR", help="stream XFA packets into DIR/<name>.xfa.csv")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--quiet", action="store_true", help="no per-file report")
+    args = parser.parse_args(argv)
+
+    files = collect(args.paths)
+    with ProcessPoolExecutor(args.jobs) as pool:
+        results = list(pool.map(inspect_cached, files, chunksize=4))
+
+        xfa_files = [r["file"] for r in results if r["xfa"]] if args.xfa else []
+        t0 = time.perf_counter()
+        extracted = list(pool.map(_extract_job, [(p, args.xfa) for p in xfa_files]))
+        xfa_seconds = time.perf_counter() - t0
+
+    if not args.quiet:
+        for r in results:
+            print_summary(r)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    if args.xfa:
+        for x in extracted:
+            if "error" in x:
+                print(f"  XFA {x['file']}: error: {x['error']}")
+            elif not args.quiet:
+                print(f"  XFA {x['file']}: {x['rows']} rows, {x['bytes'] / 1e6:.1f} MB "
+                      f"in {x['seconds']:.2f}s")
+        total = sum(x["bytes"] for x in extracted)
+        rate = total / 1e6 / xfa_seconds if xfa_seconds > 0 else 0.0
+        print(f"\nXFA: {len(extracted)} forms, {sum(x['rows'] for x in extracted)} rows, "
+              f"{total / 1e6:.1f} MB decoded at {rate:.1f} MB/s")
+
+    n_cached = sum(r.get("cached", False) for r in results)
+    n_fields = sum(len(r["fields"]) for r in results)
+    n_errors = sum("error" in r for r in results)
+    print(f"\n{len(results)} PDFs ({n_cached} from cache), {n_fields} fields, {n_errors} errors")
+    return 1 if n_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
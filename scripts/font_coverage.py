@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Glyph coverage and font fallback for localized banner text.
+
+CoverageIndex reads each font file's cmap once with fontTools and keeps
+the covered code points on disk (.asset-cache/font-coverage.json, as
+ranges, keyed by file and stamped with its mtime and size). A FontChain
+is an ordered list of font files; it splits a string into runs, each in
+the first font of the chain whose cmap has the character, so choosing a
+font never renders or measures anything. Whitespace and marks stay in
+the run they follow, so "交易 机器人" is one run rather than three.
+
+ChainFont is a chain at one size, usable wherever the banners take a
+Pillow font: it measures as the sum of its runs, and a DisplayList
+records one text op per run (see layout_runs). Right-to-left text needs
+Pillow built with raqm; runs are then shaped by raqm and laid out right
+to left.
+
+    chain = FontChain(load_fallbacks()["bold"])
+    font = ChainFont(chain, 48)
+    font.getlength("交易机器人 Trading")
+
+Paths may name a face of a collection as "file.ttc#2".
+"""
+
+from PIL import ImageFont, features
+import json
+import os
+import unicodedata
+
+from output_store import CACHE_ROOT, atomic_write
+
+FALLBACKS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "font-fallbacks.json")
+COVERAGE_FILE = os.path.join(CACHE_ROOT, "font-coverage.json")
+
+# Characters that join the run before them instead of choosing a font
+_STICKY = ("Zs", "Mn", "Me", "Cf")
+
+
+def split_path(spec):
+    """("file.ttc", 2) for "file.ttc#2"; face 0 without a suffix."""
+    path, _, index = spec.partition("#")
+    return path, int(index or 0)
+
+
+def load_fallbacks(path=FALLBACKS_FILE):
+    """{"regular": [font paths], "bold": [...]} in fallback order."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def raqm_available():
+    return features.check("raqm")
+
+
+def _ranges(codepoints):
+    """Sorted code points as [[first, last], ...]."""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def read_cmap(path, index=0):
+    from fontTools.ttLib import TTFont
+    return TTFont(path, fontNumber=index, lazy=True).getBestCmap().keys()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Coverage index
+# ═══════════════════════════════════════════════════════════════
+class CoverageIndex:
+    """Covered code points per font face, cached on disk until the file changes."""
+
+    def __init__(self, path=COVERAGE_FILE):
+        self.path = path
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+        self._sets = {}
+        self._dirty = False
+
+    def coverage(self, spec):
+        """frozenset of the code points a face maps, read from its cmap once."""
+        if spec in self._sets:
+            return self._sets[spec]
+        path, index = split_path(spec)
+        st = os.stat(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = self._entries.get(spec)
+        if entry is None or entry["stamp"] != stamp:
+            entry = self._entries[spec] = {"stamp": stamp, "ranges": _ranges(read_cmap(path, index))}
+            self._dirty = True
+        cps = self._sets[spec] = frozenset(cp for lo, hi in entry["ranges"] for cp in range(lo, hi + 1))
+        return cps
+
+    def save(self):
+        if self._dirty:
+            atomic_write(self.path, json.dumps(self._entries, separators=(",", ":")).encode())
+            self._dirty = False
+
+
+# ═══════════════════════════════════════════════════════════════
+# Fallback chains
+# ═══════════════════════════════════════════════════════════════
+class FontChain:
+    """Installed fonts of a fallback list, splitting text into per-font runs."""
+
+    def __init__(self, specs, index=None):
+        own = index is None
+        index = index or CoverageIndex()
+        self.specs = [s for s in specs if os.path.exists(split_path(s)[0])]
+        self.coverage = [index.coverage(s) for s in self.specs]
+        if own:
+            index.save()
+        self.missing = set()  # characters no font in the chain covers
+        self._runs = {}
+
+    def __bool__(self):
+        return bool(self.specs)
+
+    def font_for(self, ch):
+        """Index of the first font covering ch, or None."""
+        cp = ord(ch)
+        for i, cps in enumerate(self.coverage):
+            if cp in cps:
+                return i
+        return None
+
+    def runs(self, text):
+        """((font index, run), ...) covering text in order."""
+        runs = self._runs.get(text)
+        if runs is not None:
+            return runs
+        out = []
+        for ch in text:
+            current = out[-1][0] if out else None
+            if current is not None and (unicodedata.category(ch) in _STICKY
+                                        and ord(ch) in self.coverage[current]):
+                i = current
+            else:
+                i = self.font_for(ch)
+                if i is None:
+                    self.missing.add(ch)
+                    i = 0 if current is None else current  # drawn as the font's .notdef
+            if out and out[-1][0] == i:
+                out[-1][1] += ch
+            else:
+                out.append([i, ch])
+        runs = self._runs[text] = tuple((i, run) for i, run in out)
+        return runs
+
+
+_faces = {}
+
+
+def face(spec, size):
+    """The Pillow font of one chain entry at a size, loaded once."""
+    key = (spec, size)
+    if key not in _faces:
+        path, index = split_path(spec)
+        _faces[key] = ImageFont.truetype(path, size, index=index)
+    return _faces[key]
+
+
+class ChainFont:
+    """A FontChain at one size, measured and drawn run by run."""
+
+    def __init__(self, chain, size, direction=None):
+        if direction == "rtl" and not raqm_available():
+            raise OSError("right-to-left text needs Pillow built with raqm")
+        self.chain = chain
+        self.size = size
+        self.direction = direction
+        self.fonts = [face(spec, size) for spec in chain.specs]
+        self.layout_engine = self.fonts[0].layout_engine
+
+    def _kwargs(self):
+        return {"direction": self.direction} if self.direction else {}
+
+    def runs(self, text):
+        return [(self.fonts[i], run) for i, run in self.chain.runs(text)]
+
+    def getlength(self, text, *args, **kwargs):
+        return sum(font.getlength(run, **self._kwargs()) for font, run in self.runs(text))
+
+    def getmetrics(self):
+        return self.fonts[0].getmetrics()
+
+    def getbbox(self, text, *args, anchor=None, **kwargs):
+        boxes = []
+        for (x, y), run, kw in self.layout_runs((0, 0), text, {"anchor": anchor}):
+            left, top, right, bottom = kw["font"].getbbox(run, anchor=kw["anchor"], **self._kwargs())
+            boxes.append((left + x, top + y, right + x, bottom + y))
+        if not boxes:
+            return 0, 0, 0, 0
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def layout_runs(self, xy, text, kwargs):
+        """
+        [(xy, run, kwargs)] drawing text at xy as draw.text(xy, text,
+        **kwargs) would, one entry per run with kwargs["font"] set to the
+        run's font. A single run keeps xy and the anchor; several are
+        placed side by side on one baseline, right to left for rtl.
+        """
+        runs = self.runs(text)
+        kwargs = dict(kwargs, **self._kwargs())
+        if len(runs) <= 1:
+            font, run = runs[0] if runs else (self.fonts[0], text)
+            return [(tuple(xy), run, dict(kwargs, font=font))]
+
+        anchor = kwargs.get("anchor") or "la"
+        h, v = anchor
+        widths = [font.getlength(run, **self._kwargs()) for font, run in runs]
+        total = sum(widths)
+        x = xy[0] - {"l": 0, "m": total / 2, "r": total}[h]
+        if v in "tb":
+            # Ink anchors: the top or bottom of all runs together
+            boxes = [font.getbbox(run, anchor="ls", **self._kwargs()) for font, run in runs]
+            baseline = xy[1] - (min(b[1] for b in boxes) if v == "t" else max(b[3] for b in boxes))
+        else:
+            # Metric anchors (ascender, middle, baseline, descender) of the first font
+            first = self.fonts[0]
+            baseline = xy[1] + first.getbbox("x", anchor="l" + v)[1] - first.getbbox("x", anchor="ls")[1]
+        if self.direction == "rtl":
+            runs, widths = runs[::-1], widths[::-1]
+        out = []
+        for (font, run), w in zip(runs, widths):
+            out.append(((x, baseline), run, dict(kwargs, font=font, anchor="ls")))
+            x += w
+        return out
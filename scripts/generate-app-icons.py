@@ -1,210 +1,259 @@
 #!/usr/bin/env python3
 """
-Generate app icons and splash screens for Kairos Trade & Wallet native apps.
-Uses existing logo assets as source, resizes for all iOS + Android targets.
+Generate app icons and splash screens for every Kairos app and platform.
+Apps, sources, background colors and targets are listed in app-icons.json:
+iOS AppIcon sets, Android legacy/round/adaptive icons, splash screens,
+PWA icons and browser extension icons. Each source is decoded once into a
+resize pyramid and every target of every app is rendered in one parallel
+pass, together with Contents.json.
+
+An app's "targets" are generated on every run. Its "opt_in" targets (the
+iOS launch image, the adaptive icon background color resource, PWA and
+extension icons) replace files maintained by hand or by other tools, so they are
+only generated when named with --with.
+
+Usage: python3 scripts/generate-app-icons.py [app ...] [--manifest FILE]
+                                             [--with TARGET ...]
 """
 
-from PIL import Image, ImageDraw, ImageFilter
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageColor
+import argparse
 import os
-import shutil
 import json
+import sys
+
+import build_metrics
+from icon_masks import apply_mask
+from output_store import OutputStore
+from resize_pyramid import ResizePyramid, WORKERS
+from svg_raster import SvgSource
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app-icons.json")
 
-# ─── Source images ───────────────────────────────────────────────
-TRADE_SRC = os.path.join(ROOT, "kairos-trade", "public", "icons", "icon-512.png")
-WALLET_SRC = os.path.join(ROOT, "kairos-wallet", "public", "icons", "kairos-token.png")  # 1024x1024
-
-# ─── Android mipmap sizes ───────────────────────────────────────
-ANDROID_SIZES = {
-    "mipmap-mdpi":    48,
-    "mipmap-hdpi":    72,
-    "mipmap-xhdpi":   96,
-    "mipmap-xxhdpi":  144,
-    "mipmap-xxxhdpi": 192,
-}
+# Identical outputs (e.g. the default and port-hdpi splash) are stored once,
+# and unchanged files are left untouched so native build caches stay warm
+STORE = OutputStore()
 
-# Android adaptive icon foreground (needs padding — 108dp with 72dp safe zone)
-ANDROID_FG_SIZES = {
-    "mipmap-mdpi":    108,
-    "mipmap-hdpi":    162,
-    "mipmap-xhdpi":   216,
-    "mipmap-xxhdpi":  324,
-    "mipmap-xxxhdpi": 432,
-}
+XCASSETS_INFO = {"author": "xcode", "version": 1}
 
 
 def make_round(img):
-    """Create a circular version of an image."""
-    size = img.size[0]
-    mask = Image.new("L", (size, size), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, size - 1, size - 1), fill=255)
-    result = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    result.paste(img, mask=mask)
-    return result
+    """Create a circular version of an image (anti-aliased edge)."""
+    return apply_mask(img, "circle")
 
 
-def make_foreground(img, target_size):
+def flatten(icon, size, bg_color):
+    """Paste an icon onto an opaque background (no transparency allowed)."""
+    flat = Image.new("RGB", size, bg_color)
+    if icon.mode == "RGBA":
+        flat.paste(icon, ((size[0] - icon.width) // 2, (size[1] - icon.height) // 2), icon.split()[3])
+    else:
+        flat.paste(icon, ((size[0] - icon.width) // 2, (size[1] - icon.height) // 2))
+    return flat
+
+
+def make_foreground(pyramid, target_size, safe_zone=0.66):
     """
     Create adaptive icon foreground: logo centered in a larger canvas.
     The foreground is 108dp but only 72dp (66.67%) is the safe zone.
     So we place the icon at ~66% of the canvas, centered.
     """
     canvas = Image.new("RGBA", (target_size, target_size), (0, 0, 0, 0))
-    # Icon should occupy ~66% of the canvas
-    icon_size = int(target_size * 0.66)
-    icon = img.resize((icon_size, icon_size), Image.LANCZOS)
+    icon_size = int(target_size * safe_zone)
+    icon = pyramid.get(icon_size)
     offset = (target_size - icon_size) // 2
     canvas.paste(icon, (offset, offset), icon if icon.mode == "RGBA" else None)
     return canvas
 
 
-def generate_ios_icons(src_path, app_dir):
-    """Generate iOS app icon (single 1024x1024 universal icon)."""
-    iconset_dir = os.path.join(app_dir, "ios", "App", "App", "Assets.xcassets", "AppIcon.appiconset")
-    os.makedirs(iconset_dir, exist_ok=True)
-
-    img = Image.open(src_path).convert("RGBA")
-
-    # iOS needs a 1024x1024 icon (no transparency for App Store)
-    icon_1024 = img.resize((1024, 1024), Image.LANCZOS)
-    # Flatten alpha onto white/dark background for App Store
-    bg = Image.new("RGB", (1024, 1024), (13, 13, 13))  # Dark background
-    if icon_1024.mode == "RGBA":
-        bg.paste(icon_1024, mask=icon_1024.split()[3])
-    else:
-        bg.paste(icon_1024)
-    bg.save(os.path.join(iconset_dir, "AppIcon-512@2x.png"), "PNG")
-
-    # Write Contents.json
-    contents = {
-        "images": [
-            {
-                "filename": "AppIcon-512@2x.png",
-                "idiom": "universal",
-                "platform": "ios",
-                "size": "1024x1024"
-            }
-        ],
-        "info": {
-            "author": "xcode",
-            "version": 1
-        }
-    }
-    with open(os.path.join(iconset_dir, "Contents.json"), "w") as f:
-        json.dump(contents, f, indent=2)
-
-    print(f"  ✅ iOS icon generated: {iconset_dir}")
-
-
-def generate_android_icons(src_path, app_dir, bg_color):
-    """Generate all Android mipmap icons."""
-    res_dir = os.path.join(app_dir, "android", "app", "src", "main", "res")
-    img = Image.open(src_path).convert("RGBA")
-
-    for density, size in ANDROID_SIZES.items():
-        mipmap_dir = os.path.join(res_dir, density)
-        os.makedirs(mipmap_dir, exist_ok=True)
-
-        # Regular icon (with background)
-        icon = img.resize((size, size), Image.LANCZOS)
-        flat = Image.new("RGB", (size, size), bg_color)
-        if icon.mode == "RGBA":
-            flat.paste(icon, mask=icon.split()[3])
-        else:
-            flat.paste(icon)
-        flat.save(os.path.join(mipmap_dir, "ic_launcher.png"), "PNG")
-
-        # Round icon
-        round_icon = make_round(flat.convert("RGBA"))
-        # Save as PNG with alpha
-        round_icon.save(os.path.join(mipmap_dir, "ic_launcher_round.png"), "PNG")
-
-        print(f"  ✅ Android {density}: {size}x{size}")
-
-    # Adaptive foreground icons
-    for density, size in ANDROID_FG_SIZES.items():
+def _fmt_points(size):
+    return f"{size:g}"
+
+
+# ═══════════════════════════════════════════════════════════════
+# Target planners
+# Each returns (sizes, tasks): every pyramid size the target needs, and
+# zero-argument callables that render and publish one output each.
+# ═══════════════════════════════════════════════════════════════
+def plan_ios(app, spec, pyramid):
+    iconset_dir = os.path.join(app["path"], spec["dir"])
+    bg = ImageColor.getrgb(spec["background"])
+    images, sizes, tasks = [], [], []
+
+    for entry in spec["icons"]:
+        for scale in entry["scales"]:
+            px = round(entry["size"] * scale)
+            points = _fmt_points(entry["size"])
+            filename = entry.get("filename") or f"AppIcon-{points}@{scale}x.png"
+            images.append({
+                "filename": filename,
+                "idiom": entry["idiom"],
+                "scale": f"{scale}x",
+                "size": f"{points}x{points}",
+            })
+            sizes.append(px)
+            dest = os.path.join(iconset_dir, filename)
+            tasks.append(lambda px=px, dest=dest:
+                         STORE.save_image(flatten(pyramid.get(px), (px, px), bg), dest))
+
+    contents = {"images": images, "info": XCASSETS_INFO}
+    tasks.append(lambda: STORE.publish(json.dumps(contents, indent=2).encode(),
+                                       os.path.join(iconset_dir, "Contents.json")))
+    return sizes, tasks
+
+
+def plan_android(app, spec, pyramid):
+    res_dir = os.path.join(app["path"], spec["dir"])
+    sizes, tasks = [], []
+
+    def render_density(density, size):
         mipmap_dir = os.path.join(res_dir, density)
-        fg = make_foreground(img, size)
-        fg.save(os.path.join(mipmap_dir, "ic_launcher_foreground.png"), "PNG")
-
-    print(f"  ✅ Android adaptive foregrounds generated")
-
-
-def generate_splash(app_dir, bg_color, src_path):
-    """Generate splash screen images for Android drawable directories."""
-    res_dir = os.path.join(app_dir, "android", "app", "src", "main", "res")
-    img = Image.open(src_path).convert("RGBA")
-
-    # Splash screen sizes (landscape and portrait)
-    splash_configs = {
-        "drawable-port-hdpi":    (480, 800),
-        "drawable-port-xhdpi":   (720, 1280),
-        "drawable-port-xxhdpi":  (960, 1600),
-        "drawable-port-xxxhdpi": (1280, 1920),
-        "drawable-land-hdpi":    (800, 480),
-        "drawable-land-xhdpi":   (1280, 720),
-        "drawable-land-xxhdpi":  (1600, 960),
-        "drawable-land-xxxhdpi": (1920, 1280),
-        "drawable-port-mdpi":    (320, 480),
-        "drawable-land-mdpi":    (480, 320),
+        flat = flatten(pyramid.get(size), (size, size), app["bg"])
+        STORE.save_image(flat, os.path.join(mipmap_dir, "ic_launcher.png"))
+        STORE.save_image(make_round(flat), os.path.join(mipmap_dir, "ic_launcher_round.png"))
+        fg = make_foreground(pyramid, round(size * spec["foreground_scale"]), spec["foreground_safe_zone"])
+        STORE.save_image(fg, os.path.join(mipmap_dir, "ic_launcher_foreground.png"))
+
+    for density, size in spec["densities"].items():
+        fg_size = round(size * spec["foreground_scale"])
+        sizes += [size, int(fg_size * spec["foreground_safe_zone"])]
+        tasks.append(lambda d=density, s=size: render_density(d, s))
+    return sizes, tasks
+
+
+def plan_android_background(app, spec, pyramid):
+    """The adaptive icon background color resource, set to the app background."""
+    xml = ('<?xml version="1.0" encoding="utf-8"?>\n<resources>\n'
+           f'    <color name="ic_launcher_background">{app["background"].upper()}</color>\n'
+           '</resources>')
+    dest = os.path.join(app["path"], spec["dir"], "ic_launcher_background.xml")
+    return [], [lambda: STORE.publish(xml.encode(), dest)]
+
+
+def plan_splash(app, spec, pyramid):
+    res_dir = os.path.join(app["path"], spec["dir"])
+    sizes, tasks = [], []
+
+    def render(w, h, logo_size, dests):
+        STORE.save_image(flatten(pyramid.get(logo_size), (w, h), app["bg"]), dests)
+
+    for drawable, screen in spec["screens"].items():
+        w, h = screen[:2]
+        # Logo takes 1/3 of the shortest dimension unless pinned
+        logo_size = screen[2] if len(screen) > 2 else min(w, h) // spec["logo_divisor"]
+        sizes.append(logo_size)
+        dest = os.path.join(res_dir, drawable, "splash.png")
+        tasks.append(lambda w=w, h=h, s=logo_size, dest=dest: render(w, h, s, dest))
+    return sizes, tasks
+
+
+def plan_ios_splash(app, spec, pyramid):
+    """iOS launch image: one render published to all three scales."""
+    ios_dir = os.path.join(app["path"], spec["dir"])
+    n, logo = spec["size"], spec["logo"]
+    names = [f"splash-{n}x{n}-2.png", f"splash-{n}x{n}-1.png", f"splash-{n}x{n}.png"]
+    dests = [os.path.join(ios_dir, f) for f in names]
+    contents = {
+        "images": [{"idiom": "universal", "filename": f, "scale": f"{i + 1}x"} for i, f in enumerate(names)],
+        "info": XCASSETS_INFO,
     }
+    tasks = [
+        lambda: STORE.save_image(flatten(pyramid.get(logo), (n, n), app["bg"]), dests),
+        lambda: STORE.publish(json.dumps(contents, indent=2).encode(), os.path.join(ios_dir, "Contents.json")),
+    ]
+    return [logo], tasks
+
+
+def plan_icon_set(app, spec, pyramid):
+    """Plain transparent PNGs at fixed sizes (PWA and extension icons)."""
+    out_dir = os.path.join(app["path"], spec["dir"])
+    sizes, tasks = [], []
+    for size in spec["sizes"]:
+        dest = os.path.join(out_dir, spec["pattern"].format(size=size))
+        if os.path.abspath(dest) == os.path.abspath(app["source_path"]):
+            continue  # never overwrite the source with a re-encode of itself
+        sizes.append(size)
+        tasks.append(lambda size=size, dest=dest: STORE.save_image(pyramid.get(size), dest))
+    return sizes, tasks
+
+
+PLANNERS = {
+    "ios": plan_ios,
+    "android": plan_android,
+    "android-background": plan_android_background,
+    "splash": plan_splash,
+    "ios-splash": plan_ios_splash,
+    "pwa": plan_icon_set,
+    "extension": plan_icon_set,
+}
 
-    for drawable, (w, h) in splash_configs.items():
-        d = os.path.join(res_dir, drawable)
-        os.makedirs(d, exist_ok=True)
-
-        # Dark background with centered logo
-        canvas = Image.new("RGB", (w, h), bg_color)
-        logo_size = min(w, h) // 3  # Logo takes 1/3 of shortest dimension
-        logo = img.resize((logo_size, logo_size), Image.LANCZOS)
-        x = (w - logo_size) // 2
-        y = (h - logo_size) // 2
-        if logo.mode == "RGBA":
-            canvas.paste(logo, (x, y), logo.split()[3])
-        else:
-            canvas.paste(logo, (x, y))
-        canvas.save(os.path.join(d, "splash.png"), "PNG")
-
-    # Also generate default drawable splash
-    d = os.path.join(res_dir, "drawable")
-    os.makedirs(d, exist_ok=True)
-    canvas = Image.new("RGB", (480, 800), bg_color)
-    logo_size = 160
-    logo = img.resize((logo_size, logo_size), Image.LANCZOS)
-    x = (480 - logo_size) // 2
-    y = (800 - logo_size) // 2
-    if logo.mode == "RGBA":
-        canvas.paste(logo, (x, y), logo.split()[3])
-    else:
-        canvas.paste(logo, (x, y))
-    canvas.save(os.path.join(d, "splash.png"), "PNG")
-
-    print(f"  ✅ Splash screens generated")
-
-
-def main():
-    # ─── Kairos Trade ────────────────────────────────────────────
-    print("\n🔷 Kairos Trade Icons")
-    trade_dir = os.path.join(ROOT, "kairos-trade")
-    trade_bg = (8, 9, 12)  # #08090C
-
-    generate_ios_icons(TRADE_SRC, trade_dir)
-    generate_android_icons(TRADE_SRC, trade_dir, trade_bg)
-    generate_splash(trade_dir, trade_bg, TRADE_SRC)
-
-    # ─── Kairos Wallet ───────────────────────────────────────────
-    print("\n🟣 Kairos Wallet Icons")
-    wallet_dir = os.path.join(ROOT, "kairos-wallet")
-    wallet_bg = (10, 11, 15)  # #0A0B0F
-
-    generate_ios_icons(WALLET_SRC, wallet_dir)
-    generate_android_icons(WALLET_SRC, wallet_dir, wallet_bg)
-    generate_splash(wallet_dir, wallet_bg, WALLET_SRC)
 
+def measured(name, task):
+    """Run a task as part of the asset name (one per app target) in the build metrics."""
+    with build_metrics.asset(name):
+        return task()
+
+
+def load_manifest(path=MANIFEST):
+    with open(path) as f:
+        manifest = json.load(f)
+    for key, app in manifest["apps"].items():
+        app["key"] = key
+        app["path"] = os.path.join(ROOT, app.get("dir", key))
+        app["source_path"] = os.path.join(ROOT, app["source"])
+        app["bg"] = ImageColor.getrgb(app["background"])
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate app icons and splash screens.")
+    parser.add_argument("apps", nargs="*", help="app keys from the manifest (default: all)")
+    parser.add_argument("--manifest", default=MANIFEST, help="icon manifest JSON")
+    parser.add_argument("--with", dest="opt_in", action="append", default=[], metavar="TARGET",
+                        help="also generate this opt-in target for the apps that list it")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    apps = []
+    for key in args.apps or manifest["apps"]:
+        app = manifest["apps"][key]
+        app["targets"] = app["targets"] + [t for t in app.get("opt_in", []) if t in args.opt_in]
+        if app["targets"]:
+            apps.append(app)
+
+    # One decode per app, in parallel (SVG sources are parsed once and
+    # rasterized per size instead)
+    def load_source(app):
+        if app["source_path"].endswith(".svg"):
+            return SvgSource(app["source_path"])
+        return ResizePyramid(app["source_path"])
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        pyramids = list(pool.map(load_source, apps))
+
+    tasks = []
+    for app, pyramid in zip(apps, pyramids):
+        sizes, n = [], 0
+        for target in app["targets"]:
+            target_sizes, target_tasks = PLANNERS[target](app, manifest["targets"][target], pyramid)
+            sizes += target_sizes
+            name = f"{app['key']}/{target}"
+            tasks += [lambda t=t, name=name: measured(name, t) for t in target_tasks]
+            n += len(target_tasks)
+        pyramid.get_many(sizes)
+        print(f"{app.get('emoji', '•')} {app['name']}: {', '.join(app['targets'])} "
+              f"({n} outputs, {len(set(sizes))} unique sizes)")
+
+    # Every output of every app in one pass
+    with ThreadPoolExecutor(WORKERS) as pool:
+        for future in [pool.submit(t) for t in tasks]:
+            future.result()
+
+    print(f"\n  📦 {STORE.summary()}")
     print("\n✅ All icons and splash screens generated!\n")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(build_metrics.run_script("generate-app-icons", main))
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """Generate Chrome Web Store promotional assets for Kairos Wallet Extension."""
 
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 import os
 
+import build_metrics
+from text_layout import ellipsize, fit_lines
+
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'kairos-extension', 'cws-assets')
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -22,8 +26,18 @@ def hex_to_rgb(h):
     h = h.lstrip('#')
     return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
 
+def save_asset(render, filename, **kwargs):
+    """Render one asset into OUT_DIR, measured as a build_metrics asset."""
+    with build_metrics.asset(filename):
+        img = render(**kwargs)
+        path = os.path.join(OUT_DIR, filename)
+        with build_metrics.encoding():
+            img.save(path)
+        build_metrics.output_file(path)
+
+@lru_cache(maxsize=None)
 def get_font(size, bold=False):
-    """Try to load a nice font, fallback to default."""
+    """Try to load a nice font, fallback to default. Loaded once per size/weight."""
     font_paths = [
         '/System/Library/Fonts/Helvetica.ttc',
         '/System/Library/Fonts/SFNSDisplay.ttf',
@@ -124,20 +138,20 @@ def draw_wallet_mockup(draw, x, y, w, h):
         text_color = DARK_RGB if i == 2 else WHITE_RGB
         draw.text((bx + btn_w // 2, btn_y + 17), action, fill=text_color, font=btn_font, anchor='mm')
 
-def create_screenshot_1(width=1280, height=800):
+def render_screenshot_1(width=1280, height=800):
     """Main screenshot: Extension in action."""
     img = Image.new('RGB', (width, height), DARK_RGB)
     draw = ImageDraw.Draw(img)
     draw_gradient_bg(draw, width, height)
     draw_gold_accent(draw, width, height)
     
-    # Left side: Text content
-    title_font = get_font(48, bold=True)
+    # Left side: Text content, kept clear of the mockup
+    text_w = width - 400 - 80 - 40
+    title_font = fit_lines(['Kairos Wallet'], [get_font(s, bold=True) for s in (48, 42, 36)], text_w)
     sub_font = get_font(22)
-    feat_font = get_font(18)
     
     draw.text((80, 150), 'Kairos Wallet', fill=GOLD_RGB, font=title_font)
-    draw.text((80, 220), 'Chrome Extension', fill=WHITE_RGB, font=sub_font)
+    draw.text((80, 220), ellipsize('Chrome Extension', sub_font, text_w), fill=WHITE_RGB, font=sub_font)
     
     features = [
         '✦  Multi-chain: BSC, Ethereum, Polygon, Base, Arbitrum',
@@ -147,9 +161,11 @@ def create_screenshot_1(width=1280, height=800):
         '✦  Beautiful dark + gold premium design',
     ]
     
+    # One size for the whole list: shrink until the longest fits, then cut
+    feat_font = fit_lines(features, [get_font(s) for s in (18, 17, 16, 15)], text_w)
     fy = 290
     for feat in features:
-        draw.text((80, fy), feat, fill=(200, 200, 200), font=feat_font)
+        draw.text((80, fy), ellipsize(feat, feat_font, text_w), fill=(200, 200, 200), font=feat_font)
         fy += 36
     
     # Right side: Wallet mockup
@@ -160,10 +176,13 @@ def create_screenshot_1(width=1280, height=800):
     brand_font = get_font(16, bold=True)
     draw.text((160, height - 80), 'Kairos 777 Inc', fill=GRAY_RGB, font=brand_font, anchor='lm')
     
-    img.save(os.path.join(OUT_DIR, 'screenshot-1-main.png'))
+    return img
+
+def create_screenshot_1(width=1280, height=800):
+    save_asset(render_screenshot_1, 'screenshot-1-main.png', width=width, height=height)
     print(f'  ✓ screenshot-1-main.png ({width}x{height})')
 
-def create_screenshot_2(width=1280, height=800):
+def render_screenshot_2(width=1280, height=800):
     """Multi-chain support screenshot."""
     img = Image.new('RGB', (width, height), DARK_RGB)
     draw = ImageDraw.Draw(img)
@@ -220,10 +239,13 @@ def create_screenshot_2(width=1280, height=800):
     # Wallet mockup on the right side
     draw_wallet_mockup(draw, width // 2 - 160, 560, 320, 200)
     
-    img.save(os.path.join(OUT_DIR, 'screenshot-2-multichain.png'))
+    return img
+
+def create_screenshot_2(width=1280, height=800):
+    save_asset(render_screenshot_2, 'screenshot-2-multichain.png', width=width, height=height)
     print(f'  ✓ screenshot-2-multichain.png ({width}x{height})')
 
-def create_screenshot_3(width=1280, height=800):
+def render_screenshot_3(width=1280, height=800):
     """Security features screenshot."""
     img = Image.new('RGB', (width, height), DARK_RGB)
     draw = ImageDraw.Draw(img)
@@ -273,10 +295,13 @@ def create_screenshot_3(width=1280, height=800):
     # Gold shield at bottom
     draw_kairos_logo(draw, width // 2, height - 100, 35)
     
-    img.save(os.path.join(OUT_DIR, 'screenshot-3-security.png'))
+    return img
+
+def create_screenshot_3(width=1280, height=800):
+    save_asset(render_screenshot_3, 'screenshot-3-security.png', width=width, height=height)
     print(f'  ✓ screenshot-3-security.png ({width}x{height})')
 
-def create_small_promo(width=440, height=280):
+def render_small_promo(width=440, height=280):
     """Small promo tile for CWS."""
     img = Image.new('RGB', (width, height), DARK_RGB)
     draw = ImageDraw.Draw(img)
@@ -303,10 +328,13 @@ def create_small_promo(width=440, height=280):
     # Bottom accent
     draw.rectangle([(0, height - 4), (width, height)], fill=GOLD_RGB)
     
-    img.save(os.path.join(OUT_DIR, 'small-promo-tile.png'))
+    return img
+
+def create_small_promo(width=440, height=280):
+    save_asset(render_small_promo, 'small-promo-tile.png', width=width, height=height)
     print(f'  ✓ small-promo-tile.png ({width}x{height})')
 
-def create_large_promo(width=920, height=680):
+def render_large_promo(width=920, height=680):
     """Large promo tile for CWS."""
     img = Image.new('RGB', (width, height), DARK_RGB)
     draw = ImageDraw.Draw(img)
@@ -345,10 +373,13 @@ def create_large_promo(width=920, height=680):
     # Right side: Wallet mockup
     draw_wallet_mockup(draw, width - 380, 50, 320, 580)
     
-    img.save(os.path.join(OUT_DIR, 'large-promo-tile.png'))
+    return img
+
+def create_large_promo(width=920, height=680):
+    save_asset(render_large_promo, 'large-promo-tile.png', width=width, height=height)
     print(f'  ✓ large-promo-tile.png ({width}x{height})')
 
-def create_marquee_promo(width=1400, height=560):
+def render_marquee_promo(width=1400, height=560):
     """Marquee promo tile for CWS."""
     img = Image.new('RGB', (width, height), DARK_RGB)
     draw = ImageDraw.Draw(img)
@@ -374,17 +405,21 @@ def create_marquee_promo(width=1400, height=560):
     # Right side: mini mockup
     draw_wallet_mockup(draw, width - 380, 40, 300, 480)
     
-    img.save(os.path.join(OUT_DIR, 'marquee-promo-tile.png'))
+    return img
+
+def create_marquee_promo(width=1400, height=560):
+    save_asset(render_marquee_promo, 'marquee-promo-tile.png', width=width, height=height)
     print(f'  ✓ marquee-promo-tile.png ({width}x{height})')
 
 if __name__ == '__main__':
     print('Generating Chrome Web Store assets...\n')
     
-    create_screenshot_1()
-    create_screenshot_2()
-    create_screenshot_3()
-    create_small_promo()
-    create_large_promo()
-    create_marquee_promo()
+    with build_metrics.recording('generate-cws-assets'):
+        create_screenshot_1()
+        create_screenshot_2()
+        create_screenshot_3()
+        create_small_promo()
+        create_large_promo()
+        create_marquee_promo()
     
     print(f'\n✅ All assets saved to: {os.path.abspath(OUT_DIR)}')
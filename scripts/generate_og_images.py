@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Kairos 777 — Per-page Open Graph images for the website.
+Each page's title and description are read from its <head> and drawn
+on a branded 1200x630 card with the banner primitives. The card is
+written next to the page as <page>-og.png, and the page's og:image and
+twitter:image tags are pointed at it; pages without those tags get no
+card. Text is set in the fallback chains of font-fallbacks.json
+(font_coverage.py), never in Pillow's bitmap default: with no TrueType
+font installed the script fails instead of writing unreadable cards.
+
+Cards are keyed by a hash of the extracted text (plus the card layout
+version): unchanged pages are not re-rendered, only re-materialized
+from the output store if the file went missing. Changed pages render in
+parallel across a process pool.
+
+Usage: python3 scripts/generate_og_images.py [page.html ...] [--force] [--jobs N]
+                                             [--no-meta]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+import build_metrics
+import generate_promo_banners as banners
+from display_list import DisplayList
+from generate_promo_banners import (
+    BLUE, BLUE_L, DARK, DARK2, GOLD, GRAY, WHITE,
+    draw_glow, draw_gradient_rect, draw_grid, get_font, load_logo,
+)
+from localize_banners import chain_font, chains
+from output_store import CACHE_ROOT, ROOT, OutputStore, atomic_write
+from text_layout import draw_block, fit_text
+
+WEBSITE = os.path.join(ROOT, "website")
+MANIFEST = os.path.join(CACHE_ROOT, "og-images.json")
+SIZE = (1200, 630)
+SITE_URL = "https://kairos-777.com/"
+TITLE_SIZES = (60, 54, 48, 42)  # largest that fits two lines wins
+
+# Bump when the card design changes so every page re-renders
+LAYOUT_VERSION = 3
+
+
+# ═══════════════════════════════════════════════════════════════
+# Page text
+# ═══════════════════════════════════════════════════════════════
+class HeadParser(HTMLParser):
+    """Collects <title> and <meta> name/property → content from <head>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.meta = {}
+        self._in_title = False
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            a = dict(attrs)
+            key = a.get("property") or a.get("name")
+            if key and "content" in a:
+                self.meta.setdefault(key.lower(), a["content"])
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+
+def page_text(path):
+    """(title, description, url) for a page; og: tags win over the plain ones."""
+    parser = HeadParser()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parser.feed(line)
+            if parser.done:
+                break
+    meta = parser.meta
+    title = meta.get("og:title") or parser.title
+    description = meta.get("og:description") or meta.get("description", "")
+    url = meta.get("og:url") or urljoin(SITE_URL, os.path.basename(path))
+    return " ".join(title.split()), " ".join(description.split()), url
+
+
+def card_key(title, description, url):
+    payload = json.dumps([LAYOUT_VERSION, title, description, url], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def og_path(page):
+    return os.path.splitext(page)[0] + "-og.png"
+
+
+# ═══════════════════════════════════════════════════════════════
+# Card
+# ═══════════════════════════════════════════════════════════════
+def display_url(url):
+    path = re.sub(r"^https?://", "", url).rstrip("/")
+    return re.sub(r"\.html$", "", path)
+
+
+def card_font(size, bold=False):
+    """get_font for the cards: the weight's fallback chain, never the bitmap default."""
+    if not chains()["bold" if bold else "regular"]:
+        raise RuntimeError("no font of font-fallbacks.json is installed; "
+                           "Open Graph cards need a TrueType font (e.g. DejaVu Sans)")
+    return chain_font(size, bold)
+
+
+def record_og_card(title, description, url):
+    banners.use_locale(fonts=card_font)
+    try:
+        return _record_og_card(title, description, url)
+    finally:
+        banners.use_locale()
+
+
+def _record_og_card(title, description, url):
+    W, H = SIZE
+    img = DisplayList((W, H), DARK)
+    draw = img.draw()
+
+    draw_gradient_rect(draw, (0, 0, W, H), DARK, DARK2, 'v')
+    # Translucent strokes go on layers: the base draw writes alpha fills
+    # unblended, and the alpha is dropped when the card is saved as RGB
+    draw_grid(img.layer(), W, H, 70, BLUE)
+    img = draw_glow(img, 200, 120, 380, BLUE, 0.08)
+    img = draw_glow(img, 1050, 560, 320, GOLD, 0.05)
+    draw = img.draw()
+
+    # ── Brand ──
+    try:
+        logo = load_logo(64)
+        img.paste(logo, (72, 64), logo)
+    except:
+        pass
+    draw = img.draw()
+    draw.text((152, 80), "KAIROS 777", fill=WHITE, font=get_font(26, bold=True))
+
+    # ── Title and description ──
+    text_w = W - 144
+    title_block = fit_text(title, [get_font(s, bold=True) for s in TITLE_SIZES], text_w, max_lines=2)
+    y = draw_block(draw, (72, 190), title_block, fill=WHITE)
+
+    # Accent rule
+    y += 14
+    draw_gradient_rect(draw, (72, y, 312, y + 4), BLUE, GOLD, 'h')
+    y += 32
+
+    draw_block(draw, (72, y), fit_text(description, get_font(28), text_w, max_lines=3), fill=GRAY, spacing=40)
+
+    # ── Footer ──
+    draw.text((72, H - 46), display_url(url), fill=BLUE_L, font=get_font(20, bold=True))
+    overlay = img.layer()
+    overlay.line([(0, H - 70), (W, H - 70)], fill=(*BLUE, 20))
+    overlay.text((W - 72, H - 46), '"In God We Trust"', fill=(*GOLD, 140), font=get_font(18), anchor="rt")
+
+    # Border
+    overlay.rounded_rectangle([2, 2, W - 3, H - 3], radius=0, outline=(*BLUE, 25), width=2)
+    return img
+
+
+def render_og_card(title, description, url):
+    return record_og_card(title, description, url).render()
+
+
+def _render_job(page, title, description, url):
+    """Worker: render a page's card into the store; returns its digest and metrics."""
+    with build_metrics.asset(os.path.relpath(og_path(page), ROOT)) as item:
+        data = record_og_card(title, description, url).render_canvas().png_bytes()
+        build_metrics.output(len(data), "png")
+    return OutputStore().put(data), item
+
+
+# ═══════════════════════════════════════════════════════════════
+# Meta tags
+# ═══════════════════════════════════════════════════════════════
+_IMAGE_META = re.compile(
+    r'(<meta\s+(?:property|name)="(?:og:image|twitter:image)"\s+content=")([^"]*)(")')
+
+
+def has_image_meta(page):
+    with open(page, encoding="utf-8") as f:
+        return _IMAGE_META.search(f.read()) is not None
+
+
+def point_meta(page, image_url):
+    """Point og:image / twitter:image at image_url; True if the page changed."""
+    with open(page, encoding="utf-8") as f:
+        html = f.read()
+    updated = _IMAGE_META.sub(lambda m: m.group(1) + image_url + m.group(3), html)
+    if updated == html:
+        return False
+    atomic_write(page, updated.encode("utf-8"))
+    return True
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main
+# ═══════════════════════════════════════════════════════════════
+def load_manifest():
+    try:
+        with open(MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate per-page Open Graph images.")
+    parser.add_argument("pages", nargs="*", help="HTML pages (default: website/*.html)")
+    parser.add_argument("--force", action="store_true", help="re-render every page")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--no-meta", action="store_true", help="leave og:image tags alone")
+    args = parser.parse_args(argv)
+
+    pages = [os.path.abspath(p) for p in args.pages] or sorted(glob.glob(os.path.join(WEBSITE, "*.html")))
+    manifest = load_manifest()
+    store = OutputStore()
+
+    print("🖼  Generating Open Graph images...\n")
+    todo, results = [], {}
+    for page in pages:
+        title, description, url = page_text(page)
+        if not title:
+            print(f"  ⏭  {os.path.relpath(page, ROOT)}: no title")
+            continue
+        if not has_image_meta(page):
+            print(f"  ⏭  {os.path.relpath(page, ROOT)}: no og:image tag")
+            continue
+        rel = os.path.relpath(page, ROOT)
+        key = card_key(title, description, url)
+        entry = manifest.get(rel)
+        if not args.force and entry and entry["key"] == key:
+            results[page] = (entry["digest"], "cached")
+        else:
+            todo.append((page, rel, key, title, description, url))
+
+    if todo:
+        with ProcessPoolExecutor(max(1, min(args.jobs, len(todo)))) as pool:
+            futures = [(page, rel, key, pool.submit(_render_job, page, title, description, url))
+                       for page, rel, key, title, description, url in todo]
+            for page, rel, key, future in futures:
+                digest, item = future.result()
+                build_metrics.add(item)
+                manifest[rel] = {"key": key, "digest": digest}
+                results[page] = (digest, "rendered")
+
+    for page, (digest, how) in results.items():
+        dest = og_path(page)
+        placed = store.materialize(digest, dest)
+        if how == "cached":
+            with build_metrics.asset(os.path.relpath(dest, ROOT)):
+                build_metrics.cache_hit()
+                build_metrics.output_file(dest)
+        note = how if how == "rendered" or placed == "unchanged" else f"{how}, restored"
+        if not args.no_meta:
+            _, _, url = page_text(page)
+            if point_meta(page, urljoin(url, os.path.basename(dest))):
+                note += ", meta updated"
+        print(f"  ✅ {os.path.relpath(dest, ROOT):<36} {note}")
+
+    os.makedirs(os.path.dirname(MANIFEST), exist_ok=True)
+    atomic_write(MANIFEST, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode())
+    print(f"\n{len(todo)} rendered, {len(results) - len(todo)} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("generate_og_images", main))
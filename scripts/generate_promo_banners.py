@@ -2,10 +2,22 @@
 """
 Kairos 777 — Professional Promotional Banner Generator
 Generates high-quality images for X (Twitter) and Telegram posts.
+Each banner is recorded as a display list, so it can also be rendered at
+any scale (billboard, print, 8K) strip by strip into a streaming PNG.
+
+Usage: python3 scripts/generate_promo_banners.py [--scale S] [--strip ROWS]
+                                                [--quality full|high|draft] [--shadows]
 """
 
-from PIL import Image, ImageDraw, ImageFont
-import math, os, random
+from functools import lru_cache
+from PIL import Image, ImageFont
+import argparse, math, os, random
+
+import build_metrics
+from canvas import Canvas
+from display_list import DEFAULT_QUALITY, QUALITY, DisplayList, STRIP_HEIGHT
+from icon_masks import mask_array
+from text_layout import draw_block, ellipsize, fit_line, fit_lines
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUT  = os.path.join(BASE, "assets", "promo")
@@ -26,8 +38,37 @@ WHITE     = (255, 255, 255)
 GRAY      = (156, 163, 175)
 RED       = (239, 68, 68)
 
+# ── Localization (see localize_banners.py) ──
+_strings = {}
+_font_provider = None
+
+
+def tr(text):
+    """text from the current locale's string table; as is when untranslated."""
+    return _strings.get(text, text)
+
+
+def use_locale(strings=None, fonts=None):
+    """
+    Record the following banners from a string table ({english: translated}),
+    with fonts(size, bold) in place of the system fonts; no arguments
+    restores English.
+    """
+    global _strings, _font_provider
+    _strings = strings or {}
+    _font_provider = fonts
+
+
 def get_font(size, bold=False):
-    """Try system fonts, fallback to default."""
+    """The system font, or the current locale's fallback chain."""
+    if _font_provider is not None:
+        return _font_provider(size, bold)
+    return _system_font(size, bold)
+
+
+@lru_cache(maxsize=None)
+def _system_font(size, bold=False):
+    """Try system fonts, fallback to default. Loaded once per size/weight."""
     names = [
         "/System/Library/Fonts/SFPro-Bold.otf" if bold else "/System/Library/Fonts/SFPro-Regular.otf",
         "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
@@ -42,23 +83,19 @@ def get_font(size, bold=False):
                 continue
     return ImageFont.load_default()
 
+@lru_cache(maxsize=1)
+def _logo_source():
+    return Image.open(LOGO_PATH).convert('RGBA')
+
+@lru_cache(maxsize=8)
+def load_logo(size):
+    """Logo resized to size px with an anti-aliased circular crop, prepared once per size."""
+    logo = Canvas.from_image(_logo_source().resize((size, size), Image.LANCZOS))
+    return logo.multiply_alpha(mask_array("circle", (size, size))).image
+
 def draw_gradient_rect(draw, xy, color1, color2, direction='h'):
-    """Draw a gradient-filled rectangle."""
-    x0, y0, x1, y1 = xy
-    if direction == 'h':
-        for x in range(x0, x1):
-            t = (x - x0) / max(1, (x1 - x0))
-            r = int(color1[0] + (color2[0] - color1[0]) * t)
-            g = int(color1[1] + (color2[1] - color1[1]) * t)
-            b = int(color1[2] + (color2[2] - color1[2]) * t)
-            draw.line([(x, y0), (x, y1)], fill=(r, g, b))
-    else:
-        for y in range(y0, y1):
-            t = (y - y0) / max(1, (y1 - y0))
-            r = int(color1[0] + (color2[0] - color1[0]) * t)
-            g = int(color1[1] + (color2[1] - color1[1]) * t)
-            b = int(color1[2] + (color2[2] - color1[2]) * t)
-            draw.line([(x0, y), (x1, y)], fill=(r, g, b))
+    """Draw a gradient-filled rectangle (one color step per pixel row/column)."""
+    draw.gradient(xy, color1, color2, direction)
 
 def draw_grid(draw, w, h, spacing=60, color=(59, 130, 246)):
     """Draw subtle grid pattern."""
@@ -68,16 +105,23 @@ def draw_grid(draw, w, h, spacing=60, color=(59, 130, 246)):
         draw.line([(0, y), (w, y)], fill=(*color, 8), width=1)
 
 def draw_glow(img, cx, cy, radius, color, intensity=0.15):
-    """Draw a radial glow effect."""
-    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    od = ImageDraw.Draw(overlay)
+    """Draw a radial glow effect (an effect layer: reduced resolution below full quality)."""
+    overlay = img.layer(effect=True)
     for r in range(radius, 0, -2):
         alpha = int(255 * intensity * (1 - r / radius) ** 2)
-        od.ellipse(
+        overlay.ellipse(
             [cx - r, cy - r, cx + r, cy + r],
             fill=(*color, alpha)
         )
-    img.paste(Image.alpha_composite(img, overlay))
+    return img
+
+def draw_soft_shadow(img, xy, radius=16, offset=(0, 10), blur=14, color=(0, 0, 0), opacity=0.6):
+    """Gaussian-blurred drop shadow of a rounded box; draw it before the box."""
+    x0, y0, x1, y1 = xy
+    dx, dy = offset
+    shadow = img.layer(effect=True, blur=blur)
+    shadow.rounded_rectangle([x0 + dx, y0 + dy, x1 + dx, y1 + dy], radius=radius,
+                             fill=(*color, round(255 * opacity)))
     return img
 
 def draw_chart_line(draw, x0, y0, w, h, color=BLUE, points=20):
@@ -121,25 +165,40 @@ def draw_chart_line(draw, x0, y0, w, h, color=BLUE, points=20):
     draw.ellipse([lx - 9, ly - 9, lx + 9, ly + 9], outline=(*GREEN, 100), width=2)
     return pts
 
-def draw_candles(draw, x0, y0, w, h, count=24):
-    """Draw realistic candlestick chart."""
+def draw_candles(draw, x0, y0, w, h, count=24, bars=None):
+    """
+    Draw a candlestick chart. bars is a sequence of (open, high, low, close)
+    scaled to fit the area, the last count of them shown; without bars a
+    realistic random series is drawn.
+    """
     cw = w / count * 0.6
     gap = w / count
-    price = 96000
-    for i in range(count):
+    if bars is not None:
+        bars = list(bars)[-count:]
+        lo = min(b[2] for b in bars)
+        hi = max(b[1] for b in bars)
+        pad = (hi - lo) * 0.05 or max(hi * 0.001, 1e-9)
+        base_price, price_range = lo - pad, hi - lo + 2 * pad
+    else:
+        base_price, price_range = 93000, 6000
+        bars = []
+        price = 96000
+        for i in range(count):
+            change = random.uniform(-800, 900)
+            open_p = price
+            close_p = price + change
+            high = max(open_p, close_p) + random.uniform(100, 500)
+            low = min(open_p, close_p) - random.uniform(100, 500)
+            bars.append((open_p, high, low, close_p))
+            price = close_p
+
+    # Normalize to chart area
+    def p2y(p):
+        return y0 + h - ((p - base_price) / price_range * h)
+
+    # A short series is right-aligned, with the latest bar at the edge
+    for i, (open_p, high, low, close_p) in enumerate(bars, count - len(bars)):
         x = x0 + i * gap + gap * 0.2
-        change = random.uniform(-800, 900)
-        open_p = price
-        close_p = price + change
-        high = max(open_p, close_p) + random.uniform(100, 500)
-        low = min(open_p, close_p) - random.uniform(100, 500)
-
-        # Normalize to chart area
-        price_range = 6000
-        base_price = 93000
-        def p2y(p):
-            return y0 + h - ((p - base_price) / price_range * h)
-
         is_green = close_p >= open_p
         color = GREEN if is_green else RED
 
@@ -152,8 +211,6 @@ def draw_candles(draw, x0, y0, w, h, count=24):
             body_bot = body_top + 2
         draw.rectangle([x, body_top, x + cw, body_bot], fill=(*color, 220))
 
-        price = close_p
-
 def draw_node_network(draw, cx, cy, radius, nodes=8, color=BLUE):
     """Draw a decentralized network pattern."""
     points = []
@@ -175,13 +232,42 @@ def draw_node_network(draw, cx, cy, radius, nodes=8, color=BLUE):
         draw.ellipse([px - 2, py - 2, px + 2, py + 2], fill=WHITE)
 
 
+def save_banner(dlist, filename, label, scale=1, strip=None, quality=None):
+    """
+    Native size renders in one pass; scaled or --strip renders stream
+    strip by strip to a PNG named e.g. banner@6.4x.png. quality is the
+    effect-layer quality (display_list.QUALITY).
+    """
+    if scale == 1 and not strip:
+        out_path = os.path.join(OUT, filename)
+        dlist.render_canvas(quality=quality).save_png(out_path)
+    else:
+        stem, ext = os.path.splitext(filename)
+        out_path = os.path.join(OUT, f"{stem}@{scale:g}x{ext}" if scale != 1 else filename)
+        w, h = dlist.save_png(out_path, scale, strip or STRIP_HEIGHT, quality=quality)
+        label = f"{label} ({w}x{h})"
+    print(f"✅ {label}: {out_path}")
+    return out_path
+
+
 # ═══════════════════════════════════════════════════════════════
 # IMAGE 1: Main Ecosystem Banner (Twitter 1200x675)
 # ═══════════════════════════════════════════════════════════════
-def create_main_banner():
+MAIN_STATS = (
+    ("33+", "TRADING PAIRS", BLUE_L),
+    ("150×", "MAX LEVERAGE", WHITE),
+    ("$1.00", "KAIROS PEG", GOLD),
+    ("4", "BLOCKCHAINS", GREEN),
+    ("10", "BROKERS", BLUE_L),
+)
+
+
+def record_main_banner(seed=42, shadows=False, stats=MAIN_STATS):
+    """Twitter banner; stats are the bottom bar's (value, label, color) cells."""
+    random.seed(seed)
     W, H = 1200, 675
-    img = Image.new('RGBA', (W, H), DARK)
-    draw = ImageDraw.Draw(img)
+    img = DisplayList((W, H), DARK)
+    draw = img.draw()
 
     # Background gradient
     draw_gradient_rect(draw, (0, 0, W, H), DARK, DARK2, 'v')
@@ -192,7 +278,7 @@ def create_main_banner():
     # Glows
     img = draw_glow(img, 350, 300, 400, BLUE, 0.08)
     img = draw_glow(img, 900, 200, 300, BLUE_L, 0.05)
-    draw = ImageDraw.Draw(img)
+    draw = img.draw()
 
     # Network nodes background decoration
     draw_node_network(draw, 100, 120, 60, 6, BLUE)
@@ -206,19 +292,19 @@ def create_main_banner():
     draw.rounded_rectangle([60, badge_y, 320, badge_y + 32], radius=16, fill=(*BLUE, 20), outline=(*BLUE, 60))
     f_badge = get_font(13, bold=True)
     draw.ellipse([74, badge_y + 11, 82, badge_y + 19], fill=GREEN)
-    draw.text((90, badge_y + 6), "ECOSYSTEM LIVE", fill=BLUE_L, font=f_badge)
+    draw.text((90, badge_y + 6), tr("ECOSYSTEM LIVE"), fill=BLUE_L, font=f_badge)
 
-    # Title
-    f_title = get_font(52, bold=True)
-    f_title_s = get_font(50, bold=True)
-    draw.text((62, 172), "The Future of", fill=WHITE, font=f_title)
-    draw.text((62, 232), "Decentralized", fill=BLUE_L, font=f_title)
-    draw.text((62, 292), "Trading", fill=BLUE, font=f_title)
+    # Title (shrunk together until every line clears the chart card)
+    text_w = 540
+    title = [(tr("The Future of"), WHITE), (tr("Decentralized"), BLUE_L), (tr("Trading"), BLUE)]
+    f_title = fit_lines([t for t, _ in title], [get_font(s, bold=True) for s in (52, 48, 44, 40)], text_w)
+    for i, (line, color) in enumerate(title):
+        draw.text((62, 172 + i * 60), line, fill=color, font=f_title)
 
     # Subtitle
     f_sub = get_font(17)
-    draw.text((62, 360), "Algorithmic bots  ·  150× Leverage  ·  33+ Pairs", fill=GRAY, font=f_sub)
-    draw.text((62, 385), "USD Stablecoin  ·  Multi-Chain Wallet", fill=GRAY, font=f_sub)
+    draw.text((62, 360), ellipsize(tr("Algorithmic bots  ·  150× Leverage  ·  33+ Pairs"), f_sub, text_w), fill=GRAY, font=f_sub)
+    draw.text((62, 385), ellipsize(tr("USD Stablecoin  ·  Multi-Chain Wallet"), f_sub, text_w), fill=GRAY, font=f_sub)
 
     # URL
     f_url = get_font(15, bold=True)
@@ -229,24 +315,19 @@ def create_main_banner():
     draw.rectangle([0, bar_y, W, bar_y + 1], fill=(*BLUE, 30))
     draw.rectangle([0, bar_y + 1, W, H], fill=(*DARK2, 200))
 
-    stats = [
-        ("33+", "TRADING PAIRS", BLUE_L),
-        ("150×", "MAX LEVERAGE", WHITE),
-        ("$1.00", "KAIROS PEG", GOLD),
-        ("4", "BLOCKCHAINS", GREEN),
-        ("10", "BROKERS", BLUE_L),
-    ]
     stat_w = W / len(stats)
     f_sv = get_font(36, bold=True)
     f_sl = get_font(11, bold=True)
     for i, (val, label, color) in enumerate(stats):
         sx = i * stat_w + stat_w / 2
         draw.text((sx, bar_y + 30), val, fill=color, font=f_sv, anchor="mt")
-        draw.text((sx, bar_y + 75), label, fill=GRAY, font=f_sl, anchor="mt")
+        draw.text((sx, bar_y + 75), tr(label), fill=GRAY, font=f_sl, anchor="mt")
 
     # ── Right side: Chart mockup ──
     cx0, cy0, cw, ch = 620, 120, 520, 340
     # Card background
+    if shadows:
+        draw_soft_shadow(img, [cx0, cy0, cx0 + cw, cy0 + ch], radius=20, blur=18)
     draw.rounded_rectangle([cx0, cy0, cx0 + cw, cy0 + ch], radius=20, fill=(10, 10, 20, 220), outline=(*BLUE, 40))
 
     # Chart header
@@ -269,21 +350,17 @@ def create_main_banner():
     draw.ellipse([cx0 + 28, bot_y + 12, cx0 + 36, bot_y + 20], fill=GREEN)
     draw.text((cx0 + 44, bot_y + 8), "EMA Cross Bot", fill=WHITE, font=f_bot)
     draw.rounded_rectangle([cx0 + cw - 100, bot_y + 8, cx0 + cw - 28, bot_y + 28], radius=6, fill=(*GREEN, 30))
-    draw.text((cx0 + cw - 64, bot_y + 10), "Running", fill=GREEN, font=f_bot_s, anchor="mt")
+    draw.text((cx0 + cw - 64, bot_y + 10), tr("Running"), fill=GREEN, font=f_bot_s, anchor="mt")
 
     bot_stats = [("Trades", "147", WHITE), ("Win Rate", "68.4%", GREEN), ("P&L", "+$12,840", GREEN)]
     for i, (lbl, val, c) in enumerate(bot_stats):
         bx = cx0 + 28 + i * 160
-        draw.text((bx, bot_y + 40), lbl, fill=GRAY, font=get_font(10))
+        draw.text((bx, bot_y + 40), tr(lbl), fill=GRAY, font=get_font(10))
         draw.text((bx, bot_y + 54), val, fill=c, font=get_font(16, bold=True))
 
     # ── Logo ──
     try:
-        logo = Image.open(LOGO_PATH).convert('RGBA').resize((64, 64), Image.LANCZOS)
-        # Create circular mask
-        mask = Image.new('L', (64, 64), 0)
-        ImageDraw.Draw(mask).ellipse([0, 0, 64, 64], fill=255)
-        logo.putalpha(mask)
+        logo = load_logo(64)
         img.paste(logo, (62, 580), logo)
     except:
         pass
@@ -294,7 +371,7 @@ def create_main_banner():
 
     # Motto
     f_motto = get_font(12)
-    draw.text((134, 622), '"In God We Trust"', fill=(*GOLD, 150), font=f_motto)
+    draw.text((134, 622), tr('"In God We Trust"'), fill=(*GOLD, 150), font=f_motto)
 
     # Three product pills  
     pills = [("TRADE", BLUE), ("COIN", GOLD), ("WALLET", GREEN)]
@@ -303,24 +380,31 @@ def create_main_banner():
     for i, (txt, c) in enumerate(pills):
         px = px_start + i * 110
         draw.rounded_rectangle([px, 600, px + 95, 625], radius=8, fill=(*c, 25), outline=(*c, 80))
-        draw.text((px + 47, 610), txt, fill=c, font=f_pill, anchor="mt")
+        draw.text((px + 47, 610), tr(txt), fill=c, font=f_pill, anchor="mt")
 
     # Border
     draw.rounded_rectangle([2, 2, W - 3, H - 3], radius=0, outline=(*BLUE, 25), width=2)
 
-    out_path = os.path.join(OUT, "kairos-ecosystem-banner-twitter.png")
-    img.convert('RGB').save(out_path, quality=95)
-    print(f"✅ Twitter banner: {out_path}")
-    return out_path
+    return img
+
+
+def render_main_banner(seed=42, scale=1, quality=None):
+    return record_main_banner(seed).render(scale, quality)
+
+
+def create_main_banner(scale=1, strip=None, quality=None, shadows=False):
+    return save_banner(record_main_banner(shadows=shadows), "kairos-ecosystem-banner-twitter.png",
+                       "Twitter banner", scale, strip, quality)
 
 
 # ═══════════════════════════════════════════════════════════════
 # IMAGE 2: Telegram Post (1280x720)
 # ═══════════════════════════════════════════════════════════════
-def create_telegram_banner():
+def record_telegram_banner(seed=42, shadows=False):
+    random.seed(seed)
     W, H = 1280, 720
-    img = Image.new('RGBA', (W, H), DARK)
-    draw = ImageDraw.Draw(img)
+    img = DisplayList((W, H), DARK)
+    draw = img.draw()
 
     draw_gradient_rect(draw, (0, 0, W, H), DARK, (8, 8, 20), 'v')
     draw_grid(draw, W, H, 80, BLUE)
@@ -328,7 +412,7 @@ def create_telegram_banner():
     img = draw_glow(img, W // 2, H // 3, 500, BLUE, 0.1)
     img = draw_glow(img, 200, 500, 300, GOLD, 0.04)
     img = draw_glow(img, 1080, 500, 300, GREEN, 0.04)
-    draw = ImageDraw.Draw(img)
+    draw = img.draw()
 
     # Decorative network nodes
     draw_node_network(draw, 120, 100, 70, 7, BLUE)
@@ -336,10 +420,7 @@ def create_telegram_banner():
 
     # ── Logo centered ──
     try:
-        logo = Image.open(LOGO_PATH).convert('RGBA').resize((80, 80), Image.LANCZOS)
-        mask = Image.new('L', (80, 80), 0)
-        ImageDraw.Draw(mask).ellipse([0, 0, 80, 80], fill=255)
-        logo.putalpha(mask)
+        logo = load_logo(80)
         img.paste(logo, (W // 2 - 40, 50), logo)
     except:
         pass
@@ -349,13 +430,15 @@ def create_telegram_banner():
     draw.text((W // 2, 142), "KAIROS 777", fill=WHITE, font=f_brand, anchor="mt")
 
     # Title
-    f_title = get_font(48, bold=True)
-    draw.text((W // 2, 185), "The Complete Decentralized", fill=WHITE, font=f_title, anchor="mt")
-    draw.text((W // 2, 240), "Financial Ecosystem", fill=BLUE_L, font=f_title, anchor="mt")
+    title = [tr("The Complete Decentralized"), tr("Financial Ecosystem")]
+    f_title = fit_lines(title, [get_font(s, bold=True) for s in (48, 44, 40, 36)], W - 160)
+    draw.text((W // 2, 185), title[0], fill=WHITE, font=f_title, anchor="mt")
+    draw.text((W // 2, 240), title[1], fill=BLUE_L, font=f_title, anchor="mt")
 
     # Subtitle
     f_sub = get_font(18)
-    draw.text((W // 2, 300), "Trade  ·  Coin  ·  Wallet — All Under One Roof", fill=GRAY, font=f_sub, anchor="mt")
+    draw.text((W // 2, 300), ellipsize(tr("Trade  ·  Coin  ·  Wallet — All Under One Roof"), f_sub, W - 160),
+              fill=GRAY, font=f_sub, anchor="mt")
 
     # ── Three product cards ──
     card_w, card_h = 350, 280
@@ -403,8 +486,8 @@ def create_telegram_banner():
         },
     ]
 
-    f_card_t = get_font(20, bold=True)
-    f_card_f = get_font(13)
+    f_card_t = [get_font(s, bold=True) for s in (20, 18, 16)]
+    f_card_f = [get_font(s) for s in (13, 12, 11)]
     f_check = get_font(12, bold=True)
 
     for i, card in enumerate(cards):
@@ -412,6 +495,8 @@ def create_telegram_banner():
         c = card["color"]
 
         # Card bg
+        if shadows:
+            draw_soft_shadow(img, [cx, card_y, cx + card_w, card_y + card_h])
         draw.rounded_rectangle(
             [cx, card_y, cx + card_w, card_y + card_h],
             radius=16, fill=(12, 12, 22, 240), outline=(*c, 60)
@@ -423,73 +508,116 @@ def create_telegram_banner():
         )
 
         # Title
-        draw.text((cx + card_w // 2, card_y + 30), card["title"], fill=WHITE, font=f_card_t, anchor="mt")
-
-        # Features
-        for j, feat in enumerate(card["features"]):
+        title_block = fit_line(card["title"], f_card_t, card_w - 48)
+        draw_block(draw, (cx + card_w // 2, card_y + 30), title_block, fill=WHITE, anchor="mt")
+
+        # Features: one size per card, shrunk until the longest fits, then cut
+        feat_w = card_w - 44 - 20
+        features = [tr(feat) for feat in card["features"]]
+        f_feat = fit_lines(features, f_card_f, feat_w)
+        for j, feat in enumerate(features):
             fy = card_y + 65 + j * 32
             draw.text((cx + 24, fy), "✓", fill=GREEN, font=f_check)
-            draw.text((cx + 44, fy), feat, fill=GRAY, font=f_card_f)
+            draw.text((cx + 44, fy), ellipsize(feat, f_feat, feat_w), fill=GRAY, font=f_feat)
 
     # ── Bottom ──
     f_url = get_font(16, bold=True)
     f_motto = get_font(13)
     draw.text((W // 2, H - 55), "kairos-777.com", fill=BLUE_L, font=f_url, anchor="mt")
-    draw.text((W // 2, H - 30), '"In God We Trust"  ·  Kairos 777 Inc.', fill=(*GOLD, 130), font=f_motto, anchor="mt")
+    draw.text((W // 2, H - 30), tr('"In God We Trust"  ·  Kairos 777 Inc.'), fill=(*GOLD, 130), font=f_motto, anchor="mt")
 
     # Border
     draw.rounded_rectangle([2, 2, W - 3, H - 3], radius=0, outline=(*BLUE, 25), width=2)
 
-    out_path = os.path.join(OUT, "kairos-ecosystem-banner-telegram.png")
-    img.convert('RGB').save(out_path, quality=95)
-    print(f"✅ Telegram banner: {out_path}")
-    return out_path
+    return img
+
+
+def render_telegram_banner(seed=42, scale=1, quality=None):
+    return record_telegram_banner(seed).render(scale, quality)
+
+
+def create_telegram_banner(scale=1, strip=None, quality=None, shadows=False):
+    return save_banner(record_telegram_banner(shadows=shadows), "kairos-ecosystem-banner-telegram.png",
+                       "Telegram banner", scale, strip, quality)
 
 
 # ═══════════════════════════════════════════════════════════════
 # IMAGE 3: Trading Focus (Twitter alternate — shows bots/charts)
 # ═══════════════════════════════════════════════════════════════
-def create_trading_banner():
-    W, H = 1200, 675
-    img = Image.new('RGBA', (W, H), DARK)
-    draw = ImageDraw.Draw(img)
+TRADING_SIZE = (1200, 675)
+TRADING_CHART_Y, TRADING_CHART_H = 140, 300
+TRADING_BOTS = (
+    ("EMA Cross Bot", "BTC/USDT", "Running", "+$12,840", "68.4%", GREEN),
+    ("RSI Momentum", "ETH/USDT", "Running", "+$4,290", "72.1%", GREEN),
+    ("MACD Divergence", "SOL/USDT", "Paused", "+$1,850", "61.8%", GOLD),
+)
+
+
+def draw_bot_cards(draw, bots, shadows=False):
+    """The row of up to three bot cards: (name, pair, status, pnl, win rate, color)."""
+    W, _ = TRADING_SIZE
+    bot_y = 470
+    bot_w = (W - 120) / 3
+    f_bn = get_font(15, bold=True)
+    f_bs = get_font(12)
+    f_bv = get_font(18, bold=True)
+    f_bl = get_font(10)
+
+    for i, (name, pair, status, pnl, wr, sc) in enumerate(bots):
+        bx = 40 + i * (bot_w + 20)
+        if shadows:
+            draw_soft_shadow(draw, [bx, bot_y, bx + bot_w, bot_y + 100], radius=14, offset=(0, 6), blur=10)
+        draw.rounded_rectangle([bx, bot_y, bx + bot_w, bot_y + 100], radius=14, fill=(12, 12, 22, 230), outline=(*sc, 40))
+        # Top accent
+        draw.rounded_rectangle([bx, bot_y, bx + bot_w, bot_y + 3], radius=2, fill=sc)
+
+        draw.ellipse([bx + 14, bot_y + 16, bx + 22, bot_y + 24], fill=sc)
+        draw.text((bx + 30, bot_y + 12), name, fill=WHITE, font=f_bn)
+        draw.text((bx + bot_w - 14, bot_y + 14), pair, fill=GRAY, font=f_bs, anchor="rt")
+
+        # Stats
+        stats_data = [("P&L", pnl, sc), ("Win Rate", wr, sc), ("Status", tr(status), sc)]
+        for j, (sl, sv, c) in enumerate(stats_data):
+            sx = bx + 14 + j * (bot_w / 3)
+            draw.text((sx, bot_y + 50), tr(sl), fill=GRAY, font=f_bl)
+            draw.text((sx, bot_y + 64), sv, fill=c, font=get_font(14, bold=True))
+
+
+def record_trading_chrome(seed=42, bots=TRADING_BOTS, shadows=False):
+    """
+    The static part of the trading banner: everything but the quote.
+    Nothing here is drawn over the chart panel's interior or the bot row,
+    so a rendered chrome can be cached and each quote drawn straight on
+    top of a copy. bots=() leaves the bot row to the quote.
+    """
+    random.seed(seed)
+    W, H = TRADING_SIZE
+    img = DisplayList((W, H), DARK)
+    draw = img.draw()
 
     draw_gradient_rect(draw, (0, 0, W, H), DARK, (5, 5, 15), 'v')
     draw_grid(draw, W, H, 60, BLUE)
 
     img = draw_glow(img, 600, 350, 500, BLUE, 0.08)
-    draw = ImageDraw.Draw(img)
+    draw = img.draw()
 
     # ── Full-width chart area ──
-    chart_y = 140
-    chart_h = 300
+    chart_y = TRADING_CHART_Y
+    chart_h = TRADING_CHART_H
+    if shadows:
+        draw_soft_shadow(img, [40, chart_y, W - 40, chart_y + chart_h], radius=20, blur=18)
     draw.rounded_rectangle([40, chart_y, W - 40, chart_y + chart_h], radius=20, fill=(8, 8, 18, 200), outline=(*BLUE, 30))
 
-    # Chart header
-    f_pair = get_font(24, bold=True)
-    f_price = get_font(28, bold=True)
-    f_change = get_font(14, bold=True)
-    draw.text((70, chart_y + 18), "BTC / USDT", fill=WHITE, font=f_pair)
-    draw.text((W - 70, chart_y + 16), "$96,482.30", fill=GREEN, font=f_price, anchor="rt")
-    draw.text((W - 70, chart_y + 50), "▲ +3.24% (24h)", fill=GREEN, font=f_change, anchor="rt")
-
     # Separator
     draw.line([(60, chart_y + 75), (W - 60, chart_y + 75)], fill=(*BLUE, 20), width=1)
 
-    # Candles
-    random.seed(77)
-    draw_candles(draw, 60, chart_y + 85, W - 120, 190, 40)
-
     # ── Top bar ──
     try:
-        logo = Image.open(LOGO_PATH).convert('RGBA').resize((48, 48), Image.LANCZOS)
-        mask = Image.new('L', (48, 48), 0)
-        ImageDraw.Draw(mask).ellipse([0, 0, 48, 48], fill=255)
-        logo.putalpha(mask)
+        logo = load_logo(48)
         img.paste(logo, (40, 30), logo)
     except:
         pass
-    draw = ImageDraw.Draw(img)
+    draw = img.draw()
 
     f_title_top = get_font(22, bold=True)
     draw.text((100, 42), "KAIROS TRADE", fill=WHITE, font=f_title_top)
@@ -497,62 +625,82 @@ def create_trading_banner():
     # Live badge
     draw.rounded_rectangle([260, 42, 340, 64], radius=10, fill=(*GREEN, 25), outline=(*GREEN, 80))
     draw.ellipse([270, 49, 278, 57], fill=GREEN)
-    draw.text((284, 46), "LIVE", fill=GREEN, font=get_font(13, bold=True))
+    draw.text((284, 46), tr("LIVE"), fill=GREEN, font=get_font(13, bold=True))
 
     # ── Bot cards row ──
-    bots = [
-        ("EMA Cross Bot", "BTC/USDT", "Running", "+$12,840", "68.4%", GREEN),
-        ("RSI Momentum", "ETH/USDT", "Running", "+$4,290", "72.1%", GREEN),
-        ("MACD Divergence", "SOL/USDT", "Paused", "+$1,850", "61.8%", GOLD),
-    ]
-    bot_y = 470
-    bot_w = (W - 120) / 3
-    f_bn = get_font(15, bold=True)
-    f_bs = get_font(12)
-    f_bv = get_font(18, bold=True)
-    f_bl = get_font(10)
-
-    for i, (name, pair, status, pnl, wr, sc) in enumerate(bots):
-        bx = 40 + i * (bot_w + 20)
-        draw.rounded_rectangle([bx, bot_y, bx + bot_w, bot_y + 100], radius=14, fill=(12, 12, 22, 230), outline=(*sc, 40))
-        # Top accent
-        draw.rounded_rectangle([bx, bot_y, bx + bot_w, bot_y + 3], radius=2, fill=sc)
-
-        draw.ellipse([bx + 14, bot_y + 16, bx + 22, bot_y + 24], fill=sc)
-        draw.text((bx + 30, bot_y + 12), name, fill=WHITE, font=f_bn)
-        draw.text((bx + bot_w - 14, bot_y + 14), pair, fill=GRAY, font=f_bs, anchor="rt")
-
-        # Stats
-        stats_data = [("P&L", pnl, sc), ("Win Rate", wr, sc), ("Status", status, sc)]
-        for j, (sl, sv, c) in enumerate(stats_data):
-            sx = bx + 14 + j * (bot_w / 3)
-            draw.text((sx, bot_y + 50), sl, fill=GRAY, font=f_bl)
-            draw.text((sx, bot_y + 64), sv, fill=c, font=get_font(14, bold=True))
+    draw_bot_cards(draw, bots, shadows)
 
     # ── Bottom bar ──
     draw.line([(0, H - 60), (W, H - 60)], fill=(*BLUE, 20))
     f_foot = get_font(14, bold=True)
     f_motto = get_font(12)
     draw.text((40, H - 42), "kairos-777.com", fill=BLUE_L, font=f_foot)
-    draw.text((W // 2, H - 42), "Algorithmic Trading  ·  150× Leverage  ·  33+ Pairs  ·  10 Brokers", fill=GRAY, font=f_motto, anchor="lt")
-    draw.text((W - 40, H - 42), '"In God We Trust"', fill=(*GOLD, 120), font=f_motto, anchor="rt")
+    draw.text((W // 2, H - 42), tr("Algorithmic Trading  ·  150× Leverage  ·  33+ Pairs  ·  10 Brokers"), fill=GRAY, font=f_motto, anchor="lt")
+    draw.text((W - 40, H - 42), tr('"In God We Trust"'), fill=(*GOLD, 120), font=f_motto, anchor="rt")
 
     # Border
     draw.rounded_rectangle([2, 2, W - 3, H - 3], radius=0, outline=(*BLUE, 25), width=2)
 
-    out_path = os.path.join(OUT, "kairos-trade-banner.png")
-    img.convert('RGB').save(out_path, quality=95)
-    print(f"✅ Trading banner: {out_path}")
-    return out_path
+    return img
+
+
+def record_trading_quote(pair="BTC / USDT", price="$96,482.30", change="▲ +3.24% (24h)",
+                         color=GREEN, bars=None, count=40, bots=None):
+    """
+    The live part of the trading banner, inside the chart panel: pair,
+    price, change and candles (bars as for draw_candles; a fixed random
+    series when None), plus the bot row when bots are given.
+    """
+    W, _ = TRADING_SIZE
+    chart_y = TRADING_CHART_Y
+    img = DisplayList(TRADING_SIZE, DARK)
+    draw = img.draw()
+
+    # Chart header
+    f_pair = get_font(24, bold=True)
+    f_price = get_font(28, bold=True)
+    f_change = get_font(14, bold=True)
+    draw.text((70, chart_y + 18), pair, fill=WHITE, font=f_pair)
+    draw.text((W - 70, chart_y + 16), price, fill=color, font=f_price, anchor="rt")
+    draw.text((W - 70, chart_y + 50), change, fill=color, font=f_change, anchor="rt")
+
+    # Candles
+    if bars is None:
+        random.seed(77)
+    draw_candles(draw, 60, chart_y + 85, W - 120, 190, count, bars)
+    if bots:
+        draw_bot_cards(draw, bots)
+    return img
+
+
+def record_trading_banner(seed=42, shadows=False, **quote):
+    """Trading banner; quote keywords are passed to record_trading_quote."""
+    return record_trading_chrome(seed, shadows=shadows).extend(record_trading_quote(**quote))
+
+
+def render_trading_banner(seed=42, scale=1, quality=None):
+    return record_trading_banner(seed).render(scale, quality)
+
+
+def create_trading_banner(scale=1, strip=None, quality=None, shadows=False):
+    return save_banner(record_trading_banner(shadows=shadows), "kairos-trade-banner.png",
+                       "Trading banner", scale, strip, quality)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Kairos 777 promotional banners.")
+    parser.add_argument("--scale", type=float, default=1, help="render scale (6.4 = 8K for 1200x675)")
+    parser.add_argument("--strip", type=int, help=f"rows per strip for tiled rendering (default {STRIP_HEIGHT} when scaled)")
+    parser.add_argument("--quality", choices=QUALITY, default=DEFAULT_QUALITY,
+                        help="effect layer quality: glows and shadows at 1, 1/2 or 1/4 resolution")
+    parser.add_argument("--shadows", action="store_true", help="soft shadows under the cards")
+    args = parser.parse_args()
+
     print("🎨 Generating Kairos 777 promotional banners...\n")
-    random.seed(42)
-    create_main_banner()
-    random.seed(42)
-    create_telegram_banner()
-    random.seed(42)
-    create_trading_banner()
+    with build_metrics.recording("generate_promo_banners"):
+        for create in (create_main_banner, create_telegram_banner, create_trading_banner):
+            with build_metrics.asset(create.__name__) as item:
+                # Named after the file written, which carries the scale
+                item.name = os.path.basename(create(args.scale, args.strip, args.quality, args.shadows))
     print(f"\n📁 All images saved to: {OUT}/")
     print("   Use these for X (Twitter) and Telegram posts.")
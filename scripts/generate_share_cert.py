@@ -1,216 +1,584 @@
+"""
+Kairos 777 — Share Certificate Generator
+Single mode (no arguments) renders the founder certificate as before.
+Bulk mode issues one certificate per row of a cap table (CSV or JSON):
+the static page — double gold border, header, dividers, info-box frames,
+table chrome, certification text, signature block — is laid out once per
+process and replayed as a recorded content stream, and each certificate
+only stamps its variable fields on top. Certificates are spread across a
+process pool. With --merged, all certificates go into one N-page PDF in
+which the chrome is a single shared Form XObject and the font
+dictionaries are written once for the whole document.
+
+Replaying and sharing the chrome needs fpdf2 internals (raw page content
+streams and the resource catalog), so fpdf2 is pinned in
+scripts/requirements.txt, every internal access goes through the shim
+below, and the script refuses to start if those internals have changed.
+
+CSV columns: holder, role, shares, date[, certificate_no]
+JSON: a list of such rows, or {"company": {...}, "issuances": [...]}
+
+Usage:
+  python3 scripts/generate_share_cert.py [--out FILE]
+  python3 scripts/generate_share_cert.py --cap-table cap.csv --out-dir certs/ [--jobs N]
+  python3 scripts/generate_share_cert.py --cap-table cap.csv --merged certs.pdf
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zlib
+
+import fpdf
 from fpdf import FPDF
+from fpdf.enums import PDFResourceType
 
-pdf = FPDF(orientation='P', unit='mm', format='Letter')
-pdf.add_page()
-pdf.set_auto_page_break(auto=False)
+import build_metrics
 
 W = 215.9
 H = 279.4
 margin = 15
 
-# ── Gold border (double line effect) ──
-pdf.set_draw_color(212, 175, 55)
-pdf.set_line_width(0.8)
-pdf.rect(margin, margin, W - 2*margin, H - 2*margin)
-pdf.set_line_width(0.3)
-pdf.rect(margin + 3, margin + 3, W - 2*margin - 6, H - 2*margin - 6)
-
-# ── Header ──
-pdf.set_y(25)
-pdf.set_font('Helvetica', 'B', 28)
-pdf.set_text_color(26, 26, 26)
-pdf.cell(0, 12, 'KAIROS 777 INC', align='C', new_x="LMARGIN", new_y="NEXT")
-
-pdf.set_font('Helvetica', '', 10)
-pdf.set_text_color(120, 120, 120)
-pdf.cell(0, 6, 'Blockchain Financial Technology', align='C', new_x="LMARGIN", new_y="NEXT")
-
-# Gold divider
-pdf.set_draw_color(212, 175, 55)
-pdf.set_line_width(0.6)
-pdf.line(W/2 - 40, pdf.get_y() + 4, W/2 + 40, pdf.get_y() + 4)
-pdf.ln(12)
-
-# ── Title ──
-pdf.set_font('Helvetica', 'B', 24)
-pdf.set_text_color(212, 175, 55)
-pdf.cell(0, 12, 'SHARE CERTIFICATE', align='C', new_x="LMARGIN", new_y="NEXT")
-
-pdf.set_font('Helvetica', '', 11)
-pdf.set_text_color(140, 140, 140)
-pdf.cell(0, 7, 'Capitalization Table & Ownership Breakdown', align='C', new_x="LMARGIN", new_y="NEXT")
-
-pdf.set_font('Helvetica', '', 9)
-pdf.set_text_color(170, 170, 170)
-pdf.cell(0, 7, 'Certificate No. KAI-2026-001', align='C', new_x="LMARGIN", new_y="NEXT")
-pdf.ln(8)
-
-# ── Company Information Section ──
-pdf.set_font('Helvetica', 'B', 9)
-pdf.set_text_color(160, 160, 160)
-pdf.cell(0, 6, '    COMPANY INFORMATION', new_x="LMARGIN", new_y="NEXT")
-pdf.ln(3)
-
+GOLD = (212, 175, 55)
+INK = (26, 26, 26)
+
+COMPANY = {
+    "name": "Kairos 777 Inc",
+    "tagline": "Blockchain Financial Technology",
+    "entity_type": "Corporation",
+    "authorized_shares": 1000,
+    "share_class": "Common",
+    "signatory": "Mario Isaac",
+    "signatory_title": "Founder & Director",
+    "footer": "KAIROS 777 INC  |  info@kairos-777.com  |  kairos-777.com",
+    "cert_prefix": "KAI",
+}
+
+FOUNDER_CERT = {
+    "certificate_no": "KAI-2026-001",
+    "holder": "Mario Isaac",
+    "role": "Founder & Director",
+    "shares": 1000,
+    "date": "2026-02-22",
+}
+
+DEFAULT_OUTPUT = os.path.expanduser("~/Desktop/Kairos_777_Share_Certificate.pdf")
+
+# Table geometry shared by the chrome and the stamp
 x_left = 25
 x_right = W/2 + 5
 box_w = (W - 50) / 2 - 5
 box_h = 18
+table_x = 25
+table_w = W - 50
+col_widths = [table_w * 0.35, table_w * 0.30, table_w * 0.17, table_w * 0.18]
 
-def info_box(x, y, label, value):
-    pdf.set_fill_color(248, 248, 248)
-    pdf.set_draw_color(230, 230, 230)
-    pdf.rect(x, y, box_w, box_h, style='DF')
-    pdf.set_xy(x + 3, y + 2)
-    pdf.set_font('Helvetica', '', 7)
+# Registered up front so every document numbers its fonts (/F1, /F2, ...)
+# identically and recorded chrome streams stay valid in any of them
+FONTS = [('Helvetica', 'B'), ('Helvetica', ''), ('Helvetica', 'BI')]
+
+
+# ═══════════════════════════════════════════════════════════════
+# fpdf2 internals
+# The only code that touches private fpdf2 state; requirements.txt pins
+# the series these calls were written against.
+# ═══════════════════════════════════════════════════════════════
+FPDF_SERIES = "2.8."
+
+
+def check_fpdf():
+    """Fail loudly, before rendering anything, if the internals below are gone."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica")
+    font = next(iter(pdf.fonts.values()), None)
+    missing = [name for name, ok in (
+        ("FPDF._out", callable(getattr(pdf, "_out", None))),
+        ("FPDF._resource_catalog.add", callable(getattr(getattr(pdf, "_resource_catalog", None), "add", None))),
+        ("PDFPage.contents", isinstance(getattr(pdf.pages.get(1), "contents", None), (bytes, bytearray))),
+        ("font .i / .name", font is not None and hasattr(font, "i") and hasattr(font, "name")),
+    ) if not ok]
+    if missing:
+        raise RuntimeError(f"fpdf2 {fpdf.__version__} lacks {', '.join(missing)}; "
+                           f"install fpdf2=={FPDF_SERIES}* (scripts/requirements.txt)")
+
+
+def page_contents(pdf, n):
+    """The raw content stream of page n (1-based) so far."""
+    return bytes(pdf.pages[n].contents)
+
+
+def append_contents(pdf, data):
+    """Append raw content-stream bytes to the current page."""
+    pdf._out(data)
+
+
+def use_fonts(pdf):
+    """List every font loaded in pdf in the current page's resources."""
+    for font in pdf.fonts.values():
+        pdf._resource_catalog.add(PDFResourceType.FONT, font.i, pdf.page)
+
+
+def font_resources(pdf):
+    """(resource number, base font name) of every font loaded in pdf."""
+    return [(font.i, font.name) for font in pdf.fonts.values()]
+
+
+# ═══════════════════════════════════════════════════════════════
+# Field formatting
+# ═══════════════════════════════════════════════════════════════
+def format_date(value):
+    """ISO dates become 'February 22, 2026'; anything else is kept as is."""
+    try:
+        d = date.fromisoformat(str(value))
+    except ValueError:
+        return str(value)
+    return f"{d:%B} {d.day}, {d.year}"
+
+
+def format_percent(part, total):
+    pct = 100.0 * part / total if total else 0.0
+    return f"{pct:,.2f}".rstrip("0").rstrip(".") + "%"
+
+
+def new_pdf():
+    pdf = FPDF(orientation='P', unit='mm', format='Letter')
+    pdf.set_auto_page_break(auto=False)
+    for family, style in FONTS:
+        pdf.set_font(family, style)
+    return pdf
+
+
+# ═══════════════════════════════════════════════════════════════
+# Static chrome
+# ═══════════════════════════════════════════════════════════════
+def draw_chrome(pdf, company, total_shares):
+    """
+    Draw everything that is identical on every certificate of a run and
+    return the layout (y positions) the variable fields are stamped at.
+    """
+    layout = {}
+
+    # ── Gold border (double line effect) ──
+    pdf.set_draw_color(*GOLD)
+    pdf.set_line_width(0.8)
+    pdf.rect(margin, margin, W - 2*margin, H - 2*margin)
+    pdf.set_line_width(0.3)
+    pdf.rect(margin + 3, margin + 3, W - 2*margin - 6, H - 2*margin - 6)
+
+    # ── Header ──
+    pdf.set_y(25)
+    pdf.set_font('Helvetica', 'B', 28)
+    pdf.set_text_color(*INK)
+    pdf.cell(0, 12, company["name"].upper(), align='C', new_x="LMARGIN", new_y="NEXT")
+
+    pdf.set_font('Helvetica', '', 10)
+    pdf.set_text_color(120, 120, 120)
+    pdf.cell(0, 6, company["tagline"], align='C', new_x="LMARGIN", new_y="NEXT")
+
+    # Gold divider
+    pdf.set_draw_color(*GOLD)
+    pdf.set_line_width(0.6)
+    pdf.line(W/2 - 40, pdf.get_y() + 4, W/2 + 40, pdf.get_y() + 4)
+    pdf.ln(12)
+
+    # ── Title ──
+    pdf.set_font('Helvetica', 'B', 24)
+    pdf.set_text_color(*GOLD)
+    pdf.cell(0, 12, 'SHARE CERTIFICATE', align='C', new_x="LMARGIN", new_y="NEXT")
+
+    pdf.set_font('Helvetica', '', 11)
+    pdf.set_text_color(140, 140, 140)
+    pdf.cell(0, 7, 'Capitalization Table & Ownership Breakdown', align='C', new_x="LMARGIN", new_y="NEXT")
+
+    layout["cert_no_y"] = pdf.get_y()
+    pdf.ln(7 + 8)
+
+    # ── Company Information Section ──
+    pdf.set_font('Helvetica', 'B', 9)
+    pdf.set_text_color(160, 160, 160)
+    pdf.cell(0, 6, '    COMPANY INFORMATION', new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(3)
+
+    def info_box(x, y, label, value=None):
+        pdf.set_fill_color(248, 248, 248)
+        pdf.set_draw_color(230, 230, 230)
+        pdf.rect(x, y, box_w, box_h, style='DF')
+        pdf.set_xy(x + 3, y + 2)
+        pdf.set_font('Helvetica', '', 7)
+        pdf.set_text_color(160, 160, 160)
+        pdf.cell(box_w - 6, 5, label)
+        if value is not None:
+            stamp_box_value(pdf, x, y, value)
+
+    y0 = pdf.get_y()
+    info_box(x_left, y0, 'LEGAL ENTITY NAME', company["name"])
+    info_box(x_right, y0, 'ENTITY TYPE', company["entity_type"])
+
+    y1 = y0 + box_h + 4
+    info_box(x_left, y1, 'DATE OF ISSUANCE')
+    info_box(x_right, y1, 'TOTAL AUTHORIZED SHARES',
+             f'{company["authorized_shares"]:,} {company["share_class"]} Shares')
+    layout["issue_date_y"] = y1
+
+    pdf.set_y(y1 + box_h + 12)
+
+    # ── Ownership Table ──
+    pdf.set_font('Helvetica', 'B', 9)
     pdf.set_text_color(160, 160, 160)
-    pdf.cell(box_w - 6, 5, label)
+    pdf.cell(0, 6, '    OWNERSHIP BREAKDOWN', new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(3)
+
+    headers = ['Shareholder Name', 'Role', 'Shares Held', 'Ownership %']
+
+    # Header row
+    pdf.set_fill_color(*INK)
+    pdf.set_text_color(*GOLD)
+    pdf.set_font('Helvetica', 'B', 9)
+    x = table_x
+    y_table = pdf.get_y()
+    for i, h in enumerate(headers):
+        pdf.set_xy(x, y_table)
+        align = 'C' if i >= 2 else 'L'
+        pdf.cell(col_widths[i], 10, '  ' + h if i < 2 else h, fill=True, align=align)
+        x += col_widths[i]
+    pdf.ln(10)
+
+    # Data row (stamped) and its bottom border
+    y_data = pdf.get_y()
+    layout["row_y"] = y_data
+    pdf.set_draw_color(230, 230, 230)
+    pdf.line(table_x, y_data + 12, table_x + table_w, y_data + 12)
+    pdf.ln(12)
+
+    # Total row
+    pdf.set_draw_color(*GOLD)
+    pdf.set_line_width(0.5)
+    pdf.line(table_x, pdf.get_y(), table_x + table_w, pdf.get_y())
+
+    pdf.set_fill_color(247, 245, 239)
+    pdf.set_font('Helvetica', 'B', 11)
+    pdf.set_text_color(*INK)
+    x = table_x
+    y_tot = pdf.get_y()
+    pdf.set_xy(x, y_tot)
+    pdf.cell(col_widths[0] + col_widths[1], 11, '  TOTAL', fill=True)
+    x += col_widths[0] + col_widths[1]
+    pdf.set_xy(x, y_tot)
+    pdf.cell(col_widths[2], 11, f'{total_shares:,}', fill=True, align='C')
+    x += col_widths[2]
+    pdf.set_xy(x, y_tot)
+    pdf.cell(col_widths[3], 11, '100%', fill=True, align='C')
+    pdf.ln(18)
+
+    # ── Certification Statement ──
+    pdf.set_fill_color(253, 252, 247)
+    pdf.set_draw_color(232, 226, 200)
+    cert_x = 25
+    cert_w = W - 50
+    cert_y = pdf.get_y()
+    pdf.rect(cert_x, cert_y, cert_w, 30, style='DF')
+    pdf.set_xy(cert_x + 5, cert_y + 4)
+    pdf.set_font('Helvetica', 'B', 10)
+    pdf.set_text_color(50, 50, 50)
+    pdf.cell(20, 5, 'Certification: ', new_x="END")
+    pdf.set_font('Helvetica', '', 9.5)
+    pdf.set_text_color(80, 80, 80)
+    pdf.set_xy(cert_x + 5, cert_y + 4)
+    pdf.multi_cell(cert_w - 10, 5,
+        'Certification: This is to certify that the above ownership breakdown is a true and accurate '
+        f'representation of the capitalization structure of {company["name"]} as of the date stated above. '
+        'The shares listed are fully paid and non-assessable. This certificate is issued in accordance '
+        'with the company\'s Articles of Incorporation and Bylaws.')
+
+    pdf.set_y(cert_y + 38)
+
+    # ── Signature Section ──
+    sig_y = pdf.get_y() + 5
+    layout["sig_y"] = sig_y
+
+    # Typed signature name (like a digital signature)
+    pdf.set_font('Helvetica', 'BI', 20)
+    pdf.set_text_color(*INK)
+    pdf.set_xy(25, sig_y)
+    pdf.cell(80, 10, company["signatory"], align='C')
+
+    # Lines under signatures
+    line_y = sig_y + 14
+    pdf.set_draw_color(*INK)
+    pdf.set_line_width(0.5)
+    pdf.line(25, line_y, 105, line_y)
+    pdf.line(W/2 + 5, line_y, W/2 + 85, line_y)
+
+    # Labels under lines
+    pdf.set_font('Helvetica', 'B', 10)
+    pdf.set_text_color(*INK)
+    pdf.set_xy(25, line_y + 2)
+    pdf.cell(80, 6, company["signatory"], align='C')
+    pdf.set_xy(W/2 + 5, line_y + 2)
+    pdf.cell(80, 6, 'Date', align='C')
+
+    pdf.set_font('Helvetica', '', 9)
+    pdf.set_text_color(140, 140, 140)
+    pdf.set_xy(25, line_y + 8)
+    pdf.cell(80, 5, company["signatory_title"], align='C')
+
+    # ── Footer ──
+    pdf.set_draw_color(*GOLD)
+    pdf.set_line_width(0.5)
+    footer_y = H - 25
+    pdf.line(W/2 - 25, footer_y, W/2 + 25, footer_y)
+
+    pdf.set_font('Helvetica', '', 8)
+    pdf.set_text_color(180, 180, 180)
+    pdf.set_xy(0, footer_y + 3)
+    pdf.cell(W, 5, company["footer"], align='C')
+    return layout
+
+
+# ═══════════════════════════════════════════════════════════════
+# Variable fields
+# ═══════════════════════════════════════════════════════════════
+def stamp_box_value(pdf, x, y, value):
     pdf.set_xy(x + 3, y + 8)
     pdf.set_font('Helvetica', 'B', 12)
-    pdf.set_text_color(26, 26, 26)
+    pdf.set_text_color(*INK)
     pdf.cell(box_w - 6, 7, value)
 
-y0 = pdf.get_y()
-info_box(x_left, y0, 'LEGAL ENTITY NAME', 'Kairos 777 Inc')
-info_box(x_right, y0, 'ENTITY TYPE', 'Corporation')
 
-y1 = y0 + box_h + 4
-info_box(x_left, y1, 'DATE OF ISSUANCE', 'February 22, 2026')
-info_box(x_right, y1, 'TOTAL AUTHORIZED SHARES', '1,000 Common Shares')
-
-pdf.set_y(y1 + box_h + 12)
-
-# ── Ownership Table ──
-pdf.set_font('Helvetica', 'B', 9)
-pdf.set_text_color(160, 160, 160)
-pdf.cell(0, 6, '    OWNERSHIP BREAKDOWN', new_x="LMARGIN", new_y="NEXT")
-pdf.ln(3)
-
-table_x = 25
-table_w = W - 50
-col_widths = [table_w * 0.35, table_w * 0.30, table_w * 0.17, table_w * 0.18]
-headers = ['Shareholder Name', 'Role', 'Shares Held', 'Ownership %']
-
-# Header row
-pdf.set_fill_color(26, 26, 26)
-pdf.set_text_color(212, 175, 55)
-pdf.set_font('Helvetica', 'B', 9)
-x = table_x
-y_table = pdf.get_y()
-for i, h in enumerate(headers):
-    pdf.set_xy(x, y_table)
-    align = 'C' if i >= 2 else 'L'
-    pdf.cell(col_widths[i], 10, '  ' + h if i < 2 else h, fill=True, align=align)
-    x += col_widths[i]
-pdf.ln(10)
-
-# Data row
-pdf.set_fill_color(255, 255, 255)
-pdf.set_text_color(50, 50, 50)
-pdf.set_font('Helvetica', '', 11)
-data = ['Mario Isaac', 'Founder & Director', '1,000', '100%']
-x = table_x
-y_data = pdf.get_y()
-for i, d in enumerate(data):
-    pdf.set_xy(x, y_data)
-    align = 'C' if i >= 2 else 'L'
-    fw = 'B' if i >= 2 else ''
-    pdf.set_font('Helvetica', fw, 11)
-    pdf.cell(col_widths[i], 12, '  ' + d if i < 2 else d, align=align)
-    x += col_widths[i]
-
-# Bottom border of data row
-pdf.set_draw_color(230, 230, 230)
-pdf.line(table_x, y_data + 12, table_x + table_w, y_data + 12)
-pdf.ln(12)
-
-# Total row
-pdf.set_draw_color(212, 175, 55)
-pdf.set_line_width(0.5)
-pdf.line(table_x, pdf.get_y(), table_x + table_w, pdf.get_y())
-
-pdf.set_fill_color(247, 245, 239)
-pdf.set_font('Helvetica', 'B', 11)
-pdf.set_text_color(26, 26, 26)
-x = table_x
-y_tot = pdf.get_y()
-pdf.set_xy(x, y_tot)
-pdf.cell(col_widths[0] + col_widths[1], 11, '  TOTAL', fill=True)
-x += col_widths[0] + col_widths[1]
-pdf.set_xy(x, y_tot)
-pdf.cell(col_widths[2], 11, '1,000', fill=True, align='C')
-x += col_widths[2]
-pdf.set_xy(x, y_tot)
-pdf.cell(col_widths[3], 11, '100%', fill=True, align='C')
-pdf.ln(18)
-
-# ── Certification Statement ──
-pdf.set_fill_color(253, 252, 247)
-pdf.set_draw_color(232, 226, 200)
-cert_x = 25
-cert_w = W - 50
-cert_y = pdf.get_y()
-pdf.rect(cert_x, cert_y, cert_w, 30, style='DF')
-pdf.set_xy(cert_x + 5, cert_y + 4)
-pdf.set_font('Helvetica', 'B', 10)
-pdf.set_text_color(50, 50, 50)
-pdf.cell(20, 5, 'Certification: ', new_x="END")
-pdf.set_font('Helvetica', '', 9.5)
-pdf.set_text_color(80, 80, 80)
-pdf.set_xy(cert_x + 5, cert_y + 4)
-pdf.multi_cell(cert_w - 10, 5,
-    'Certification: This is to certify that the above ownership breakdown is a true and accurate '
-    'representation of the capitalization structure of Kairos 777 Inc as of the date stated above. '
-    'The shares listed are fully paid and non-assessable. This certificate is issued in accordance '
-    'with the company\'s Articles of Incorporation and Bylaws.')
-
-pdf.set_y(cert_y + 38)
-
-# ── Signature Section ──
-sig_y = pdf.get_y() + 5
-
-# Typed signature name (like a digital signature)
-pdf.set_font('Helvetica', 'BI', 20)
-pdf.set_text_color(26, 26, 26)
-pdf.set_xy(25, sig_y)
-pdf.cell(80, 10, 'Mario Isaac', align='C')
-
-# Date value
-pdf.set_xy(W/2 + 5, sig_y)
-pdf.set_font('Helvetica', '', 14)
-pdf.cell(80, 10, 'February 22, 2026', align='C')
-
-# Lines under signatures
-line_y = sig_y + 14
-pdf.set_draw_color(26, 26, 26)
-pdf.set_line_width(0.5)
-pdf.line(25, line_y, 105, line_y)
-pdf.line(W/2 + 5, line_y, W/2 + 85, line_y)
-
-# Labels under lines
-pdf.set_font('Helvetica', 'B', 10)
-pdf.set_text_color(26, 26, 26)
-pdf.set_xy(25, line_y + 2)
-pdf.cell(80, 6, 'Mario Isaac', align='C')
-pdf.set_xy(W/2 + 5, line_y + 2)
-pdf.cell(80, 6, 'Date', align='C')
-
-pdf.set_font('Helvetica', '', 9)
-pdf.set_text_color(140, 140, 140)
-pdf.set_xy(25, line_y + 8)
-pdf.cell(80, 5, 'Founder & Director', align='C')
-
-# ── Footer ──
-pdf.set_draw_color(212, 175, 55)
-pdf.set_line_width(0.5)
-footer_y = H - 25
-pdf.line(W/2 - 25, footer_y, W/2 + 25, footer_y)
-
-pdf.set_font('Helvetica', '', 8)
-pdf.set_text_color(180, 180, 180)
-pdf.set_xy(0, footer_y + 3)
-pdf.cell(W, 5, 'KAIROS 777 INC  |  info@kairos-777.com  |  kairos-777.com', align='C')
-
-# ── Save ──
-output_path = '/Users/kaizenllc/Desktop/Kairos_777_Share_Certificate.pdf'
-pdf.output(output_path)
-print(f'PDF saved to: {output_path}')
+def stamp(pdf, layout, cert, total_shares):
+    """Draw one certificate's variable fields at the chrome's layout."""
+    issued = format_date(cert["date"])
+
+    pdf.set_y(layout["cert_no_y"])
+    pdf.set_font('Helvetica', '', 9)
+    pdf.set_text_color(170, 170, 170)
+    pdf.cell(0, 7, f'Certificate No. {cert["certificate_no"]}', align='C')
+
+    stamp_box_value(pdf, x_left, layout["issue_date_y"], issued)
+
+    # Data row
+    pdf.set_text_color(50, 50, 50)
+    data = [cert["holder"], cert.get("role", ""), f'{int(cert["shares"]):,}',
+            format_percent(int(cert["shares"]), total_shares)]
+    x = table_x
+    for i, d in enumerate(data):
+        pdf.set_xy(x, layout["row_y"])
+        align = 'C' if i >= 2 else 'L'
+        fw = 'B' if i >= 2 else ''
+        pdf.set_font('Helvetica', fw, 11)
+        pdf.cell(col_widths[i], 12, '  ' + d if i < 2 else d, align=align)
+        x += col_widths[i]
+
+    # Date value next to the signature
+    pdf.set_xy(W/2 + 5, layout["sig_y"])
+    pdf.set_font('Helvetica', '', 14)
+    pdf.set_text_color(*INK)
+    pdf.cell(80, 10, issued, align='C')
+
+
+def render_certificate(company, cert, total_shares):
+    """One complete certificate in a single pass."""
+    pdf = new_pdf()
+    pdf.add_page()
+    layout = draw_chrome(pdf, company, total_shares)
+    stamp(pdf, layout, cert, total_shares)
+    return pdf
+
+
+# ═══════════════════════════════════════════════════════════════
+# Bulk issuance
+# ═══════════════════════════════════════════════════════════════
+def load_cap_table(path):
+    """Returns (company, issuances) with certificate numbers filled in."""
+    company = dict(COMPANY)
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            doc = json.load(f)
+        if isinstance(doc, dict):
+            company.update(doc.get("company", {}))
+            rows = doc["issuances"]
+        else:
+            rows = doc
+    else:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    issuances = []
+    for seq, row in enumerate(rows, 1):
+        cert = {k.strip().lower(): (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
+        cert["shares"] = int(str(cert["shares"]).replace(",", ""))
+        cert.setdefault("role", "")
+        cert.setdefault("date", date.today().isoformat())
+        if not cert.get("certificate_no"):
+            year = format_date(cert["date"])[-4:]
+            cert["certificate_no"] = f'{company["cert_prefix"]}-{year}-{seq:03d}'
+        issuances.append(cert)
+    return company, issuances
+
+
+def cert_filename(cert):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", cert["certificate_no"]) + ".pdf"
+
+
+class Chrome:
+    """
+    The static page recorded once: its content stream (wrapped in q/Q so
+    it leaves no graphics state behind) and the layout to stamp against.
+    """
+
+    def __init__(self, company, total_shares):
+        pdf = new_pdf()
+        pdf.add_page()
+        self.layout = draw_chrome(pdf, company, total_shares)
+        self.contents = b"q\n" + page_contents(pdf, 1) + b"Q\n"
+        self.total_shares = total_shares
+        self.fonts = font_resources(pdf)
+        self.size_pt = (pdf.w_pt, pdf.h_pt)
+
+    def add_page(self, pdf):
+        """Start a page in pdf with the chrome already drawn."""
+        pdf.add_page()
+        append_contents(pdf, self.contents)
+        use_fonts(pdf)
+
+    def certificate(self, cert):
+        pdf = new_pdf()
+        self.add_page(pdf)
+        stamp(pdf, self.layout, cert, self.total_shares)
+        return pdf
+
+    def page_streams(self, certs):
+        """Compressed per-page content streams: draw the chrome XObject, then stamp."""
+        pdf = new_pdf()
+        streams = []
+        for cert in certs:
+            pdf.add_page()
+            stamp(pdf, self.layout, cert, self.total_shares)
+            streams.append(zlib.compress(b"q /Chrome Do Q\n" + page_contents(pdf, pdf.page)))
+        return streams
+
+
+def _stream(header, data):
+    return b"<< " + header + b" /Filter /FlateDecode /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+
+def write_document(path, chrome, page_streams):
+    """
+    Write one PDF whose pages all draw the same chrome Form XObject and
+    share one set of font dictionaries, so neither is repeated per page.
+    Pages are streamed to disk in order.
+    """
+    n_fonts = len(chrome.fonts)
+    first_font, xobject = 3, 3 + n_fonts
+    first_page = xobject + 1
+    w, h = chrome.size_pt
+    fonts = b" ".join(b"/F%d %d 0 R" % (i, first_font + k) for k, (i, _) in enumerate(chrome.fonts))
+    resources = b"<< /Font << " + fonts + b" >> /XObject << /Chrome %d 0 R >> >>" % xobject
+
+    offsets = []
+    with open(path, "wb") as f:
+        def obj(body):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % len(offsets) + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        obj(b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = b" ".join(b"%d 0 R" % (first_page + 2 * k) for k in range(len(page_streams)))
+        obj(b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_streams))
+        for _, name in chrome.fonts:
+            obj(b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name.encode()
+                + b" /Encoding /WinAnsiEncoding >>")
+        obj(_stream(b"/Type /XObject /Subtype /Form /BBox [0 0 %.2f %.2f] /Resources << /Font << %s >> >>"
+                    % (w, h, fonts), zlib.compress(chrome.contents)))
+        for k, data in enumerate(page_streams):
+            obj(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources %s /Contents %d 0 R >>"
+                % (w, h, resources, first_page + 2 * k + 1))
+            obj(_stream(b"", data))
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % off for off in offsets))
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref))
+    return os.path.getsize(path)
+
+
+_chrome = None
+
+
+def _init_worker(company, total_shares):
+    global _chrome
+    _chrome = Chrome(company, total_shares)
+
+
+def _issue_batch(args):
+    certs, out_dir = args
+    written = 0
+    for cert in certs:
+        path = os.path.join(out_dir, cert_filename(cert))
+        _chrome.certificate(cert).output(path)
+        written += os.path.getsize(path)
+    return len(certs), written
+
+
+def _stamp_batch(certs):
+    return _chrome.page_streams(certs)
+
+
+def issue_merged(company, issuances, path, jobs, batch=100):
+    """All certificates as pages of one document; returns (count, bytes)."""
+    total_shares = sum(c["shares"] for c in issuances)
+    batches = [issuances[i:i + batch] for i in range(0, len(issuances), batch)]
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(company, total_shares)) as pool:
+        streams = [s for result in pool.map(_stamp_batch, batches) for s in result]
+    return len(streams), write_document(path, Chrome(company, total_shares), streams)
+
+
+def issue_all(company, issuances, out_dir, jobs, batch=50):
+    os.makedirs(out_dir, exist_ok=True)
+    total_shares = sum(c["shares"] for c in issuances)
+    batches = [(issuances[i:i + batch], out_dir) for i in range(0, len(issuances), batch)]
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(company, total_shares)) as pool:
+        results = list(pool.map(_issue_batch, batches))
+    return sum(n for n, _ in results), sum(b for _, b in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Kairos 777 share certificates.")
+    parser.add_argument("--cap-table", help="CSV or JSON cap table; one certificate per row")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="output PDF (single mode)")
+    parser.add_argument("--out-dir", default="certificates", help="output directory (bulk mode)")
+    parser.add_argument("--merged", metavar="FILE", help="write all certificates as one N-page PDF")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    args = parser.parse_args(argv)
+    check_fpdf()
+
+    if not args.cap_table:
+        with build_metrics.asset(os.path.basename(args.out)):
+            pdf = render_certificate(COMPANY, FOUNDER_CERT, FOUNDER_CERT["shares"])
+            with build_metrics.encoding():
+                pdf.output(args.out)
+            build_metrics.output_file(args.out)
+        print(f'PDF saved to: {args.out}')
+        return
+
+    company, issuances = load_cap_table(args.cap_table)
+    t0 = time.perf_counter()
+    with build_metrics.asset(os.path.basename(args.merged) if args.merged else "certificates"):
+        if args.merged:
+            count, size = issue_merged(company, issuances, args.merged, args.jobs)
+        else:
+            count, size = issue_all(company, issuances, args.out_dir, args.jobs)
+        build_metrics.output(size, "pdf")
+    elapsed = time.perf_counter() - t0
+    print(f"Issued {count} certificates to {args.merged or args.out_dir} in {elapsed:.2f}s "
+          f"({count / elapsed:.0f} certs/s, {size / 1e6:.1f} MB, {size / max(count, 1) / 1024:.1f} KB each)")
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("generate_share_cert", main))
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Kairos 777 — Token logo sets from the token list and token metadata.
+The master logo is the one named in assets/branding/token-metadata.json.
+Every logo the token list points at on kairos-777.com, plus the fixed sets
+in token-logos.json (assets/branding, the wallet's public/icons), is
+derived from it: "-<N>.png" files are N x N resizes from one decode of the
+master, the rest are byte copies of it.
+
+Resized PNGs are cached by the master's hash, so a new chain entry or a
+deleted file only costs a store lookup; the master is decoded again only
+when it changes. Every output is then checked to exist with the expected
+dimensions.
+
+Usage: python3 scripts/generate_token_logos.py [--check] [--manifest FILE]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import argparse
+import io
+import json
+import os
+import re
+import sys
+
+import build_metrics
+from optimize_images import optimize_png
+from output_store import CACHE_ROOT, ROOT, OutputStore, atomic_write, sha256_file
+from resize_pyramid import ResizePyramid, WORKERS
+
+MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "token-logos.json")
+CACHE_PATH = os.path.join(CACHE_ROOT, "token-logos.json")
+
+# Bump when the resize or encoding changes so cached sizes are rebuilt
+ENCODER_VERSION = 1
+
+_SIZE_SUFFIX = re.compile(r"-(\d+)\.png$")
+
+
+def rel(path):
+    return os.path.relpath(path, ROOT)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Plan
+# ═══════════════════════════════════════════════════════════════
+def load_manifest(path=MANIFEST):
+    with open(path) as f:
+        manifest = json.load(f)
+    with open(os.path.join(ROOT, manifest["metadata"])) as f:
+        manifest["source_path"] = os.path.join(ROOT, json.load(f)["logo"])
+    with open(os.path.join(ROOT, manifest["tokenlist"])) as f:
+        manifest["tokenlist_data"] = json.load(f)
+    return manifest
+
+
+def referenced_logos(manifest):
+    """
+    {local path: [referrers]} for every token list logoURI served from the
+    site, and the list of logoURIs hosted elsewhere.
+    """
+    site_url, site_dir = manifest["site"]["url"], os.path.join(ROOT, manifest["site"]["dir"])
+    tokenlist = manifest["tokenlist_data"]
+    entries = [("list", tokenlist.get("logoURI"))]
+    entries += [(f"{t['symbol']} @ {t['chainId']}", t.get("logoURI")) for t in tokenlist["tokens"]]
+
+    local, external = {}, []
+    for who, uri in entries:
+        if not uri:
+            continue
+        if uri.startswith(site_url):
+            path = os.path.join(site_dir, uri[len(site_url):].split("?")[0])
+            local.setdefault(path, []).append(who)
+        else:
+            external.append((who, uri))
+    return local, external
+
+
+def plan_outputs(manifest):
+    """{dest: size}, size an int for a resize or "source" for a copy of the master."""
+    outputs = {}
+    for spec in manifest["sets"].values():
+        for name, size in spec["files"].items():
+            outputs[os.path.join(ROOT, spec["dir"], name)] = size
+    for path in referenced_logos(manifest)[0]:
+        m = _SIZE_SUFFIX.search(path)
+        outputs[path] = int(m.group(1)) if m else "source"
+    return outputs
+
+
+# ═══════════════════════════════════════════════════════════════
+# Render
+# ═══════════════════════════════════════════════════════════════
+def encode_png(img):
+    """Pillow's optimized encode, then the optimizer's if smaller (as make-favicons)."""
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return optimize_png(buf.getvalue())
+
+
+def _render(size, img):
+    with build_metrics.asset(f"{size}px"):
+        with build_metrics.encoding():
+            png = encode_png(img)
+        build_metrics.output(len(png), "png")
+    return png
+
+
+def load_cache(source_digest):
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("source") != source_digest or cache.get("version") != ENCODER_VERSION:
+        return {}
+    return {int(size): digest for size, digest in cache["sizes"].items()}
+
+
+def render_sizes(source_path, sizes, store):
+    """{size: digest} for every size, decoding the master only for uncached ones."""
+    source_digest = sha256_file(source_path)
+    digests = {s: d for s, d in load_cache(source_digest).items() if store.has(d)}
+    missing = sorted(set(sizes) - set(digests))
+    if missing:
+        pyramid = ResizePyramid(source_path)  # the one decode
+        images = pyramid.get_many(missing)
+        with ThreadPoolExecutor(WORKERS) as pool:
+            pngs = pool.map(lambda s: _render(s, images[(s, s)]), missing)
+            for size, png in zip(missing, pngs):
+                digests[size] = store.put(png)
+        cache = {"source": source_digest, "version": ENCODER_VERSION,
+                 "sizes": {str(s): d for s, d in sorted(digests.items())}}
+        atomic_write(CACHE_PATH, (json.dumps(cache, indent=2) + "\n").encode())
+    return digests, missing
+
+
+# ═══════════════════════════════════════════════════════════════
+# Validate
+# ═══════════════════════════════════════════════════════════════
+def validate(outputs, source_size):
+    """Problems with the outputs on disk: missing files or wrong dimensions."""
+    problems = []
+    for dest, size in sorted(outputs.items()):
+        expected = source_size if size == "source" else (size, size)
+        try:
+            with Image.open(dest) as img:
+                actual = img.size
+        except FileNotFoundError:
+            problems.append(f"{rel(dest)}: missing")
+            continue
+        except OSError as e:
+            problems.append(f"{rel(dest)}: unreadable ({e})")
+            continue
+        if actual != expected:
+            problems.append(f"{rel(dest)}: {actual[0]}x{actual[1]}, expected {expected[0]}x{expected[1]}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and validate the token logo sets.")
+    parser.add_argument("--check", action="store_true", help="only validate; write nothing")
+    parser.add_argument("--manifest", default=MANIFEST, help="logo set manifest JSON")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    source_path = manifest["source_path"]
+    local, external = referenced_logos(manifest)
+    outputs = plan_outputs(manifest)
+
+    if not os.path.isfile(source_path):
+        print(f"❌ master logo {rel(source_path)} (from {manifest['metadata']}) is missing")
+        return 1
+    with Image.open(source_path) as img:
+        source_size = img.size
+    sizes = sorted({s for s in outputs.values() if s != "source"})
+    largest = max(sizes, default=0)
+    if source_size[0] != source_size[1] or source_size[0] < largest:
+        print(f"❌ master logo {rel(source_path)} is {source_size[0]}x{source_size[1]}; "
+              f"needs to be square and at least {largest}px")
+        return 1
+
+    print(f"🪙 Token logos from {rel(source_path)} ({source_size[0]}x{source_size[1]})")
+    for path, who in sorted(local.items()):
+        print(f"  🔗 {rel(path):<40} {', '.join(who)}")
+    for who, uri in external:
+        print(f"  ⏭  {uri:<40} {who} (external, not checked)")
+
+    if not args.check:
+        store = OutputStore()
+        digests, rendered = render_sizes(source_path, sizes, store)
+        source_digest = store.put_file(source_path)
+        print(f"\n  {len(rendered)} sizes rendered, {len(sizes) - len(rendered)} cached")
+        for size in sorted(set(sizes) - set(rendered)):
+            with build_metrics.asset(f"{size}px"):
+                build_metrics.cache_hit()
+                build_metrics.output(len(store.get(digests[size])), "png")
+        for dest, size in sorted(outputs.items()):
+            how = store.materialize(source_digest if size == "source" else digests[size], dest)
+            label = "master" if size == "source" else f"{size}px"
+            print(f"  ✅ {rel(dest):<48} {label:<7} {how}")
+        print(f"\n  📦 {store.summary()}")
+
+    problems = validate(outputs, source_size)
+    for p in problems:
+        print(f"  ❌ {p}")
+    print(f"\n{len(outputs)} logos, {len(problems)} problems")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("generate_token_logos", main))
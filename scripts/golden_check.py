@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Golden-image regression check for the generated marketing assets and icons.
+Every case renders in-process (no files written) and is compared with its
+reference under scripts/golden/<platform>/: an exact pixel digest first,
+then a vectorized per-pixel diff with a tolerance. Failures write a diff
+heatmap to .asset-cache/golden-diff/. Cases run across a process pool.
+
+References are per platform because the banners fall back to different
+system fonts on macOS and Linux. After an intentional visual change,
+re-create them with --update and commit the result.
+
+Usage: python3 scripts/golden_check.py [case ...] [--update] [--tolerance N]
+                                       [--max-pixels N] [--quick] [--list]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from output_store import CACHE_ROOT, OutputStore
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SCRIPTS)
+GOLDEN_DIR = os.path.join(SCRIPTS, "golden", sys.platform)
+HASHES = os.path.join(GOLDEN_DIR, "hashes.json")
+DIFF_DIR = os.path.join(CACHE_ROOT, "golden-diff")
+
+CASES = {}
+
+
+def case(name):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def load_script(filename):
+    """Import a script from this directory, hyphenated names included."""
+    name = os.path.splitext(filename)[0].replace("-", "_")
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+# ═══════════════════════════════════════════════════════════════
+# Cases: zero-argument callables returning a PIL image
+# ═══════════════════════════════════════════════════════════════
+@case("main-banner")
+def _main_banner():
+    return load_script("generate_promo_banners.py").render_main_banner()
+
+
+@case("telegram-banner")
+def _telegram_banner():
+    return load_script("generate_promo_banners.py").render_telegram_banner()
+
+
+@case("trading-banner")
+def _trading_banner():
+    return load_script("generate_promo_banners.py").render_trading_banner()
+
+
+@case("telegram-shadows-draft")
+def _telegram_shadows_draft():
+    banners = load_script("generate_promo_banners.py")
+    return banners.record_telegram_banner(shadows=True).render(quality="draft")
+
+
+@case("cws-screenshot-1")
+def _cws_screenshot_1():
+    return load_script("generate-cws-assets.py").render_screenshot_1()
+
+
+@case("extension-icon-128")
+def _extension_icon():
+    from svg_raster import SvgSource
+    return SvgSource(os.path.join(ROOT, "kairos-extension", "scripts", "icon.svg")).get(128)
+
+
+@case("android-round-192")
+def _android_round():
+    icons = load_script("generate-app-icons.py")
+    from resize_pyramid import ResizePyramid
+    app = icons.load_manifest()["apps"]["kairos-trade"]
+    flat = icons.flatten(ResizePyramid(app["source_path"]).get(192), (192, 192), app["bg"])
+    return icons.make_round(flat)
+
+
+@case("og-card")
+def _og_card():
+    og = load_script("generate_og_images.py")
+    return og.render_og_card(
+        "Kairos 777 — Decentralized Trading Ecosystem",
+        "Algorithmic trading bots, 33+ pairs, up to 150x leverage. "
+        "USD stablecoin & multi-chain wallet.",
+        "https://kairos-777.com/")
+
+
+# ═══════════════════════════════════════════════════════════════
+# Hashing and diffing
+# ═══════════════════════════════════════════════════════════════
+def as_rgba(img):
+    return np.asarray(img if img.mode == "RGBA" else img.convert("RGBA"))
+
+
+def pixel_digest(arr):
+    h = hashlib.sha256(str(arr.shape).encode())
+    h.update(np.ascontiguousarray(arr).data)
+    return h.hexdigest()
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    m[0] /= np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+
+DCT32 = _dct_matrix(32)
+
+
+def phash(arr):
+    """64-bit DCT perceptual hash (hex) of an RGBA array."""
+    gray = Image.fromarray(arr).convert("L").resize((32, 32), Image.BOX)
+    coeffs = DCT32 @ np.asarray(gray, dtype=np.float64) @ DCT32.T
+    low = coeffs[:8, :8].ravel()[1:]  # drop the DC term
+    bits = np.concatenate([[0], low > np.median(low)])
+    return "%016x" % int("".join("1" if b else "0" for b in bits), 2)
+
+
+def diff(actual, expected, tolerance):
+    """Per-pixel max channel delta and the mask of pixels beyond tolerance."""
+    delta = np.abs(actual.astype(np.int16) - expected.astype(np.int16)).max(axis=2)
+    return delta, delta > tolerance
+
+
+def write_heatmap(name, expected, delta, bad):
+    """Dimmed reference with out-of-tolerance pixels in red (brighter = larger)."""
+    gray = (expected[..., :3].mean(axis=2) * 0.3).astype(np.uint8)
+    heat = np.dstack([gray, gray, gray])
+    heat[bad] = np.stack([np.clip(96 + delta[bad], 0, 255), np.zeros_like(delta[bad]),
+                          np.zeros_like(delta[bad])], axis=1).astype(np.uint8)
+    os.makedirs(DIFF_DIR, exist_ok=True)
+    path = os.path.join(DIFF_DIR, f"{name}.png")
+    Image.fromarray(heat).save(path)
+    return path
+
+
+# ═══════════════════════════════════════════════════════════════
+# Runner
+# ═══════════════════════════════════════════════════════════════
+def run_case(name, meta, tolerance, max_pixels, quick, update):
+    t0 = time.perf_counter()
+    actual = as_rgba(CASES[name]())
+    result = {"name": name, "digest": pixel_digest(actual), "phash": phash(actual),
+              "size": [actual.shape[1], actual.shape[0]]}
+
+    ref_path = os.path.join(GOLDEN_DIR, f"{name}.png")
+    if update:
+        OutputStore().save_image(Image.fromarray(actual), ref_path, optimize=True)
+        result["status"] = "updated"
+    elif not os.path.exists(ref_path):
+        result["status"] = "missing"
+    elif meta and meta["digest"] == result["digest"]:
+        result["status"] = "identical"
+    elif quick and meta and meta["phash"] == result["phash"]:
+        result["status"] = "phash-match"
+    else:
+        expected = as_rgba(Image.open(ref_path))
+        if expected.shape != actual.shape:
+            result.update(status="fail", detail=f"size {result['size']} != {[expected.shape[1], expected.shape[0]]}")
+        else:
+            delta, bad = diff(actual, expected, tolerance)
+            n_bad = int(bad.sum())
+            result["max_delta"] = int(delta.max())
+            result["bad_pixels"] = n_bad
+            if n_bad <= max_pixels:
+                result["status"] = "pass"
+            else:
+                result["status"] = "fail"
+                result["detail"] = (f"{n_bad} px over tolerance {tolerance} "
+                                    f"({100.0 * n_bad / bad.size:.3f}%), max delta {result['max_delta']}")
+                result["heatmap"] = write_heatmap(name, expected, delta, bad)
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+
+def load_hashes():
+    try:
+        with open(HASHES) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare rendered assets with golden references.")
+    parser.add_argument("cases", nargs="*", help="case names (default: all)")
+    parser.add_argument("--update", action="store_true", help="re-create the references")
+    parser.add_argument("--tolerance", type=int, default=2, help="allowed per-channel delta (0-255)")
+    parser.add_argument("--max-pixels", type=int, default=0, help="pixels allowed over tolerance")
+    parser.add_argument("--quick", action="store_true",
+                        help="accept a matching perceptual hash without a full diff")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    names = args.cases or list(CASES)
+
+    hashes = load_hashes()
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(min(args.jobs, len(names))) as pool:
+        futures = [pool.submit(run_case, n, hashes.get(n), args.tolerance, args.max_pixels,
+                               args.quick, args.update) for n in names]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - t0
+
+    icons = {"identical": "✅", "pass": "✅", "phash-match": "✅", "updated": "📝", "missing": "❓", "fail": "❌"}
+    for r in results:
+        line = f"  {icons[r['status']]} {r['name']:<22} {r['status']:<12} {r['seconds']:.2f}s"
+        if "detail" in r:
+            line += f"  {r['detail']}"
+        if "heatmap" in r:
+            line += f"\n       heatmap: {r['heatmap']}"
+        print(line)
+
+    if args.update:
+        for r in results:
+            hashes[r["name"]] = {"digest": r["digest"], "phash": r["phash"], "size": r["size"]}
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(HASHES, "w") as f:
+            json.dump(hashes, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    failed = [r for r in results if r["status"] in ("fail", "missing")]
+    print(f"\n{len(results)} cases in {elapsed:.2f}s, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Kairos 777 — Localized promo banners.
+Renders every banner of generate_promo_banners.py once per locale, from
+the string tables in assets/promo/i18n/<locale>.json:
+
+    {"locale": "es", "direction": "ltr", "strings": {"Trading": "trading", ...}}
+
+Untranslated strings stay English. Text is set in the fallback chains of
+font-fallbacks.json: every run takes the first font whose cmap covers it
+(font_coverage.py), so CJK, Arabic and symbols such as ✦ ✓ ▲ × are
+chosen from the coverage index without trial rendering. Characters no
+installed font covers are listed per locale. Right-to-left locales need
+Pillow built with raqm and are skipped without it.
+
+The parent records each banner in every locale and renders the ops they
+all share (background, grid, glows: everything drawn before the first
+translated string) once; the workers get those canvases and each replays
+only its locale's remaining ops on a copy.
+
+Usage: python3 scripts/localize_banners.py [--locales es,zh] [--banners main,trading]
+                                           [--out DIR] [--jobs N]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import ImageFont
+import argparse
+import json
+import os
+import sys
+import time
+
+import build_metrics
+import generate_promo_banners as banners
+from canvas import Canvas
+from display_list import DisplayList
+from font_coverage import ChainFont, CoverageIndex, FontChain, load_fallbacks, raqm_available
+
+I18N_DIR = os.path.join(banners.OUT, "i18n")
+
+# name: (recorder, output file)
+BANNERS = {
+    "main": ("record_main_banner", "kairos-ecosystem-banner-twitter.png"),
+    "telegram": ("record_telegram_banner", "kairos-ecosystem-banner-telegram.png"),
+    "trading": ("record_trading_banner", "kairos-trade-banner.png"),
+}
+
+
+def available_locales(i18n_dir=I18N_DIR):
+    return sorted(f[:-5] for f in os.listdir(i18n_dir) if f.endswith(".json"))
+
+
+def load_locale(locale, i18n_dir=I18N_DIR):
+    with open(os.path.join(i18n_dir, f"{locale}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def banner_path(out_dir, locale, name):
+    return os.path.join(out_dir, locale, BANNERS[name][1])
+
+
+# ═══════════════════════════════════════════════════════════════
+# Recording
+# ═══════════════════════════════════════════════════════════════
+_chains = {}
+_fonts = {}
+
+
+def chains():
+    """{"regular": FontChain, "bold": FontChain}, built once per process."""
+    if not _chains:
+        index = CoverageIndex()
+        for weight, specs in load_fallbacks().items():
+            _chains[weight] = FontChain(specs, index)
+        index.save()
+    return _chains
+
+
+def chain_font(size, bold=False, direction=None):
+    """get_font for localized banners: the weight's fallback chain at size."""
+    key = (size, bold, direction)
+    if key not in _fonts:
+        chain = chains()["bold" if bold else "regular"]
+        _fonts[key] = ChainFont(chain, size, direction) if chain else ImageFont.load_default()
+    return _fonts[key]
+
+
+def record(name, doc):
+    """DisplayList of one banner in the locale doc describes."""
+    direction = "rtl" if doc.get("direction") == "rtl" else None  # ltr is Pillow's default
+    banners.use_locale(doc["strings"], lambda size, bold=False: chain_font(size, bold, direction))
+    try:
+        return getattr(banners, BANNERS[name][0])()
+    finally:
+        banners.use_locale()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Rendering (worker processes)
+# ═══════════════════════════════════════════════════════════════
+_shared = {}
+
+
+def _init_worker(shared):
+    """Keep the shared canvases: {name: (pixels, number of ops they cover)}."""
+    for name, (array, n) in shared.items():
+        _shared[name] = (Canvas((array.shape[1], array.shape[0]), None, array), n)
+
+
+def render_banner(doc, name, out_path):
+    """
+    Replay a locale's own ops over a copy of the shared canvas and save
+    it; returns its build_metrics.Asset.
+    """
+    with build_metrics.asset(f"{doc['locale']}/{BANNERS[name][1]}") as item:
+        dlist = record(name, doc)
+        base, n = _shared[name]
+        tail = DisplayList(dlist.size, dlist.color)
+        tail.ops = dlist.ops[n:]
+        canvas = base.copy()
+        tail.replay(canvas)
+        canvas.save_png(out_path)
+    return item
+
+
+def render_locales(locales, names=tuple(BANNERS), out_dir=I18N_DIR, jobs=None):
+    """
+    Render each banner in each locale; returns ([(locale, name, path,
+    seconds)], {locale: characters no font covers}).
+    """
+    docs = {locale: load_locale(locale) for locale in locales}
+    missing = {}
+    shared = {}
+    for name in names:
+        lists = []
+        for locale in locales:
+            for chain in chains().values():
+                chain.missing.clear()
+            lists.append(record(name, docs[locale]))
+            for chain in chains().values():
+                missing.setdefault(locale, set()).update(chain.missing)
+        n = lists[0].shared_prefix(*lists[1:])
+        prefix = DisplayList(lists[0].size, lists[0].color)
+        prefix.ops = lists[0].ops[:n]
+        with build_metrics.asset(f"shared/{BANNERS[name][1]}"):
+            shared[name] = (prefix.render_canvas().array, n)
+
+    tasks = [(locale, name, banner_path(out_dir, locale, name)) for locale in locales for name in names]
+    for _, _, path in tasks:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(shared,)) as pool:
+        futures = [(locale, name, path, pool.submit(render_banner, docs[locale], name, path))
+                   for locale, name, path in tasks]
+        results = []
+        for locale, name, path, future in futures:
+            item = future.result()
+            build_metrics.add(item)
+            results.append((locale, name, path, item.render_s + item.encode_s))
+    return results, {locale: chars for locale, chars in missing.items() if chars}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the promo banners in every locale.")
+    parser.add_argument("--locales", help="comma-separated locales (default: every string table)")
+    parser.add_argument("--banners", default=",".join(BANNERS), help="comma-separated banners")
+    parser.add_argument("--out", default=I18N_DIR, help="output directory (one folder per locale)")
+    parser.add_argument("--jobs", type=int, help="render processes")
+    args = parser.parse_args(argv)
+
+    locales = args.locales.split(",") if args.locales else available_locales()
+    names = args.banners.split(",")
+    unknown = [n for n in names if n not in BANNERS]
+    if unknown:
+        parser.error(f"unknown banner(s): {', '.join(unknown)}")
+    if not raqm_available():
+        rtl = [l for l in locales if load_locale(l).get("direction") == "rtl"]
+        for locale in rtl:
+            print(f"⚠️  {locale}: right-to-left text needs Pillow built with raqm, skipped")
+        locales = [l for l in locales if l not in rtl]
+    if not locales:
+        return 1
+
+    print(f"🌐 Rendering {len(names)} banner(s) in {', '.join(locales)}...\n")
+    t0 = time.perf_counter()
+    results, missing = render_locales(locales, names, args.out, args.jobs)
+    elapsed = time.perf_counter() - t0
+    for locale, name, path, seconds in results:
+        print(f"  🖼  {locale:<5} {name:<9} {seconds * 1000:6.1f} ms  {path}")
+    for locale, chars in sorted(missing.items()):
+        print(f"⚠️  {locale}: no installed font covers {''.join(sorted(chars))}")
+    print(f"\n✅ {len(results)} banners in {elapsed:.2f}s → {args.out}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("localize_banners", main))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Kairos 777 — Favicon Bundle Generator
+Decodes website/kairos-logo.png once and emits, with the smallest lossless
+encoding found for each image:
+  • favicon.ico (16/32/48, PNG-compressed entries)
+  • kairos-logo-{32,64,128,256}.png
+  • kairos-logo-32.svg / kairos-icon-32.svg (minimal data-URI wrappers)
+and prints the <link> tags for the page <head>.
+
+Usage: python3 scripts/make-favicons.py [--links FILE]
+"""
+
+import argparse
+import base64
+import io
+import os
+import struct
+import sys
+
+from PIL import Image
+
+import build_metrics
+from optimize_images import optimize_png
+from output_store import OutputStore
+from resize_pyramid import ResizePyramid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE = os.path.join(ROOT, "website")
+SOURCE = os.path.join(SITE, "kairos-logo.png")
+
+ICO_SIZES = [16, 32, 48]
+PNG_SIZES = [32, 64, 128, 256]
+SVG_SIZE = 32
+SVG_PATHS = [
+    os.path.join(SITE, "kairos-logo-32.svg"),
+    os.path.join(SITE, "kairos-icon-32.svg"),
+    os.path.join(ROOT, "assets", "branding", "kairos-icon-32.svg"),
+]
+
+LINK_TAGS = """\
+<link rel="icon" href="/favicon.ico" sizes="16x16 32x32 48x48" />
+<link rel="icon" type="image/svg+xml" href="/kairos-logo-32.svg" />
+<link rel="icon" type="image/png" sizes="32x32" href="/kairos-logo-32.png" />
+<link rel="apple-touch-icon" href="/kairos-logo-256.png" />"""
+
+
+def smallest_png(img):
+    """Encode with Pillow, then keep the optimizer's result if smaller."""
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return optimize_png(buf.getvalue())
+
+
+def build_ico(entries):
+    """ICO container with PNG payloads; entries are (size, png_bytes)."""
+    header = struct.pack("<HHH", 0, 1, len(entries))
+    offset = len(header) + 16 * len(entries)
+    directory, payload = [], []
+    for size, png in entries:
+        dim = 0 if size >= 256 else size  # 0 means 256 in the ICO directory
+        directory.append(struct.pack("<BBBBHHII", dim, dim, 0, 0, 1, 32, len(png), offset))
+        payload.append(png)
+        offset += len(png)
+    return header + b"".join(directory) + b"".join(payload)
+
+
+def build_svg(png, size):
+    """The smallest SVG wrapper that browsers render as a favicon."""
+    b64 = base64.b64encode(png).decode("ascii")
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{size}" height="{size}"><image width="{size}" height="{size}" '
+            f'xlink:href="data:image/png;base64,{b64}"/></svg>\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the website favicon bundle.")
+    parser.add_argument("--links", help="also write the <link> tags to this file")
+    args = parser.parse_args(argv)
+
+    store = OutputStore()
+    with build_metrics.asset("favicons"):
+        write_bundle(store)
+    if args.links:
+        store.publish((LINK_TAGS + "\n").encode(), args.links)
+    print(f"\n{LINK_TAGS}\n\n  📦 {store.summary()}")
+
+
+def write_bundle(store):
+    """favicon.ico, the PNG sizes and the SVG wrapper, from one decode."""
+    pyramid = ResizePyramid(SOURCE)  # the one and only decode
+    images = pyramid.get_many(sorted(set(ICO_SIZES + PNG_SIZES + [SVG_SIZE])))
+    with build_metrics.encoding():
+        pngs = {size[0]: smallest_png(img) for size, img in images.items()}
+
+    ico = build_ico([(s, pngs[s]) for s in ICO_SIZES])
+    store.publish(ico, os.path.join(SITE, "favicon.ico"))
+    print(f"  ✅ favicon.ico ({', '.join(map(str, ICO_SIZES))}): {len(ico):,} bytes")
+
+    for size in PNG_SIZES:
+        store.publish(pngs[size], os.path.join(SITE, f"kairos-logo-{size}.png"))
+        print(f"  ✅ kairos-logo-{size}.png: {len(pngs[size]):,} bytes")
+
+    svg = build_svg(pngs[SVG_SIZE], SVG_SIZE).encode()
+    store.publish(svg, SVG_PATHS)
+    print(f"  ✅ kairos-logo-32.svg (+{len(SVG_PATHS) - 1} copies): {len(svg):,} bytes")
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("make-favicons", main))
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Kairos 777 — Lossless Image Optimizer
+Recompresses every PNG/JPEG under the configured trees in parallel:
+exact palette/grayscale/alpha reduction, filter + deflate strategy trials
+for PNG, and metadata stripping. Files already known to be optimal are
+skipped by hash on later runs.
+
+Usage: python3 scripts/optimize_images.py [paths...] [--jobs N] [--dry-run]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import argparse
+import io
+import json
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+import build_metrics
+from output_store import CACHE_ROOT, atomic_write, sha256_bytes
+from png_encode import encode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(CACHE_ROOT, "optimized-images.json")
+
+# ─── Trees scanned by default ───────────────────────────────────
+TREES = [
+    "simulator-screenshot.png",
+    "assets/branding",
+    "assets/promo",
+    "website",
+    "kairos-trade/public",
+    "kairos-wallet/public",
+    "kairos-exchange/public",
+    "kairos-extension/public",
+    "kairos-extension/cws-assets",
+    "kairos-trade/android/app/src/main/res",
+    "kairos-wallet/android/app/src/main/res",
+    "kairos-trade/ios/App/App/Assets.xcassets",
+    "kairos-wallet/ios/App/App/Assets.xcassets",
+]
+
+EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Colour chunks are kept so pixels render identically; everything else
+# (text, timestamps, EXIF, physical size) is stripped
+PNG_FILTERS = ("none", "sub", "up", "paeth", "adaptive")
+PNG_STRATEGIES = ("filtered", "rle")
+
+# JPEG segments that never affect decoding: APP1..APP13, APP15 and COM.
+# APP0 (JFIF), APP2 (ICC) and APP14 (Adobe colour transform) are kept.
+JPEG_STRIP = {0xE1, 0xE3, 0xE4, 0xE5, 0xE6, 0xE7, 0xE8, 0xE9, 0xEA,
+              0xEB, 0xEC, 0xED, 0xEF, 0xFE}
+
+
+# ═══════════════════════════════════════════════════════════════
+# PNG
+# ═══════════════════════════════════════════════════════════════
+def png_representations(rgba, allow_gray=True):
+    """
+    Every exact, lossless way to store an RGBA array: palette when the
+    colours fit in 256, grayscale when R == G == B, and no alpha channel
+    when everything is opaque. Yields (mode, pixels, bit_depth, palette, trns).
+    """
+    h, w, _ = rgba.shape
+    opaque = bool((rgba[..., 3] == 255).all())
+    gray = allow_gray and bool(((rgba[..., 0] == rgba[..., 1]) & (rgba[..., 1] == rgba[..., 2])).all())
+
+    if gray:
+        if opaque:
+            yield "L", rgba[..., 0], 8, None, None
+        else:
+            yield "LA", rgba[..., [0, 3]], 8, None, None
+    elif opaque:
+        yield "RGB", rgba[..., :3], 8, None, None
+    else:
+        yield "RGBA", rgba, 8, None, None
+
+    packed = rgba.view(np.uint32).reshape(h, w)
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) <= 256:
+        entries = colors.view(np.uint8).reshape(-1, 4)
+        # Translucent entries first keeps the tRNS chunk as short as possible
+        order = np.argsort(entries[:, 3] == 255, kind="stable")
+        entries = entries[order]
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        indices = remap[indices.reshape(h, w)]
+        n = len(entries)
+        depth = 1 if n <= 2 else 2 if n <= 4 else 4 if n <= 16 else 8
+        translucent = int((entries[:, 3] < 255).sum())
+        trns = entries[:translucent, 3].tobytes() if translucent else None
+        yield "P", indices, depth, entries[:, :3].tobytes(), trns
+
+
+def color_chunks(img):
+    """The colour-management chunks worth keeping from the source PNG."""
+    chunks = []
+    if "icc_profile" in img.info:
+        chunks.append((b"iCCP", b"icc\x00\x00" + zlib.compress(img.info["icc_profile"])))
+    elif "srgb" in img.info:
+        chunks.append((b"sRGB", bytes([img.info["srgb"]])))
+    elif "gamma" in img.info:
+        chunks.append((b"gAMA", struct.pack(">I", round(img.info["gamma"] * 100000))))
+    return chunks
+
+
+def decoded_rgba(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert("RGBA"))
+
+
+def optimize_png(data):
+    """Smallest lossless re-encoding of a PNG, or the input if none is smaller."""
+    # Pillow decodes 16-bit RGB(A) to 8 bits, so the lossless check below
+    # would compare against already-truncated pixels: IHDR bit depth is byte 24
+    if len(data) > 24 and data[24] == 16:
+        return data
+    with Image.open(io.BytesIO(data)) as img:
+        if img.mode not in ("1", "L", "LA", "P", "RGB", "RGBA") or getattr(img, "is_animated", False):
+            return data
+        extra = color_chunks(img)
+        rgba = np.asarray(img.convert("RGBA"))
+
+    # Stage 1: every representation x filter at the default strategy
+    trials, best = [], None
+    # An RGB ICC profile is invalid on a grayscale PNG
+    reps = png_representations(rgba, allow_gray=not any(tag == b"iCCP" for tag, _ in extra))
+    for mode, pixels, depth, palette, trns in reps:
+        filters = ("none", "sub", "up") if mode == "P" else PNG_FILTERS
+        for f in filters:
+            out = encode(pixels, mode, depth, palette, trns, filter=f, extra_chunks=extra)
+            trials.append((len(out), (mode, pixels, depth, palette, trns, f)))
+            if best is None or len(out) < len(best):
+                best = out
+    trials.sort(key=lambda t: t[0])
+
+    # Stage 2: the alternative deflate strategies on the two best candidates
+    for _, (mode, pixels, depth, palette, trns, f) in trials[:2]:
+        for strategy in PNG_STRATEGIES:
+            out = encode(pixels, mode, depth, palette, trns, filter=f,
+                         strategy=strategy, extra_chunks=extra)
+            if len(out) < len(best):
+                best = out
+
+    if len(best) >= len(data) or not np.array_equal(decoded_rgba(best), rgba):
+        return data
+    return best
+
+
+# ═══════════════════════════════════════════════════════════════
+# JPEG
+# ═══════════════════════════════════════════════════════════════
+def _keeps_orientation(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return img.getexif().get(0x0112, 1) != 1
+
+
+def optimize_jpeg(data):
+    """Drop metadata segments; the entropy-coded image data is untouched."""
+    if data[:2] != b"\xff\xd8":
+        return data
+    keep_exif = _keeps_orientation(data)
+    out = [data[:2]]
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return data
+        marker = data[i + 1]
+        if marker == 0xDA:  # start of scan: copy the rest verbatim
+            out.append(data[i:])
+            break
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        segment = data[i:i + 2 + length]
+        if marker not in JPEG_STRIP or (marker == 0xE1 and keep_exif and segment[4:8] == b"Exif"):
+            out.append(segment)
+        i += 2 + length
+    else:
+        return data
+    result = b"".join(out)
+    return result if len(result) < len(data) else data
+
+
+# ═══════════════════════════════════════════════════════════════
+# Driver
+# ═══════════════════════════════════════════════════════════════
+def optimize_file(path):
+    """Optimize one file's bytes; returns (size_before, optimized_bytes)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.lower().endswith(".png"):
+        return len(data), optimize_png(data)
+    return len(data), optimize_jpeg(data)
+
+
+def _optimize_job(path):
+    """Worker: optimize_file measured as one asset; returns (size_before, bytes, metrics)."""
+    with build_metrics.asset(os.path.relpath(path, ROOT)) as item:
+        with build_metrics.encoding():
+            before, out = optimize_file(path)
+        build_metrics.output(min(before, len(out)), build_metrics.output_format(path))
+    return before, out, item
+
+
+def collect(paths):
+    files = []
+    for p in paths:
+        p = os.path.join(ROOT, p) if not os.path.isabs(p) else p
+        if os.path.isfile(p):
+            files.append(p)
+            continue
+        for dirpath, dirnames, filenames in os.walk(p):
+            dirnames[:] = [d for d in dirnames if d not in ("node_modules", ".git")]
+            files += [os.path.join(dirpath, f) for f in filenames
+                      if f.lower().endswith(EXTENSIONS)]
+    return sorted(set(files))
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return set()
+
+
+def save_cache(digests):
+    atomic_write(CACHE_PATH, json.dumps(sorted(digests)).encode())
+
+
+def fmt_bytes(n):
+    return f"{n / 1024:,.1f} KB" if n < 1 << 20 else f"{n / (1 << 20):,.2f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Losslessly optimize repository images.")
+    parser.add_argument("paths", nargs="*", default=TREES, help="files or directories (default: configured trees)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--dry-run", action="store_true", help="report savings without writing")
+    args = parser.parse_args(argv)
+
+    cache = load_cache()
+    # Byte-identical copies (the logo ships in five places) are optimized once
+    groups, skipped = {}, 0
+    for path in collect(args.paths):
+        with open(path, "rb") as f:
+            digest = sha256_bytes(f.read())
+        if digest in cache:
+            skipped += 1
+            with build_metrics.asset(os.path.relpath(path, ROOT)):
+                build_metrics.cache_hit()
+                build_metrics.output_file(path)
+        else:
+            groups.setdefault(digest, []).append(path)
+
+    n_files = sum(len(g) for g in groups.values())
+    print(f"🗜  {n_files} images to optimize ({len(groups)} unique, {skipped} already optimal)\n")
+    total_before = total_after = 0
+    with ProcessPoolExecutor(args.jobs) as pool:
+        firsts = [paths[0] for paths in groups.values()]
+        for paths, (before, out, item) in zip(groups.values(), pool.map(_optimize_job, firsts, chunksize=1)):
+            build_metrics.add(item)
+            after = len(out)
+            for path in paths:
+                total_before += before
+                total_after += after
+                if after < before and not args.dry_run:
+                    atomic_write(path, out)
+                rel = os.path.relpath(path, ROOT)
+                if after < before:
+                    print(f"  ✅ {rel}: {fmt_bytes(before)} → {fmt_bytes(after)} (-{100 * (before - after) / before:.1f}%)")
+                else:
+                    print(f"  ·  {rel}: already optimal")
+            if not args.dry_run:
+                cache.add(sha256_bytes(out))
+
+    if not args.dry_run:
+        save_cache(cache)
+    saved = total_before - total_after
+    pct = 100 * saved / total_before if total_before else 0
+    print(f"\n📉 Saved {fmt_bytes(saved)} of {fmt_bytes(total_before)} ({pct:.1f}%)"
+          + (" — dry run, nothing written" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("optimize_images", main))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Content-addressed output store for generated assets.
+Every unique output is stored once by SHA-256 and materialized at each
+destination by reflink, falling back to a copy; destinations are never
+hardlinked, so they stay independent, writable files. A destination
+whose bytes are already identical is never rewritten, so its mtime stays
+put for Gradle/Xcode/Vite caches. All writes go through temp file + rename.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import build_metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_ROOT = os.path.join(ROOT, ".asset-cache")
+STORE_DIR = os.path.join(CACHE_ROOT, "objects")
+
+FICLONE = 0x40049409  # Linux ioctl: share extents copy-on-write
+
+# Read once at import: os.umask can only be queried by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def atomic_write(path, data):
+    """
+    Write bytes to path via a temp file in the same directory + rename.
+    The file keeps the mode of the one it replaces; a new file gets the
+    usual 0666 & ~umask rather than mkstemp's 0600.
+    """
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-")
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+class OutputStore:
+    """Stores outputs once by hash and publishes them to destinations."""
+
+    def __init__(self, store_dir=STORE_DIR, link=True):
+        self.store_dir = store_dir
+        self.link = link
+        self.stats = {"unchanged": 0, "reflinked": 0, "copied": 0}
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest):
+        return os.path.join(self.store_dir, digest[:2], digest[2:])
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def put(self, data):
+        """Store bytes once; returns their digest."""
+        digest = sha256_bytes(data)
+        obj = self._object_path(digest)
+        if not os.path.exists(obj):
+            atomic_write(obj, data)
+            # Read-only so nothing that opens the store can edit an object
+            # that other outputs are deduplicated against
+            os.chmod(obj, 0o444)
+        return digest
+
+    def has(self, digest):
+        return os.path.exists(self._object_path(digest))
+
+    def get(self, digest):
+        """Bytes of a stored object."""
+        with open(self._object_path(digest), "rb") as f:
+            return f.read()
+
+    def put_file(self, path):
+        with open(path, "rb") as f:
+            return self.put(f.read())
+
+    def _is_current(self, dest, digest):
+        if not os.path.isfile(dest):
+            return False
+        obj = self._object_path(digest)
+        try:
+            # A hardlink into the store (left by older builds) is read-only
+            # and shares the object's inode: replace it with a copy
+            if os.path.samefile(dest, obj):
+                return False
+        except OSError:
+            pass
+        if os.path.getsize(dest) != os.path.getsize(obj):
+            return False
+        return sha256_file(dest) == digest
+
+    def materialize(self, digest, dest):
+        """Place a stored object at dest; returns how it was placed."""
+        if self._is_current(dest, digest):
+            self._count("unchanged")
+            return "unchanged"
+        obj = self._object_path(digest)
+        d = os.path.dirname(dest) or "."
+        os.makedirs(d, exist_ok=True)
+        tmp = os.path.join(d, f".tmp-{digest[:16]}-{os.getpid()}-{threading.get_ident()}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        how = "copied"
+        if self.link and _reflink(obj, tmp):
+            how = "reflinked"
+        else:
+            shutil.copyfile(obj, tmp)
+        os.replace(tmp, dest)
+        self._count(how)
+        return how
+
+    def publish(self, data, dests):
+        """Store bytes once and materialize them at every destination."""
+        if isinstance(dests, str):
+            dests = [dests]
+        digest = self.put(data)
+        build_metrics.output(len(data), build_metrics.output_format(dests[0]))
+        return [self.materialize(digest, dest) for dest in dests]
+
+    def publish_file(self, src, dests):
+        with open(src, "rb") as f:
+            return self.publish(f.read(), dests)
+
+    def save_image(self, img, dests, fmt="PNG", **params):
+        """Encode an image in memory and publish it like Image.save would."""
+        buf = io.BytesIO()
+        with build_metrics.encoding():
+            img.save(buf, fmt, **params)
+        return self.publish(buf.getvalue(), dests)
+
+    def summary(self):
+        return "  ".join(f"{k}: {v}" for k, v in self.stats.items())
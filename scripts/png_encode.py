@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Minimal PNG encoder with explicit filter and deflate strategy control.
+Pillow always picks its own row filters; the optimizer needs to try each
+filter and zlib strategy and keep the smallest stream. PngWriter encodes
+incrementally, for images rendered strip by strip.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG colour type and channel count per Pillow mode
+COLOR_TYPES = {"L": 0, "RGB": 2, "P": 3, "LA": 4, "RGBA": 6}
+CHANNELS = {"L": 1, "RGB": 3, "P": 1, "LA": 2, "RGBA": 4}
+
+FILTERS = ("none", "sub", "up", "average", "paeth", "adaptive")
+STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+}
+
+
+def chunk(tag, data):
+    """Serialize one PNG chunk: length, tag, data, CRC."""
+    return (struct.pack(">I", len(data)) + tag + data +
+            struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def ihdr(width, height, mode, bit_depth=8):
+    return chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bit_depth,
+                                      COLOR_TYPES[mode], 0, 0, 0))
+
+
+def pack_bits(indices, bit_depth):
+    """Pack an (h, w) array of palette indices into 1/2/4-bit rows."""
+    if bit_depth == 8:
+        return indices.astype(np.uint8)
+    per_byte = 8 // bit_depth
+    h, w = indices.shape
+    padded = np.zeros((h, -(-w // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :w] = indices
+    groups = padded.reshape(h, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * bit_depth
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def _shift_right(rows, bpp):
+    """Left neighbour of every byte (zero for the first pixel)."""
+    left = np.zeros_like(rows)
+    left[:, bpp:] = rows[:, :-bpp]
+    return left
+
+
+def _paeth(a, b, c):
+    a = a.astype(np.int16)
+    b = b.astype(np.int16)
+    c = c.astype(np.int16)
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c)).astype(np.uint8)
+
+
+def filter_rows(rows, bpp, method, prev=None):
+    """
+    Apply a PNG filter to (h, stride) uint8 rows; returns (h, stride + 1)
+    with the filter-type byte prepended. prev is the raw row above the first
+    one, for callers that filter an image in strips.
+    """
+    rows = np.ascontiguousarray(rows, dtype=np.uint8)
+    up = np.empty_like(rows)
+    up[0] = 0 if prev is None else prev
+    up[1:] = rows[:-1]
+    left = _shift_right(rows, bpp)
+
+    def residual(kind):
+        if kind == "none":
+            return rows
+        if kind == "sub":
+            return rows - left
+        if kind == "up":
+            return rows - up
+        if kind == "average":
+            return rows - ((left.astype(np.uint16) + up) >> 1).astype(np.uint8)
+        upleft = _shift_right(up, bpp)
+        return rows - _paeth(left, up, upleft)
+
+    if method == "adaptive":
+        # Per row, pick the filter with the smallest sum of absolute
+        # signed residuals (the heuristic libpng uses)
+        kinds = FILTERS[:5]
+        candidates = np.stack([residual(k) for k in kinds])
+        cost = np.stack([np.abs(c.view(np.int8).astype(np.int16)).sum(axis=1) for c in candidates])
+        best = cost.argmin(axis=0)
+        out = candidates[best, np.arange(rows.shape[0])]
+        types = best.astype(np.uint8)
+    else:
+        out = residual(method)
+        types = np.full(rows.shape[0], FILTERS.index(method), dtype=np.uint8)
+    return np.concatenate([types[:, None], out], axis=1)
+
+
+def encode(pixels, mode, bit_depth=8, palette=None, trns=None,
+           filter="adaptive", level=9, strategy="default", extra_chunks=()):
+    """
+    Encode an (h, w[, channels]) uint8 array as PNG bytes. For mode "P",
+    pixels are palette indices and palette is a flat RGB byte string.
+    extra_chunks are (tag, data) pairs written before the image data.
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8)
+    h, w = pixels.shape[:2]
+    if mode == "P":
+        rows = pack_bits(pixels, bit_depth)
+        bpp = 1
+    else:
+        bpp = CHANNELS[mode]
+        rows = pixels.reshape(h, w * bpp)
+    raw = filter_rows(rows, bpp, filter)
+
+    comp = zlib.compressobj(level, zlib.DEFLATED, 15, 9, STRATEGIES[strategy])
+    idat = comp.compress(raw.tobytes()) + comp.flush()
+
+    out = [PNG_SIGNATURE, ihdr(w, h, mode, bit_depth)]
+    out += [chunk(tag, data) for tag, data in extra_chunks]
+    if palette is not None:
+        out.append(chunk(b"PLTE", bytes(palette)))
+    if trns:
+        out.append(chunk(b"tRNS", bytes(trns)))
+    out.append(chunk(b"IDAT", idat))
+    out.append(chunk(b"IEND", b""))
+    return b"".join(out)
+
+
+class PngWriter:
+    """
+    Streaming PNG encoder. Rows arrive in strips of any height, are
+    filtered against the last row of the previous strip and deflated
+    immediately; IDAT chunks are written as compressed data accumulates,
+    so memory stays bounded by the strip size. Filtering itself needs
+    several temporaries per byte, so strips are filtered filter_size raw
+    bytes at a time.
+    """
+
+    def __init__(self, fileobj, width, height, mode="RGB", level=6, filter="adaptive",
+                 strategy="default", idat_size=1 << 18, filter_size=1 << 20):
+        self.file = fileobj
+        self.width, self.height, self.mode = width, height, mode
+        self.bpp = CHANNELS[mode]
+        self.filter = filter
+        self.idat_size = idat_size
+        self.block_rows = max(1, filter_size // (width * self.bpp))
+        self.rows_written = 0
+        self._prev = None
+        self._pending = []
+        self._pending_size = 0
+        self._comp = zlib.compressobj(level, zlib.DEFLATED, 15, 9, STRATEGIES[strategy])
+        self.file.write(PNG_SIGNATURE + ihdr(width, height, mode))
+
+    def write_rows(self, pixels):
+        """Append an (h, width[, channels]) uint8 strip."""
+        pixels = np.asarray(pixels, dtype=np.uint8)
+        n = pixels.shape[0]
+        if self.rows_written + n > self.height:
+            raise ValueError(f"PNG has {self.height} rows; got {self.rows_written + n}")
+        # Strided views (e.g. RGB of an RGBA buffer) are flattened a block
+        # at a time, never as a whole
+        for start in range(0, n, self.block_rows):
+            block = pixels[start:start + self.block_rows].reshape(-1, self.width * self.bpp)
+            raw = filter_rows(block, self.bpp, self.filter, self._prev)
+            self._prev = block[-1].copy()
+            self._emit(self._comp.compress(raw.tobytes()))
+        self.rows_written += n
+
+    def _emit(self, data, final=False):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= self.idat_size or (final and self._pending_size):
+            self.file.write(chunk(b"IDAT", b"".join(self._pending)))
+            self._pending, self._pending_size = [], 0
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"PNG has {self.height} rows; only {self.rows_written} written")
+        self._emit(self._comp.flush(), final=True)
+        self.file.write(chunk(b"IEND", b""))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Live price cards: the trading banner re-rendered from a tick feed.
+Ticks arrive asynchronously from a pluggable source and land in per-pair
+ring buffers that aggregate them into OHLC bars incrementally. A pair's
+card is re-rendered when its schedule comes due or when its price has
+moved past a threshold since the last render. Renders run in a process
+pool, each worker drawing the quote over its cached render of the static
+chrome, so ingest never waits on Pillow.
+
+Sources (--source):
+  file:PATH             follow a file of ticks as it grows (from the start)
+  tcp:HOST:PORT         newline-delimited ticks from a socket
+  replay:PATH[@SPEED]   recorded ticks, re-timed (SPEED 0 = as fast as possible)
+
+A tick is a JSON line {"ts": 1718000000.5, "pair": "BTC/USDT", "price": 96482.3}
+or a CSV line ts,pair,price. `feed` writes a random-walk stand-in feed.
+
+`batch` renders one card per pair of a pair list (trading-pairs.json):
+price, change and bot stats from the list, candles from recorded ticks
+when given or a deterministic series ending at the listed price. The
+chrome is rendered once and handed to every worker.
+
+Usage: python3 scripts/price_cards.py serve --source SRC [--pairs A,B] [--interval S]
+                                         [--threshold PCT] [--bar S] [--out DIR] [--jobs N]
+       python3 scripts/price_cards.py feed (--file PATH | --port N) [--pairs A,B]
+                                        [--rate N] [--seconds S] [--realtime]
+       python3 scripts/price_cards.py batch [--pairs-file FILE] [--ticks FILE] [--out DIR]
+                                         [--jobs N]
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+import build_metrics
+import generate_promo_banners as banners
+from canvas import Canvas
+
+OUT_DIR = os.path.join(banners.OUT, "live")
+BATCH_DIR = os.path.join(banners.OUT, "pairs")
+PAIRS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trading-pairs.json")
+DEFAULT_PAIRS = {"BTC/USDT": 96482.30, "ETH/USDT": 3450.00, "SOL/USDT": 180.00}
+CANDLES = 40
+
+Tick = namedtuple("Tick", "ts pair price")
+
+
+def parse_tick(line):
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        d = json.loads(line)
+        tick = Tick(float(d["ts"]), d["pair"], float(d["price"]))
+    else:
+        ts, pair, price = line.split(",")
+        tick = Tick(float(ts), pair.strip(), float(price))
+    # format_price needs a positive, finite price (and nan would poison the bars)
+    if not (math.isfinite(tick.price) and tick.price > 0):
+        raise ValueError(f"bad price {tick.price!r}")
+    return tick
+
+
+def _split_lines(pending, data):
+    """Complete lines from pending + data, and the trailing partial line."""
+    *lines, rest = (pending + data).split("\n")
+    return lines, rest
+
+
+def _parse_batch(lines):
+    ticks = []
+    for line in lines:
+        try:
+            tick = parse_tick(line)
+        except (ValueError, KeyError):
+            continue  # a malformed tick is dropped, not fatal
+        if tick:
+            ticks.append(tick)
+    return ticks
+
+
+# ═══════════════════════════════════════════════════════════════
+# Per-pair ring buffers
+# ═══════════════════════════════════════════════════════════════
+class PairBuffer:
+    """
+    The recent ticks and OHLC bars of one pair, in fixed-size numpy rings.
+    The open bar is kept as plain floats and updated per tick; it is
+    written to the bar ring when a tick opens the next one.
+    """
+
+    def __init__(self, pair, bar_seconds=60, tick_capacity=4096, bar_capacity=256):
+        self.pair = pair
+        self.bar_seconds = bar_seconds
+        self.ticks = np.zeros((tick_capacity, 2))  # ts, price
+        self.bars = np.zeros((bar_capacity, 5))  # start, open, high, low, close
+        self.tick_count = 0
+        self.bar_count = 0  # closed bars
+        self.late = 0  # ticks older than the open bar, dropped
+        self.current = None  # [start, open, high, low, close]
+
+    @property
+    def last(self):
+        return self.current[4] if self.current else None
+
+    def add(self, ts, price):
+        start = ts - ts % self.bar_seconds
+        bar = self.current
+        if bar is not None and start < bar[0]:
+            self.late += 1
+            return
+        i = self.tick_count % len(self.ticks)
+        self.ticks[i, 0] = ts
+        self.ticks[i, 1] = price
+        self.tick_count += 1
+        if bar is not None and start == bar[0]:
+            if price > bar[2]:
+                bar[2] = price
+            elif price < bar[3]:
+                bar[3] = price
+            bar[4] = price
+            return
+        if bar is not None:
+            self.bars[self.bar_count % len(self.bars)] = bar
+            self.bar_count += 1
+        self.current = [start, price, price, price, price]
+
+    def recent_ticks(self, n=None):
+        """Up to n latest (ts, price) rows, oldest first."""
+        k = min(n or len(self.ticks), self.tick_count, len(self.ticks))
+        idx = (np.arange(self.tick_count - k, self.tick_count)) % len(self.ticks)
+        return self.ticks[idx]
+
+    def ohlc(self, n):
+        """The latest n bars (open bar included) as (start, open, high, low, close) rows."""
+        if self.current is None:
+            return np.zeros((0, 5))
+        k = min(n - 1, self.bar_count, len(self.bars))
+        idx = np.arange(self.bar_count - k, self.bar_count) % len(self.bars)
+        return np.vstack([self.bars[idx], [self.current]])
+
+
+def format_price(price):
+    # Sub-dollar pairs keep four significant digits after the zeros
+    decimals = 2 if price >= 1 else min(10, 3 - math.floor(math.log10(price)))
+    return f"${price:,.{decimals}f}"
+
+
+def format_span(seconds):
+    if seconds >= 86400 and seconds % 86400 == 0:
+        return f"{seconds // 86400:g}d"
+    if seconds >= 3600:
+        return f"{seconds / 3600:g}h"
+    return f"{max(1, round(seconds / 60)):g}m"
+
+
+def quote(pair, price, pct, span, bars, count=CANDLES, bots=None):
+    """record_trading_quote keywords."""
+    up = pct >= 0
+    return {
+        "pair": pair.replace("/", " / "),
+        "price": format_price(price),
+        "change": f"{'▲' if up else '▼'} {pct:+.2f}% ({span})",
+        "color": banners.GREEN if up else banners.RED,
+        "bars": bars,
+        "count": count,
+        "bots": bots,
+    }
+
+
+def quote_for(buf, count=CANDLES, bots=None):
+    """Quote keywords for a pair buffer's current state."""
+    bars = buf.ohlc(count)
+    first_open, last = bars[0, 1], buf.last
+    pct = (last / first_open - 1) * 100 if first_open else 0.0
+    span = bars[-1, 0] + buf.bar_seconds - bars[0, 0]
+    return quote(buf.pair, last, pct, format_span(span),
+                 [tuple(b) for b in bars[:, 1:].tolist()], count, bots)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Rendering (worker processes)
+# ═══════════════════════════════════════════════════════════════
+_chrome = None
+
+
+def _init_worker(chrome=None):
+    """Set up a worker's chrome: handed over as an array, or rendered here."""
+    global _chrome
+    if chrome is None:
+        _chrome = banners.record_trading_chrome().render_canvas()
+    else:
+        _chrome = Canvas((chrome.shape[1], chrome.shape[0]), None, chrome)
+
+
+def render_card(quote, out_path):
+    """Draw a quote over a copy of the cached chrome and save it; returns seconds."""
+    t0 = time.perf_counter()
+    if _chrome is None:
+        _init_worker()
+    canvas = _chrome.copy()
+    banners.record_trading_quote(**quote).replay(canvas)
+    canvas.save_png(out_path)
+    return time.perf_counter() - t0
+
+
+def _measured_card(quote, out_path):
+    """render_card as one build_metrics asset; returns the Asset."""
+    with build_metrics.asset(os.path.basename(out_path)) as item:
+        render_card(quote, out_path)
+    return item
+
+
+def card_path(out_dir, pair):
+    return os.path.join(out_dir, pair.lower().replace("/", "-") + ".png")
+
+
+# ═══════════════════════════════════════════════════════════════
+# Sources: async iterators of tick batches
+# ═══════════════════════════════════════════════════════════════
+class FileTailSource:
+    def __init__(self, path, poll=0.05):
+        self.path = path
+        self.poll = poll
+
+    async def batches(self):
+        while not os.path.exists(self.path):
+            await asyncio.sleep(self.poll)
+        pending = ""
+        with open(self.path) as f:
+            while True:
+                data = f.read(1 << 16)
+                if not data:
+                    await asyncio.sleep(self.poll)
+                    continue
+                lines, pending = _split_lines(pending, data)
+                yield _parse_batch(lines)
+
+
+class SocketSource:
+    def __init__(self, host, port):
+        self.host, self.port = host, int(port)
+
+    async def batches(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        pending = ""
+        try:
+            while True:
+                data = await reader.read(1 << 16)
+                if not data:
+                    break
+                lines, pending = _split_lines(pending, data.decode("utf-8", "replace"))
+                yield _parse_batch(lines)
+        finally:
+            writer.close()
+
+
+class ReplaySource:
+    """Recorded ticks paced by their timestamps / speed; speed 0 replays flat out."""
+
+    CHUNK = 1 << 16  # bytes of lines parsed at a time
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = float(speed)
+
+    async def batches(self):
+        t0 = wall0 = None
+        with open(self.path) as f:
+            while True:
+                ticks = _parse_batch(f.readlines(self.CHUNK))
+                if not ticks:
+                    if f.tell() == os.fstat(f.fileno()).st_size:
+                        return
+                    continue
+                if self.speed <= 0:
+                    yield ticks
+                    await asyncio.sleep(0)
+                    continue
+                if t0 is None:
+                    t0, wall0 = ticks[0].ts, time.monotonic()
+                i = 0
+                while i < len(ticks):
+                    now = t0 + (time.monotonic() - wall0) * self.speed
+                    j = bisect.bisect_right(ticks, now, i, key=lambda t: t.ts)
+                    if j > i:
+                        yield ticks[i:j]
+                        i = j
+                    else:
+                        await asyncio.sleep(min(0.05, (ticks[i].ts - now) / self.speed))
+
+
+def open_source(spec):
+    kind, _, arg = spec.partition(":")
+    if kind == "file":
+        return FileTailSource(arg)
+    if kind == "tcp":
+        host, _, port = arg.rpartition(":")
+        return SocketSource(host or "127.0.0.1", port)
+    if kind == "replay":
+        path, _, speed = arg.partition("@")
+        return ReplaySource(path, speed or 1.0)
+    raise ValueError(f"unknown source {spec!r} (file:PATH, tcp:HOST:PORT, replay:PATH[@SPEED])")
+
+
+# ═══════════════════════════════════════════════════════════════
+# Service
+# ═══════════════════════════════════════════════════════════════
+class CardService:
+    def __init__(self, pairs=None, out_dir=OUT_DIR, interval=60.0, threshold=0.5,
+                 bar_seconds=60, jobs=None, quiet=False):
+        self.pairs = set(pairs) if pairs else None  # None: every pair seen
+        self.out_dir = out_dir
+        self.interval = interval
+        self.threshold = threshold
+        self.bar_seconds = bar_seconds
+        self.jobs = jobs or min(4, os.cpu_count() or 1)
+        self.quiet = quiet
+        self.buffers = {}
+        self.rendered = {}  # pair -> (price, monotonic time) of the last render
+        self._inflight = {}
+        self._again = set()
+        self.ticks = 0
+        self.renders = []
+        self.max_lag = 0.0
+        self.elapsed = 0.0
+
+    def buffer(self, pair):
+        buf = self.buffers.get(pair)
+        if buf is None and (self.pairs is None or pair in self.pairs):
+            buf = self.buffers[pair] = PairBuffer(pair, self.bar_seconds)
+        return buf
+
+    def ingest(self, batch):
+        touched = set()
+        for tick in batch:
+            buf = self.buffer(tick.pair)
+            if buf is not None:
+                buf.add(tick.ts, tick.price)
+                touched.add(buf)
+        self.ticks += len(batch)
+        for buf in touched:
+            last = self.rendered.get(buf.pair)
+            if last is None or abs(buf.last / last[0] - 1) * 100 >= self.threshold:
+                self.request(buf.pair, "move" if last else "first")
+
+    def request(self, pair, reason):
+        if pair in self._inflight:
+            self._again.add(pair)  # coalesce: one follow-up render with the latest state
+            return
+        buf = self.buffers[pair]
+        self.rendered[pair] = (buf.last, time.monotonic())
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool, render_card, quote_for(buf), card_path(self.out_dir, pair))
+        self._inflight[pair] = future
+        future.add_done_callback(lambda f: self._done(pair, reason, f))
+
+    def _done(self, pair, reason, future):
+        del self._inflight[pair]
+        try:
+            seconds = future.result()
+        except Exception as e:
+            print(f"  ❌ {pair}: {e}")
+        else:
+            self.renders.append(seconds)
+            if not self.quiet:
+                print(f"  🖼  {pair:<10} {format_price(self.rendered[pair][0]):>14}  "
+                      f"{reason:<8} {seconds * 1000:6.1f} ms")
+        # A move that arrived mid-render is re-rendered even if this one failed
+        if pair in self._again:
+            self._again.discard(pair)
+            self.request(pair, "move")
+
+    async def _schedule(self):
+        while True:
+            await asyncio.sleep(min(self.interval, 1.0))
+            now = time.monotonic()
+            for pair, (_, at) in list(self.rendered.items()):
+                if now - at >= self.interval:
+                    self.request(pair, "schedule")
+
+    async def _watch_lag(self, period=0.01):
+        """Longest the event loop was blocked, i.e. how late ingest could be."""
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(period)
+            self.max_lag = max(self.max_lag, time.perf_counter() - t0 - period)
+
+    async def _ingest(self, source):
+        async for batch in source.batches():
+            self.ingest(batch)
+
+    async def run(self, source, duration=None):
+        os.makedirs(self.out_dir, exist_ok=True)
+        with ProcessPoolExecutor(self.jobs, initializer=_init_worker) as self._pool:
+            helpers = [asyncio.create_task(self._schedule()), asyncio.create_task(self._watch_lag())]
+            await asyncio.sleep(0)  # start the helpers before ingest takes the loop
+            t0 = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._ingest(source), duration)
+            except asyncio.TimeoutError:
+                pass
+            self.elapsed = time.perf_counter() - t0
+            for task in helpers:
+                task.cancel()
+            # Let in-flight renders and their coalesced follow-ups finish
+            while self._inflight:
+                await asyncio.gather(*self._inflight.values())
+
+    def summary(self):
+        rate = self.ticks / self.elapsed if self.elapsed else 0
+        mean = 1000 * sum(self.renders) / len(self.renders) if self.renders else 0
+        return (f"{self.ticks} ticks in {self.elapsed:.2f}s ({rate:,.0f}/s), "
+                f"{len(self.renders)} renders ({mean:.1f} ms mean), "
+                f"max ingest stall {self.max_lag * 1000:.1f} ms")
+
+
+# ═══════════════════════════════════════════════════════════════
+# Batch: one card per listed pair
+# ═══════════════════════════════════════════════════════════════
+def load_pairs(path=PAIRS_FILE):
+    with open(path) as f:
+        data = json.load(f)
+    span = data.get("span", "24h")
+    return [dict(entry, span=entry.get("span", span)) for entry in data["pairs"]]
+
+
+def synthetic_bars(pair, price, pct, count=CANDLES):
+    """
+    A plausible OHLC series for a pair, deterministic per pair, moving
+    pct percent over count bars and closing exactly at price.
+    """
+    rng = random.Random(pair)
+    drift = math.log1p(pct / 100) / count
+    vol = max(abs(drift) * 2, 0.004)
+    steps = [drift + rng.gauss(0, vol) for _ in range(count)]
+    # Bridge: remove the noise's net drift so the walk ends where it should
+    bias = sum(steps) / count - drift
+    close = price / (1 + pct / 100)
+    bars = []
+    for step in steps:
+        open_p, close = close, close * math.exp(step - bias)
+        wick = abs(rng.gauss(0, vol / 2))
+        bars.append((open_p, max(open_p, close) * (1 + wick),
+                     min(open_p, close) * (1 - abs(rng.gauss(0, vol / 2))), close))
+    o, h, l, _ = bars[-1]
+    bars[-1] = (o, max(h, price), min(l, price), price)
+    return bars
+
+
+def pair_bots(entry):
+    """Bot cards for a pair: the listed bots, or the standard three with seeded stats."""
+    pair = entry["pair"]
+    listed = entry.get("bots")
+    if listed is None:
+        rng = random.Random(f"bots:{pair}")
+        listed = [(name, "Paused" if rng.random() < 0.25 else "Running",
+                   f"+${rng.randrange(200, 9000):,}", f"{rng.uniform(55, 75):.1f}%")
+                  for name, *_ in banners.TRADING_BOTS]
+    return [(name, pair, status, pnl, wr, banners.GREEN if status == "Running" else banners.GOLD)
+            for name, status, pnl, wr in listed[:3]]
+
+
+def pair_quote(entry, buf=None):
+    """Quote for a listed pair: from its tick buffer if it has one, else from the list."""
+    bots = pair_bots(entry)
+    if buf is not None and buf.last is not None:
+        return quote_for(buf, bots=bots)
+    return quote(entry["pair"], entry["price"], entry["change"], entry["span"],
+                 synthetic_bars(entry["pair"], entry["price"], entry["change"]), bots=bots)
+
+
+def render_batch(entries, out_dir=BATCH_DIR, jobs=None, buffers=None):
+    """
+    Render every listed pair's card; returns [(pair, path, seconds)].
+    The chrome (without bot cards) is rendered once here and handed to
+    the workers, which only draw the per-pair quote and bot row.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with build_metrics.asset("chrome"):
+        chrome = banners.record_trading_chrome(bots=()).render_canvas()
+    buffers = buffers or {}
+    jobs = min(jobs or os.cpu_count() or 1, len(entries))
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(chrome.array,)) as pool:
+        futures = [(e["pair"], card_path(out_dir, e["pair"]),
+                    pool.submit(_measured_card, pair_quote(e, buffers.get(e["pair"])),
+                                card_path(out_dir, e["pair"])))
+                   for e in entries]
+        results = []
+        for pair, path, future in futures:
+            item = future.result()
+            build_metrics.add(item)
+            results.append((pair, path, item.render_s + item.encode_s))
+        return results
+
+
+def buffers_from_ticks(path, bar_seconds=60):
+    buffers = {}
+    with open(path) as f:
+        for tick in _parse_batch(f):
+            buf = buffers.get(tick.pair) or buffers.setdefault(tick.pair, PairBuffer(tick.pair, bar_seconds))
+            buf.add(tick.ts, tick.price)
+    return buffers
+
+
+# ═══════════════════════════════════════════════════════════════
+# Stand-in feed
+# ═══════════════════════════════════════════════════════════════
+def random_walk(pairs, rate, seconds, start=None, seed=None):
+    """Yield ticks: a random walk per pair, rate ticks per simulated second in total."""
+    rng = random.Random(seed)
+    prices = {p: DEFAULT_PAIRS.get(p, 100.0) for p in pairs}
+    ts = time.time() if start is None else start
+    for i in range(int(rate * seconds)):
+        pair = pairs[i % len(pairs)]
+        prices[pair] *= math.exp(rng.gauss(0, 0.0004))
+        yield Tick(ts + i / rate, pair, round(prices[pair], 8))
+
+
+def _tick_line(tick):
+    return json.dumps(tick._asdict()) + "\n"
+
+
+async def serve_feed(port, ticks, rate):
+    """Serve the ticks to every client over TCP, paced at rate per second."""
+    ticks = list(ticks)
+
+    async def client(reader, writer):
+        wall0 = time.monotonic()
+        for i in range(0, len(ticks), 256):
+            writer.write("".join(_tick_line(t) for t in ticks[i:i + 256]).encode())
+            await writer.drain()
+            await asyncio.sleep(max(0, wall0 + (i + 256) / rate - time.monotonic()))
+        writer.close()
+
+    server = await asyncio.start_server(client, "127.0.0.1", port)
+    print(f"📡 Serving {len(ticks)} ticks on tcp:127.0.0.1:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def write_feed(path, ticks, rate, realtime):
+    wall0 = time.monotonic()
+    with open(path, "a") as f:
+        for i, tick in enumerate(ticks, 1):
+            f.write(_tick_line(tick))
+            if realtime and i % 256 == 0:
+                f.flush()
+                time.sleep(max(0, wall0 + i / rate - time.monotonic()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live price cards from a tick feed.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="ingest ticks and keep the cards fresh")
+    serve.add_argument("--source", required=True, help="file:PATH, tcp:HOST:PORT or replay:PATH[@SPEED]")
+    serve.add_argument("--pairs", help="comma-separated pairs to render (default: every pair seen)")
+    serve.add_argument("--interval", type=float, default=60, help="re-render every S seconds")
+    serve.add_argument("--threshold", type=float, default=0.5, help="re-render on a move of PCT percent")
+    serve.add_argument("--bar", type=int, default=60, help="candle width in seconds")
+    serve.add_argument("--out", default=OUT_DIR, help="output directory")
+    serve.add_argument("--jobs", type=int, help="render processes")
+    serve.add_argument("--duration", type=float, help="stop after S seconds")
+    serve.add_argument("--quiet", action="store_true")
+
+    feed = sub.add_parser("feed", help="write or serve a random-walk stand-in feed")
+    target = feed.add_mutually_exclusive_group(required=True)
+    target.add_argument("--file", help="append ticks to this file")
+    target.add_argument("--port", type=int, help="serve ticks over TCP")
+    feed.add_argument("--pairs", default=",".join(DEFAULT_PAIRS))
+    feed.add_argument("--rate", type=float, default=2000, help="ticks per second")
+    feed.add_argument("--seconds", type=float, default=60, help="feed duration")
+    feed.add_argument("--realtime", action="store_true", help="pace file writes to the wall clock")
+    feed.add_argument("--seed", type=int)
+    batch = sub.add_parser("batch", help="render one card per pair of a pair list")
+    batch.add_argument("--pairs-file", default=PAIRS_FILE, help="pair list (JSON)")
+    batch.add_argument("--only", help="comma-separated subset of the listed pairs")
+    batch.add_argument("--ticks", help="recorded ticks (JSON/CSV lines) for real candles and prices")
+    batch.add_argument("--bar", type=int, default=60, help="candle width in seconds, with --ticks")
+    batch.add_argument("--out", default=BATCH_DIR, help="output directory")
+    batch.add_argument("--jobs", type=int, help="render processes")
+    args = parser.parse_args(argv)
+
+    if args.command == "batch":
+        entries = load_pairs(args.pairs_file)
+        if args.only:
+            wanted = set(args.only.split(","))
+            entries = [e for e in entries if e["pair"] in wanted]
+        t0 = time.perf_counter()
+        buffers = buffers_from_ticks(args.ticks, args.bar) if args.ticks else None
+        with build_metrics.recording("price_cards", argv):
+            results = render_batch(entries, args.out, args.jobs, buffers)
+        elapsed = time.perf_counter() - t0
+        for pair, path, seconds in results:
+            print(f"  🖼  {pair:<11} {seconds * 1000:6.1f} ms  {path}")
+        print(f"\n✅ {len(results)} cards in {elapsed:.2f}s → {args.out}/")
+        return 0
+
+    if args.command == "feed":
+        ticks = random_walk(args.pairs.split(","), args.rate, args.seconds, seed=args.seed)
+        if args.port:
+            try:
+                asyncio.run(serve_feed(args.port, ticks, args.rate))
+            except KeyboardInterrupt:
+                pass
+        else:
+            write_feed(args.file, ticks, args.rate, args.realtime)
+            print(f"✅ {int(args.rate * args.seconds)} ticks written to {args.file}")
+        return 0
+
+    service = CardService(args.pairs.split(",") if args.pairs else None, args.out, args.interval,
+                          args.threshold, args.bar, args.jobs, args.quiet)
+    print(f"📈 Price cards from {args.source} → {args.out}/")
+    try:
+        asyncio.run(service.run(open_source(args.source), args.duration))
+    except KeyboardInterrupt:
+        pass
+    print(f"\n{service.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Kairos 777 — On-demand render server for dynamic social images.
+A small asyncio HTTP server that renders the banners' live variants per
+request instead of committing PNGs:
+
+  GET /stats.png?pairs=33%2B&leverage=150×&peg=$1.00&chains=4&brokers=10
+        the Twitter banner with its bottom stats bar filled in
+  GET /card/BTC-USDT.png?price=96500&change=3.2&span=24h
+        a pair's price card with its bot P&L row (price_cards.py); listed
+        pairs default to trading-pairs.json, others need price and change
+  GET /og.png?title=...&description=...&url=...
+        an Open Graph card (generate_og_images.py)
+  GET /health
+        cache, coalescing and latency counters as JSON
+
+Every image also takes quality=full|high|draft (the effect-layer quality)
+and budget=MS, a render time budget capped by --budget.
+
+Renders run in a process pool. Each worker loads the fonts and logos and
+renders every kind's static layer (the ops its recordings share whatever
+the parameters, found with DisplayList.shared_prefix) once at start-up,
+then draws each request over a copy. Responses are cached by a hash of
+their parameters, least recently used first out past --cache-mb, and
+carry an ETag; If-None-Match is answered 304. Identical requests that
+arrive while a render is in flight wait on that render instead of
+starting their own. A request whose render overruns its budget gets 503
+with Retry-After; the render still finishes and is cached for the retry.
+
+`load` is a local load generator: keep-alive clients requesting a mix of
+repeated and unique images, reporting throughput and p50/p90/p99
+latency. Without --url it starts a server on a free port first.
+
+Usage: python3 scripts/render_server.py serve [--host H] [--port N] [--jobs N]
+                                              [--cache-mb N] [--budget MS]
+       python3 scripts/render_server.py load [--url URL] [--requests N]
+                                             [--concurrency N] [--unique F] [--jobs N]
+"""
+
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, quote as urlquote, unquote, urlsplit
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import generate_og_images as og
+import generate_promo_banners as banners
+import price_cards
+from display_list import DEFAULT_QUALITY, QUALITY, DisplayList
+
+DEFAULT_PORT = 8777
+
+# Card parameters beyond these overflow the chart math and fail to render
+MAX_PRICE = 1e12
+MAX_CHANGE = 1e4
+
+# Keys of the stats bar cells, in banners.MAIN_STATS order
+STAT_KEYS = ("pairs", "leverage", "peg", "chains", "brokers")
+
+_pairs = {}
+
+
+def listed_pairs():
+    """{"BTC/USDT": entry} from trading-pairs.json, loaded once per process."""
+    if not _pairs:
+        _pairs.update((e["pair"], e) for e in price_cards.load_pairs())
+    return _pairs
+
+
+# ═══════════════════════════════════════════════════════════════
+# Image kinds
+# parse_* turns a query into canonical parameters (ValueError on bad
+# input, LookupError on an unknown image); record_* draws them.
+# ═══════════════════════════════════════════════════════════════
+def _text(query, key, limit=200):
+    value = query.get(key)
+    if value is not None and len(value) > limit:
+        raise ValueError(f"{key} is longer than {limit} characters")
+    return value
+
+
+def _number(query, key):
+    if key not in query:
+        return None
+    try:
+        value = float(query[key])
+    except ValueError:
+        raise ValueError(f"{key} must be a number") from None
+    if not math.isfinite(value):
+        raise ValueError(f"{key} must be finite")
+    return value
+
+
+def parse_stats(query):
+    return {k: v for k in STAT_KEYS if (v := _text(query, k, 12)) is not None}
+
+
+def record_stats(params):
+    stats = [(params.get(key, value), label, color)
+             for key, (value, label, color) in zip(STAT_KEYS, banners.MAIN_STATS)]
+    return banners.record_main_banner(stats=stats)
+
+
+def parse_card(name, query):
+    pair = unquote(name).upper().replace("-", "/")
+    if len(pair) > 20:
+        raise ValueError("pair is longer than 20 characters")
+    entry = listed_pairs().get(pair, {})
+    params = {"pair": pair, "price": _number(query, "price"), "change": _number(query, "change"),
+              "span": _text(query, "span", 8)}
+    for key in ("price", "change", "span"):
+        if params[key] is None:
+            params[key] = entry.get(key, "24h" if key == "span" else None)
+    if params["price"] is None or params["change"] is None:
+        raise LookupError(f"{pair} is not a listed pair; give price and change")
+    if not 0 < params["price"] < MAX_PRICE:
+        raise ValueError(f"price must be positive and below {MAX_PRICE:g}")
+    if not -100 < params["change"] <= MAX_CHANGE:
+        raise ValueError(f"change must be above -100% and at most {MAX_CHANGE:g}%")
+    return params
+
+
+def record_card(params):
+    pair, price, change = params["pair"], params["price"], params["change"]
+    entry = dict(listed_pairs().get(pair, {}), pair=pair)
+    q = price_cards.quote(pair, price, change, params["span"],
+                          price_cards.synthetic_bars(pair, price, change), bots=price_cards.pair_bots(entry))
+    return banners.record_trading_chrome(bots=()).extend(banners.record_trading_quote(**q))
+
+
+def parse_og(query):
+    if not query.get("title"):
+        raise ValueError("title is required")
+    return {"title": _text(query, "title"), "description": _text(query, "description", 400) or "",
+            "url": _text(query, "url") or "https://kairos-777.com/"}
+
+
+def record_og(params):
+    return og.record_og_card(params["title"], params["description"], params["url"])
+
+
+# kind: (record, probes); the probes are two parameter sets whose
+# recordings differ wherever a request's can, so the ops they share are
+# the kind's static layer
+KINDS = {
+    "stats": (record_stats, ({}, {key: "0" for key in STAT_KEYS})),
+    "card": (record_card, ({"pair": "BTC/USDT", "price": 96482.3, "change": 3.24, "span": "24h"},
+                           {"pair": "ETH/USDT", "price": 3452.18, "change": -2.87, "span": "1h"})),
+    "og": (record_og, ({"title": "A", "description": "", "url": "https://kairos-777.com/"},
+                       {"title": "B", "description": "b", "url": "https://kairos-777.com/b"})),
+}
+
+
+def route(target):
+    """(kind, params, quality, budget ms or None) for a request target; raises LookupError/ValueError."""
+    parts = urlsplit(target)
+    query = dict(parse_qsl(parts.query))
+    quality = query.pop("quality", DEFAULT_QUALITY)
+    if quality not in QUALITY:
+        raise ValueError(f"quality must be one of {', '.join(QUALITY)}")
+    budget = _number(query, "budget")
+    if budget is not None and budget <= 0:
+        raise ValueError("budget must be positive")
+    query.pop("budget", None)
+    path = parts.path
+    if path == "/stats.png":
+        return "stats", parse_stats(query), quality, budget
+    if path.startswith("/card/") and path.endswith(".png"):
+        return "card", parse_card(path[len("/card/"):-len(".png")], query), quality, budget
+    if path == "/og.png":
+        return "og", parse_og(query), quality, budget
+    raise LookupError(f"no route for {path}")
+
+
+def cache_key(kind, params, quality):
+    return hashlib.sha256(json.dumps([kind, params, quality], sort_keys=True).encode()).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Rendering (worker processes)
+# ═══════════════════════════════════════════════════════════════
+_templates = {}
+
+
+def _template(kind, quality):
+    """(static layer canvas, ops it covers, the recording it came from) of a kind."""
+    key = (kind, quality)
+    if key not in _templates:
+        record, probes = KINDS[kind]
+        first, second = (record(p) for p in probes)
+        n = first.shared_prefix(second)
+        prefix = DisplayList(first.size, first.color)
+        prefix.ops = first.ops[:n]
+        _templates[key] = (prefix.render_canvas(quality=quality), n, first)
+    return _templates[key]
+
+
+def _init_worker():
+    """Load fonts and logos and render every static layer before the first request."""
+    for kind in KINDS:
+        _template(kind, DEFAULT_QUALITY)
+
+
+def render(kind, params, quality):
+    """Worker: (PNG bytes, ETag, seconds) of one image, drawn over its kind's static layer."""
+    t0 = time.perf_counter()
+    dlist = KINDS[kind][0](params)
+    base, n, template = _template(kind, quality)
+    if dlist.shared_prefix(template) >= n:
+        tail = DisplayList(dlist.size, dlist.color)
+        tail.ops = dlist.ops[n:]
+        canvas = base.copy()
+        tail.replay(canvas, quality=quality)
+    else:
+        # Parameters reached into the static layer: draw everything
+        canvas = dlist.render_canvas(quality=quality)
+    body = canvas.png_bytes()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag, time.perf_counter() - t0
+
+
+# ═══════════════════════════════════════════════════════════════
+# Server
+# ═══════════════════════════════════════════════════════════════
+class ResponseCache:
+    """Rendered responses by parameter hash; least recently used evicted past max_bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (etag, body)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, etag, body):
+        if len(body) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old[1])
+        self._entries[key] = (etag, body)
+        self.bytes += len(body)
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values), max(1, math.ceil(p / 100 * len(values)))) - 1]
+
+
+class RenderServer:
+    def __init__(self, jobs=None, cache_bytes=64 << 20, budget=2000, max_age=60):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = ResponseCache(cache_bytes)
+        self.budget = budget  # ms
+        self.max_age = max_age
+        self.counts = {"requests": 0, "hits": 0, "renders": 0, "coalesced": 0,
+                       "not_modified": 0, "over_budget": 0, "errors": 0}
+        self.render_times = deque(maxlen=1000)
+        self._inflight = {}
+        self._pool = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self._pool = ProcessPoolExecutor(self.jobs, initializer=_init_worker)
+        # One task per worker so every process starts and warms up now
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, os.getpid) for _ in range(self.jobs)))
+        listed_pairs()
+        self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ── Rendering ──
+    def _rendered(self, key, future):
+        del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        body, etag, seconds = future.result()
+        self.cache.put(key, etag, body)
+        self.render_times.append(seconds)
+
+    async def image(self, kind, params, quality, budget):
+        """(etag, body) of an image: cached, joined to an in-flight render, or rendered."""
+        key = cache_key(kind, params, quality)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.counts["hits"] += 1
+            return entry
+        future = self._inflight.get(key)
+        if future is None:
+            self.counts["renders"] += 1
+            future = asyncio.get_running_loop().run_in_executor(self._pool, render, kind, params, quality)
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._rendered(key, f))
+        else:
+            self.counts["coalesced"] += 1
+        try:
+            # shield: a request giving up must not cancel the render others wait on
+            body, etag, _ = await asyncio.wait_for(asyncio.shield(future), budget / 1000)
+        except asyncio.TimeoutError:
+            raise BudgetExceeded(f"render exceeded the {budget:g} ms budget") from None
+        return etag, body
+
+    # ── HTTP ──
+    def health(self):
+        times = sorted(self.render_times)
+        return dict(self.counts, cached=len(self.cache), cache_bytes=self.cache.bytes,
+                    evictions=self.cache.evictions, inflight=len(self._inflight),
+                    render_p50_ms=round(percentile(times, 50) * 1000, 1),
+                    render_p99_ms=round(percentile(times, 99) * 1000, 1))
+
+    async def respond(self, method, target, headers):
+        """(status, headers, body) for one request."""
+        self.counts["requests"] += 1
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b"only GET and HEAD\n"
+        if urlsplit(target).path == "/health":
+            return 200, {"Content-Type": "application/json"}, json.dumps(self.health()).encode()
+        try:
+            kind, params, quality, budget = route(target)
+        except LookupError as e:
+            return 404, {}, f"{e}\n".encode()
+        except ValueError as e:
+            return 400, {}, f"{e}\n".encode()
+        budget = min(budget or self.budget, self.budget)
+        try:
+            etag, body = await self.image(kind, params, quality, budget)
+        except BudgetExceeded as e:
+            self.counts["over_budget"] += 1
+            return 503, {"Retry-After": "1"}, f"{e}\n".encode()
+        except Exception as e:
+            self.counts["errors"] += 1
+            return 500, {}, f"render failed: {e}\n".encode()
+        cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if etag in (t.strip() for t in headers.get("if-none-match", "").split(",")):
+            self.counts["not_modified"] += 1
+            return 304, cache_headers, b""
+        return 200, dict(cache_headers, **{"Content-Type": "image/png"}), body
+
+    async def handle(self, reader, writer):
+        """One connection: HTTP/1.1 requests until the client closes or asks to."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while (header := await reader.readline()).strip():
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                status, extra, body = await self.respond(method, target, headers)
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep else 'close'}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                if "Content-Type" not in extra and status != 304:
+                    head.append("Content-Type: text/plain; charset=utf-8")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Load generator
+# ═══════════════════════════════════════════════════════════════
+def load_targets(n, unique, seed=None):
+    """
+    n request targets: a hot set of repeated images (cache hits once
+    rendered) with a fraction unique of one-off parameters (renders).
+    """
+    rng = random.Random(seed)
+    pairs = [p.replace("/", "-") for p in listed_pairs()]
+    hot = ["/stats.png", "/og.png?title=Kairos%20777"] + [f"/card/{p}.png" for p in pairs[:8]]
+    targets = []
+    for i in range(n):
+        if rng.random() >= unique:
+            targets.append(rng.choice(hot))
+        elif i % 3 == 0:
+            targets.append(f"/stats.png?pairs={rng.randrange(34, 999)}%2B")
+        elif i % 3 == 1:
+            pair = rng.choice(pairs)
+            targets.append(f"/card/{pair}.png?price={rng.uniform(1, 99999):.2f}&change={rng.uniform(-9, 9):.2f}")
+        else:
+            targets.append("/og.png?title=" + urlquote(f"Kairos report #{rng.randrange(1 << 30)}"))
+    return targets
+
+
+async def _fetch(reader, writer, host, target):
+    """One keep-alive GET; returns (status, body length)."""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (header := await reader.readline()).strip():
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status, length
+
+
+async def run_load(url, targets, concurrency):
+    """Latencies (seconds, sorted) and {status: count} of fetching every target."""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    queue = deque(targets)
+    latencies, statuses = [], {}
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while queue:
+                target = queue.popleft()
+                t0 = time.perf_counter()
+                status, _ = await _fetch(reader, writer, parts.netloc, target)
+                latencies.append(time.perf_counter() - t0)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return sorted(latencies), statuses
+
+
+async def load(args):
+    server = None
+    url = args.url
+    if not url:
+        server = RenderServer(args.jobs, args.cache_mb << 20, args.budget)
+        host, port = await server.start("127.0.0.1", 0)
+        url = f"http://{host}:{port}"
+    try:
+        targets = load_targets(args.requests, args.unique, args.seed)
+        print(f"🔥 {len(targets)} requests, {args.concurrency} clients, "
+              f"{args.unique:.0%} unique → {url}\n")
+        t0 = time.perf_counter()
+        latencies, statuses = await run_load(url, targets, args.concurrency)
+        elapsed = time.perf_counter() - t0
+    finally:
+        if server:
+            health = server.health()
+            await server.close()
+    ms = lambda p: percentile(latencies, p) * 1000
+    print(f"  {len(latencies)} responses in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} req/s)")
+    print(f"  status  {'  '.join(f'{s}: {n}' for s, n in sorted(statuses.items()))}")
+    print(f"  latency p50 {ms(50):.1f} ms  p90 {ms(90):.1f} ms  p99 {ms(99):.1f} ms  max {ms(100):.1f} ms")
+    if server:
+        print(f"  server  {health['renders']} renders, {health['hits']} cache hits, "
+              f"{health['coalesced']} coalesced, {health['over_budget']} over budget, "
+              f"render p50 {health['render_p50_ms']} ms")
+    return 0 if set(statuses) <= {200, 304} else 1
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main
+# ═══════════════════════════════════════════════════════════════
+async def serve(args):
+    server = RenderServer(args.jobs, args.cache_mb << 20, args.budget, args.max_age)
+    host, port = await server.start(args.host, args.port)
+    print(f"🖼  Rendering on http://{host}:{port}/ with {server.jobs} workers "
+          f"({args.cache_mb} MB cache, {args.budget:g} ms budget)")
+    await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="On-demand render server for dynamic social images.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help in (("serve", "serve images over HTTP"), ("load", "measure latency under load")):
+        p = sub.add_parser(name, help=help)
+        p.add_argument("--jobs", type=int, help="render processes (default: CPUs)")
+        p.add_argument("--cache-mb", type=int, default=64, help="response cache size")
+        p.add_argument("--budget", type=float, default=2000, help="longest render a request waits for (ms)")
+        if name == "serve":
+            p.add_argument("--host", default="127.0.0.1")
+            p.add_argument("--port", type=int, default=DEFAULT_PORT)
+            p.add_argument("--max-age", type=int, default=60, help="Cache-Control max-age (s)")
+        else:
+            p.add_argument("--url", help="server to load (default: start one on a free port)")
+            p.add_argument("--requests", type=int, default=500)
+            p.add_argument("--concurrency", type=int, default=16, help="keep-alive clients")
+            p.add_argument("--unique", type=float, default=0.1, help="fraction of one-off images")
+            p.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        return asyncio.run(load(args))
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
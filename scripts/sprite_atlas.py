@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Sprite atlases for the small icons the website and web apps load one by
+one. Each atlas in sprite-atlases.json lists icons (source image and CSS
+size); they are packed with MaxRects (best short side fit) into one sheet,
+or several once max_size is reached, and written as:
+  <atlas>.png, <atlas>@2x.png, ...   one sheet per scale, same layout
+  <atlas>.json                       icon -> sheet, x, y, w, h (CSS px)
+  <atlas>.css                        .<class>-<icon> background rules, with
+                                     the @2x sheet swapped in on HiDPI
+Icons are separated by `padding` transparent pixels so filtering never
+samples a neighbour.
+
+Builds are incremental: sources are hashed (by mtime and size first), each
+resized tile is kept in the output store by source hash, size and scale,
+and a sheet is only re-composited and re-encoded when its tiles or layout
+change. Changing one icon decodes one source and rewrites only its sheets.
+
+Usage: python3 scripts/sprite_atlas.py [atlas ...] [--manifest FILE] [--force]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+import build_metrics
+from canvas import Canvas
+from output_store import CACHE_ROOT, ROOT, OutputStore, atomic_write, sha256_file
+from resize_pyramid import ResizePyramid, WORKERS
+
+MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sprite-atlases.json")
+CACHE_PATH = os.path.join(CACHE_ROOT, "sprite-atlases.json")
+
+# Bump when tile resizing or sheet encoding changes so caches are rebuilt
+ATLAS_VERSION = 1
+
+
+# ═══════════════════════════════════════════════════════════════
+# MaxRects packing
+# ═══════════════════════════════════════════════════════════════
+def _contains(a, b):
+    """True if rect a = (x, y, w, h) contains rect b."""
+    return (a[0] <= b[0] and a[1] <= b[1] and
+            a[0] + a[2] >= b[0] + b[2] and a[1] + a[3] >= b[1] + b[3])
+
+
+class MaxRects:
+    """
+    One bin of the MaxRects packer: the free space is kept as the list of
+    maximal free rectangles, which may overlap. Placement uses best short
+    side fit.
+    """
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.free = [(0, 0, width, height)]
+
+    def find(self, w, h):
+        """Best (x, y) for a w x h rect, or None if it does not fit."""
+        best, best_score = None, None
+        for fx, fy, fw, fh in self.free:
+            if fw >= w and fh >= h:
+                dw, dh = fw - w, fh - h
+                score = (min(dw, dh), max(dw, dh), fy, fx)
+                if best_score is None or score < best_score:
+                    best, best_score = (fx, fy), score
+        return best
+
+    def place(self, x, y, w, h):
+        """Carve x, y, w, h out of every free rect it overlaps."""
+        kept, added = [], []
+        for f in self.free:
+            fx, fy, fw, fh = f
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                kept.append(f)
+                continue
+            if x > fx:
+                added.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                added.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                added.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                added.append((fx, y + h, fw, fy + fh - y - h))
+        # Only the new pieces can be redundant: drop those inside another
+        # rect, and the old ones a new piece swallows
+        added = [a for i, a in enumerate(added)
+                 if not any(_contains(b, a) and (b != a or j < i) for j, b in enumerate(added) if j != i)]
+        added = [a for a in added if not any(_contains(k, a) for k in kept)]
+        kept = [k for k in kept if not any(_contains(a, k) for a in added)]
+        self.free = kept + added
+
+    def insert(self, w, h):
+        pos = self.find(w, h)
+        if pos is not None:
+            self.place(*pos, w, h)
+        return pos
+
+
+def _pow2(n):
+    return 1 << max(0, int(n - 1).bit_length())
+
+
+def pack(sizes, padding=0, max_size=2048):
+    """
+    Pack (w, h) sizes into as few sheets as needed, each at most max_size
+    square. Returns ([(sheet, x, y)] in input order, [(sheet_w, sheet_h)]).
+    Every rect keeps `padding` px from its neighbours and the sheet edge.
+    """
+    for w, h in sizes:
+        if w + 2 * padding > max_size or h + 2 * padding > max_size:
+            raise ValueError(f"{w}x{h} icon does not fit a {max_size}px sheet")
+    # Largest first; the order only affects packing quality, not the output map
+    order = sorted(range(len(sizes)), key=lambda i: (-max(sizes[i]), -min(sizes[i]), i))
+    placed = [None] * len(sizes)
+    sheets = []
+    remaining = order
+    while remaining:
+        area = sum((sizes[i][0] + padding) * (sizes[i][1] + padding) for i in remaining)
+        w = h = min(max_size, _pow2(int(area ** 0.5)))
+        while True:
+            # The bin is inset by padding so the first row/column keeps it too
+            bin_ = MaxRects(w - padding, h - padding)
+            spots = [(i, bin_.insert(sizes[i][0] + padding, sizes[i][1] + padding)) for i in remaining]
+            fits = [(i, pos) for i, pos in spots if pos is not None]
+            if len(fits) == len(remaining) or (w >= max_size and h >= max_size):
+                break
+            # Grow one side at a time so a small overflow does not quadruple the sheet
+            if h < w or w >= max_size:
+                h = min(max_size, h * 2)
+            else:
+                w = min(max_size, w * 2)
+        n = len(sheets)
+        right = bottom = 0
+        for i, (x, y) in fits:
+            placed[i] = (n, x + padding, y + padding)
+            right = max(right, x + padding + sizes[i][0])
+            bottom = max(bottom, y + padding + sizes[i][1])
+        sheets.append((right + padding, bottom + padding))
+        done = {i for i, _ in fits}
+        remaining = [i for i in remaining if i not in done]
+    return placed, sheets
+
+
+# ═══════════════════════════════════════════════════════════════
+# Icons and tiles
+# ═══════════════════════════════════════════════════════════════
+def load_manifest(path=MANIFEST):
+    with open(path) as f:
+        return json.load(f)
+
+
+def atlas_icons(spec):
+    """{name: (source path, size)} with globs expanded (name = file stem)."""
+    icons = {}
+    for include in spec.get("include", []):
+        for path in sorted(glob.glob(os.path.join(ROOT, include["glob"]))):
+            icons[os.path.splitext(os.path.basename(path))[0]] = (path, include["size"])
+    for name, icon in spec.get("icons", {}).items():
+        icons[name] = (os.path.join(ROOT, icon["source"]), icon["size"])
+    return icons
+
+
+def fit_size(source_size, size):
+    """CSS size of an icon: size x size, or the source aspect fitted into it."""
+    if not isinstance(size, int):
+        return tuple(size)
+    sw, sh = source_size
+    if sw == sh:
+        return size, size
+    if sw > sh:
+        return size, max(1, round(size * sh / sw))
+    return max(1, round(size * sw / sh)), size
+
+
+class SourceIndex:
+    """Content hash and dimensions per source file, re-read only when its stat changes."""
+
+    def __init__(self, entries):
+        self.entries = entries  # path -> [mtime_ns, size, sha256, w, h]
+
+    def lookup(self, path):
+        st = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is None or entry[:2] != [st.st_mtime_ns, st.st_size]:
+            with Image.open(path) as img:
+                w, h = img.size
+            entry = [st.st_mtime_ns, st.st_size, sha256_file(path), w, h]
+            self.entries[path] = entry
+        return entry[2], (entry[3], entry[4])
+
+
+def tile_key(source_digest, size, scale):
+    w, h = size
+    return f"{source_digest}:{w * scale}x{h * scale}:v{ATLAS_VERSION}"
+
+
+def render_tiles(jobs, store):
+    """
+    Resize every {key: (source, (w, h) px)} job, one decode per source, and
+    store the raw RGBA tiles; returns {key: digest}.
+    """
+    by_source = {}
+    for key, (path, px) in jobs.items():
+        by_source.setdefault(path, []).append((key, px))
+
+    def render(path):
+        pyramid = ResizePyramid(path)
+        images = pyramid.get_many([px for _, px in by_source[path]])
+        return {key: store.put(np.asarray(images[px].convert("RGBA")).tobytes())
+                for key, px in by_source[path]}
+
+    digests = {}
+    with ThreadPoolExecutor(WORKERS) as pool:
+        for result in pool.map(render, by_source):
+            digests.update(result)
+    return digests
+
+
+def load_tile(store, digest, size):
+    return np.frombuffer(store.get(digest), dtype=np.uint8).reshape(size[1], size[0], 4)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Sheets, map and CSS
+# ═══════════════════════════════════════════════════════════════
+def sheet_name(atlas, sheet, count, scale):
+    base = atlas if count == 1 else f"{atlas}-{sheet + 1}"
+    return base + ("" if scale == 1 else f"@{scale:g}x") + ".png"
+
+
+def compose_sheet(store, size, tiles, scale):
+    """Sheet PNG bytes from [(digest, x, y, w, h)] tiles in CSS px."""
+    sheet = Canvas((size[0] * scale, size[1] * scale))
+    for digest, x, y, w, h in tiles:
+        px = (w * scale, h * scale)
+        sheet.array[y * scale:y * scale + px[1], x * scale:x * scale + px[0]] = load_tile(store, digest, px)
+    return sheet.png_bytes(mode="RGBA", level=9, filter="adaptive")
+
+
+def atlas_css(prefix, atlas_map):
+    sheets = atlas_map["sheets"]
+    lines = [f".{prefix} {{ display: inline-block; background-repeat: no-repeat; }}"]
+    for n, sheet in enumerate(sheets):
+        names = [name for name, icon in atlas_map["icons"].items() if icon["sheet"] == n]
+        selector = ",\n".join(f".{prefix}-{name}" for name in names)
+        w, h = sheet["size"]
+        lines.append(f"{selector} {{\n  background-image: url({sheet['image']});\n"
+                     f"  background-size: {w}px {h}px;\n}}")
+    for name, icon in atlas_map["icons"].items():
+        lines.append(f".{prefix}-{name} {{ width: {icon['w']}px; height: {icon['h']}px; "
+                     f"background-position: -{icon['x']}px -{icon['y']}px; }}")
+    for scale in sorted({s for sheet in sheets for s in sheet["scales"]}, key=float):
+        rules = []
+        for n, sheet in enumerate(sheets):
+            names = [name for name, icon in atlas_map["icons"].items() if icon["sheet"] == n]
+            selector = ", ".join(f".{prefix}-{name}" for name in names)
+            rules.append(f"  {selector} {{ background-image: url({sheet['scales'][scale]}); }}")
+        dpi = round(96 * float(scale))
+        lines.append(f"@media (-webkit-min-device-pixel-ratio: {scale}), (min-resolution: {dpi}dpi) {{\n"
+                     + "\n".join(rules) + "\n}")
+    return "\n".join(lines) + "\n"
+
+
+def build_atlas(name, spec, store, index, cache, force=False):
+    """Build one atlas; returns (outputs written {path: how}, tiles rendered)."""
+    scales = spec.get("scales", [1])
+    padding = spec.get("padding", 2)
+    icons = atlas_icons(spec)
+    names = list(icons)
+
+    digests, sizes = {}, []
+    for icon in names:
+        path, size = icons[icon]
+        digest, source_size = index.lookup(path)
+        digests[path] = digest
+        sizes.append(fit_size(source_size, size))
+
+    placed, sheet_sizes = pack(sizes, padding, spec.get("max_size", 2048))
+
+    # Tiles not in the cache (or missing from the store) are rendered
+    tiles = cache.setdefault("tiles", {})
+    jobs = {}
+    for icon, size in zip(names, sizes):
+        path = icons[icon][0]
+        for scale in scales:
+            key = tile_key(digests[path], size, scale)
+            if force or key not in tiles or not store.has(tiles[key]):
+                jobs[key] = (path, (size[0] * scale, size[1] * scale))
+    build_metrics.cache_hit(len(names) * len(scales) - len(jobs))
+    tiles.update(render_tiles(jobs, store))
+
+    out_dir = os.path.join(ROOT, spec["out"])
+    sheet_cache = cache.setdefault("sheets", {})
+    outputs = {}
+    atlas_map = {"sheets": [], "icons": {}}
+    for n, sheet_size in enumerate(sheet_sizes):
+        members = [(icon, size, pos) for icon, size, pos in zip(names, sizes, placed) if pos[0] == n]
+        entry = {"image": sheet_name(name, n, len(sheet_sizes), 1), "size": list(sheet_size), "scales": {}}
+        for scale in scales:
+            sheet_tiles = [(tiles[tile_key(digests[icons[icon][0]], size, scale)], x, y, *size)
+                           for icon, size, (_, x, y) in members]
+            key = hashlib.sha256(json.dumps([ATLAS_VERSION, sheet_size, scale, sheet_tiles]).encode()).hexdigest()
+            digest = sheet_cache.get(key)
+            if force or digest is None or not store.has(digest):
+                digest = store.put(compose_sheet(store, sheet_size, sheet_tiles, scale))
+                sheet_cache[key] = digest
+            else:
+                build_metrics.cache_hit()
+            image = sheet_name(name, n, len(sheet_sizes), scale)
+            if scale != 1:
+                entry["scales"][f"{scale:g}"] = image
+            dest = os.path.join(out_dir, image)
+            outputs[dest] = store.materialize(digest, dest)
+            build_metrics.output_file(dest)
+        atlas_map["sheets"].append(entry)
+        for icon, (w, h), (_, x, y) in members:
+            atlas_map["icons"][icon] = {"sheet": n, "x": x, "y": y, "w": w, "h": h}
+    atlas_map["icons"] = {icon: atlas_map["icons"][icon] for icon in names}
+
+    map_path = os.path.join(out_dir, f"{name}.json")
+    outputs[map_path] = store.publish((json.dumps(atlas_map, indent=2) + "\n").encode(), map_path)[0]
+    css_path = os.path.join(out_dir, f"{name}.css")
+    outputs[css_path] = store.publish(atlas_css(spec.get("class", name), atlas_map).encode(), css_path)[0]
+    return outputs, len(jobs)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main
+# ═══════════════════════════════════════════════════════════════
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == ATLAS_VERSION else {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build sprite atlases for the web icons.")
+    parser.add_argument("atlases", nargs="*", help="atlas names from the manifest (default: all)")
+    parser.add_argument("--manifest", default=MANIFEST, help="atlas manifest JSON")
+    parser.add_argument("--force", action="store_true", help="ignore the tile and sheet caches")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    unknown = [a for a in args.atlases if a not in manifest["atlases"]]
+    if unknown:
+        parser.error(f"unknown atlas(es): {', '.join(unknown)}")
+
+    cache = load_cache()
+    cache["version"] = ATLAS_VERSION
+    index = SourceIndex(cache.setdefault("sources", {}))
+    store = OutputStore()
+
+    print("🧩 Building sprite atlases...\n")
+    for name in args.atlases or list(manifest["atlases"]):
+        spec = manifest["atlases"][name]
+        with build_metrics.asset(name):
+            outputs, rendered = build_atlas(name, spec, store, index, cache, args.force)
+        changed = sum(how != "unchanged" for how in outputs.values())
+        print(f"  ✅ {name}: {len(atlas_icons(spec))} icons, {rendered} tiles rendered, "
+              f"{changed}/{len(outputs)} files written → {spec['out']}")
+
+    atomic_write(CACHE_PATH, (json.dumps(cache) + "\n").encode())
+    print(f"\n  📦 {store.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build_metrics.run_script("sprite_atlas", main))
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+In-process rasterizer for the small SVG subset our icons use:
+rounded <rect>, <circle> with fill/stroke/opacity, <linearGradient> fills
+and anchored <text>. Parsing is cached per document and every size renders
+in the same process with supersampled anti-aliasing, so icon builds need
+neither macOS `sips` nor a subprocess per size.
+"""
+
+from functools import lru_cache
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+SUPERSAMPLE = 4
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+FONT_DIRS = [
+    "/System/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+    "/Library/Fonts",
+    os.path.expanduser("~/Library/Fonts"),
+    "/usr/share/fonts/truetype",
+    "/usr/share/fonts",
+    os.path.expanduser("~/.fonts"),
+]
+
+# File names tried for each CSS family, bold first when weight >= 600
+FONT_FILES = {
+    "inter": (["Inter-ExtraBold.ttf", "Inter-Bold.ttf", "Inter-Bold.otf"], ["Inter-Regular.ttf", "Inter-Regular.otf"]),
+    "arial": (["Arial Bold.ttf", "Arial-BoldMT.ttf", "arialbd.ttf"], ["Arial.ttf", "arial.ttf"]),
+    "helvetica": (["Helvetica.ttc"], ["Helvetica.ttc"]),
+    "sans-serif": (["DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf"], ["DejaVuSans.ttf", "LiberationSans-Regular.ttf"]),
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# Parsing
+# ═══════════════════════════════════════════════════════════════
+def _tag(el):
+    return el.tag[len(SVG_NS):] if el.tag.startswith(SVG_NS) else el.tag
+
+
+def _style(el):
+    """Attributes merged with inline style declarations (style wins)."""
+    attrs = dict(el.attrib)
+    for decl in attrs.pop("style", "").split(";"):
+        if ":" in decl:
+            k, v = decl.split(":", 1)
+            attrs[k.strip()] = v.strip()
+    return attrs
+
+
+def _num(value, default=0.0):
+    if value is None:
+        return default
+    value = value.strip()
+    if value.endswith("%"):
+        return float(value[:-1]) / 100.0
+    return float(re.sub(r"px$", "", value))
+
+
+def _color(value, opacity=1.0):
+    r, g, b = ImageColor.getrgb(value)[:3]
+    return (r, g, b, opacity)
+
+
+def _paint(value, gradients):
+    """None, an RGBA tuple (alpha 0..1), or a gradient dict."""
+    if value is None or value == "none":
+        return None
+    m = re.match(r"url\(#([^)]+)\)", value)
+    if m:
+        return gradients[m.group(1)]
+    return _color(value)
+
+
+@lru_cache(maxsize=32)
+def parse_svg(text):
+    """Parse an SVG document into a size-independent display list."""
+    root = ET.fromstring(text)
+    vb = [float(v) for v in re.split(r"[\s,]+", root.get("viewBox", "").strip()) if v]
+    if len(vb) != 4:
+        vb = [0, 0, _num(root.get("width"), 100), _num(root.get("height"), 100)]
+
+    gradients = {}
+    for grad in root.iter(SVG_NS + "linearGradient"):
+        stops = []
+        for stop in grad.iter(SVG_NS + "stop"):
+            st = _style(stop)
+            color = _color(st.get("stop-color", "#000"), _num(st.get("stop-opacity"), 1.0))
+            stops.append((_num(st.get("offset"), 0.0), color))
+        gradients[grad.get("id")] = {
+            "x1": _num(grad.get("x1"), 0.0), "y1": _num(grad.get("y1"), 0.0),
+            "x2": _num(grad.get("x2"), 1.0), "y2": _num(grad.get("y2"), 0.0),
+            "stops": stops,
+        }
+
+    items = []
+    for el in root.iter():
+        kind = _tag(el)
+        if kind not in ("rect", "circle", "text"):
+            continue
+        st = _style(el)
+        item = {
+            "kind": kind,
+            "fill": _paint(st.get("fill", "#000"), gradients),
+            "stroke": _paint(st.get("stroke"), gradients),
+            "stroke_width": _num(st.get("stroke-width"), 1.0),
+            "opacity": _num(st.get("opacity"), 1.0) * _num(st.get("fill-opacity"), 1.0),
+        }
+        if kind == "rect":
+            rx = st.get("rx", st.get("ry"))
+            item.update(x=_num(st.get("x")), y=_num(st.get("y")),
+                        w=_num(st.get("width")), h=_num(st.get("height")), rx=_num(rx))
+        elif kind == "circle":
+            item.update(cx=_num(st.get("cx")), cy=_num(st.get("cy")), r=_num(st.get("r")))
+        else:
+            weight = st.get("font-weight", "400")
+            item.update(x=_num(st.get("x")), y=_num(st.get("y")), text=(el.text or "").strip(),
+                        families=[f.strip().strip("'\"").lower() for f in st.get("font-family", "sans-serif").split(",")],
+                        size=_num(st.get("font-size"), 16.0),
+                        bold=weight == "bold" or (weight.isdigit() and int(weight) >= 600),
+                        anchor=st.get("text-anchor", "start"))
+        items.append(item)
+    return {"viewbox": tuple(vb), "items": items}
+
+
+# ═══════════════════════════════════════════════════════════════
+# Rendering
+# ═══════════════════════════════════════════════════════════════
+@lru_cache(maxsize=64)
+def _font(families, bold, size):
+    for family in families:
+        bold_files, regular_files = FONT_FILES.get(family, ([], []))
+        for name in (bold_files if bold else regular_files):
+            for d in FONT_DIRS:
+                path = os.path.join(d, name)
+                if os.path.exists(path):
+                    return ImageFont.truetype(path, size)
+            try:
+                return ImageFont.truetype(name, size)  # Pillow's own search path
+            except OSError:
+                continue
+    return ImageFont.load_default(size)
+
+
+def _gradient_layer(grad, bbox, shape):
+    """RGBA float array of a gradient in objectBoundingBox units."""
+    h, w = shape
+    x0, y0, x1, y1 = bbox
+    u = (np.arange(w) + 0.5 - x0) / max(x1 - x0, 1e-6)
+    v = (np.arange(h) + 0.5 - y0) / max(y1 - y0, 1e-6)
+    dx, dy = grad["x2"] - grad["x1"], grad["y2"] - grad["y1"]
+    t = ((u[None, :] - grad["x1"]) * dx + (v[:, None] - grad["y1"]) * dy) / max(dx * dx + dy * dy, 1e-12)
+    t = np.clip(t, 0.0, 1.0)
+    offsets = [s[0] for s in grad["stops"]]
+    out = np.empty((h, w, 4), dtype=np.float32)
+    for c in range(4):
+        channel = [s[1][c] / (255.0 if c < 3 else 1.0) for s in grad["stops"]]
+        out[..., c] = np.interp(t, offsets, channel)
+    return out
+
+
+def _paint_layer(paint, coverage, bbox):
+    """Premultiplied RGBA float layer for a coverage mask and a paint."""
+    cov = coverage.astype(np.float32) / 255.0
+    if isinstance(paint, dict):
+        color = _gradient_layer(paint, bbox, cov.shape)
+    else:
+        color = np.empty(cov.shape + (4,), dtype=np.float32)
+        color[...] = [paint[0] / 255.0, paint[1] / 255.0, paint[2] / 255.0, paint[3]]
+    alpha = color[..., 3] * cov
+    return np.dstack([color[..., :3] * alpha[..., None], alpha])
+
+
+def _composite(dst, layer, opacity):
+    """Source-over onto a premultiplied float canvas, in place."""
+    layer = layer * opacity
+    dst *= 1.0 - layer[..., 3:4]
+    dst += layer
+
+
+def render(doc, width, height=None, supersample=SUPERSAMPLE):
+    """Rasterize a parsed document to an RGBA image of the given size."""
+    if isinstance(doc, str):
+        doc = parse_svg(doc)
+    height = height or width
+    vx, vy, vw, vh = doc["viewbox"]
+    W, H = width * supersample, height * supersample
+    sx, sy = W / vw, H / vh
+    canvas = np.zeros((H, W, 4), dtype=np.float32)
+
+    def mask():
+        m = Image.new("L", (W, H), 0)
+        return m, ImageDraw.Draw(m)
+
+    for item in doc["items"]:
+        kind = item["kind"]
+        if kind == "rect":
+            box = ((item["x"] - vx) * sx, (item["y"] - vy) * sy,
+                   (item["x"] + item["w"] - vx) * sx, (item["y"] + item["h"] - vy) * sy)
+            if item["fill"] is not None:
+                m, d = mask()
+                d.rounded_rectangle([box[0], box[1], box[2] - 1, box[3] - 1], radius=item["rx"] * sx, fill=255)
+                _composite(canvas, _paint_layer(item["fill"], np.asarray(m), box), item["opacity"])
+        elif kind == "circle":
+            cx, cy, r = (item["cx"] - vx) * sx, (item["cy"] - vy) * sy, item["r"] * sx
+            box = (cx - r, cy - r, cx + r, cy + r)
+            if item["fill"] is not None:
+                m, d = mask()
+                d.ellipse([box[0], box[1], box[2] - 1, box[3] - 1], fill=255)
+                _composite(canvas, _paint_layer(item["fill"], np.asarray(m), box), item["opacity"])
+            if item["stroke"] is not None:
+                # The stroke straddles the outline: half inside, half outside
+                sw = item["stroke_width"] * sx
+                outer = (cx - r - sw / 2, cy - r - sw / 2, cx + r + sw / 2, cy + r + sw / 2)
+                m, d = mask()
+                d.ellipse([outer[0], outer[1], outer[2] - 1, outer[3] - 1], outline=255, width=max(1, round(sw)))
+                _composite(canvas, _paint_layer(item["stroke"], np.asarray(m), outer), item["opacity"])
+        elif item["text"] and item["fill"] is not None:
+            font = _font(tuple(item["families"]), item["bold"], max(1, round(item["size"] * sy)))
+            anchor = {"start": "ls", "middle": "ms", "end": "rs"}[item["anchor"]]
+            xy = ((item["x"] - vx) * sx, (item["y"] - vy) * sy)
+            m, d = mask()
+            d.text(xy, item["text"], fill=255, font=font, anchor=anchor)
+            box = d.textbbox(xy, item["text"], font=font, anchor=anchor)
+            _composite(canvas, _paint_layer(item["fill"], np.asarray(m), box), item["opacity"])
+
+    # Box-filter the premultiplied supersampled canvas down to the target
+    rgba = canvas.reshape(height, supersample, width, supersample, 4).mean(axis=(1, 3))
+    alpha = rgba[..., 3:4]
+    rgb = np.where(alpha > 0, rgba[..., :3] / np.maximum(alpha, 1e-6), 0.0)
+    out = np.dstack([rgb, alpha])
+    return Image.fromarray((np.clip(out, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8))
+
+
+class SvgSource:
+    """
+    An SVG icon exposing the same get/get_many interface as ResizePyramid,
+    so SVG sources can feed the icon pipeline. Each size is rasterized
+    directly (sharper than downscaling one big raster) and cached.
+    """
+
+    def __init__(self, path_or_text):
+        if path_or_text.lstrip().startswith("<"):
+            text = path_or_text
+        else:
+            with open(path_or_text, encoding="utf-8") as f:
+                text = f.read()
+        self.doc = parse_svg(text)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return tuple(int(v) for v in self.doc["viewbox"][2:])
+
+    def get(self, size):
+        size = (size, size) if isinstance(size, int) else tuple(size)
+        img = self._cache.get(size)
+        if img is None:
+            img = render(self.doc, *size)
+            with self._lock:
+                self._cache[size] = img
+        return img
+
+    def get_many(self, sizes):
+        return {s: self.get(s) for s in dict.fromkeys(
+            (s, s) if isinstance(s, int) else tuple(s) for s in sizes)}
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Text layout for the banners and store screenshots: word wrapping,
+shrink-to-fit and ellipsis inside a box, on top of a measured-metrics
+cache.
+
+FontMetrics memoizes, per (font file, size), every glyph advance and
+kerning pair it has measured. With Pillow's basic layout a string's
+advance is exactly the sum of its glyph advances and pair kernings, so
+after warm-up a measurement is dictionary lookups: fitting a line at five
+sizes, or laying out thousands of strings for a batch, never goes back
+to FreeType for a glyph it has seen. Fonts shaped by raqm (ligatures,
+contextual forms) and fallback chains (font_coverage.ChainFont, whose
+runs depend on context) are measured per string instead, still memoized.
+
+    block = fit_text("Multi-chain: BSC, Ethereum, Polygon", fonts, 320, max_lines=1)
+    draw_block(draw, (80, 290), block, fill=GRAY)
+"""
+
+from collections import namedtuple
+from PIL import ImageFont
+
+ELLIPSIS = "…"
+
+# Trailing punctuation dropped before an ellipsis ("Fees," -> "Fees…")
+_TRIM = " ,.;:—-"
+
+TextBlock = namedtuple("TextBlock", "font lines line_height width height truncated")
+
+
+# ═══════════════════════════════════════════════════════════════
+# Metrics cache
+# ═══════════════════════════════════════════════════════════════
+def _font_key(font):
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        return path, font.size, getattr(font, "index", 0), getattr(font, "layout_engine", None)
+    return id(font), getattr(font, "size", None)  # fonts loaded from bytes
+
+
+class FontMetrics:
+    """Memoized advances, kerning, bboxes and vertical metrics of one font."""
+
+    def __init__(self, font):
+        self.font = font
+        self._advance = {}
+        self._kern = {}
+        self._bbox = {}
+        self._strings = {}
+        self._pairwise = (getattr(font, "layout_engine", None) != ImageFont.Layout.RAQM
+                          and not hasattr(font, "layout_runs"))
+        if hasattr(font, "getmetrics"):
+            self.ascent, self.descent = font.getmetrics()
+        else:  # bitmap fonts
+            _, _, _, bottom = font.getbbox("Ay")
+            self.ascent, self.descent = bottom, 0
+
+    def advance(self, ch):
+        adv = self._advance.get(ch)
+        if adv is None:
+            adv = self._advance[ch] = self.font.getlength(ch)
+        return adv
+
+    def kern(self, a, b):
+        k = self._kern.get((a, b))
+        if k is None:
+            k = self._kern[(a, b)] = self.font.getlength(a + b) - self.advance(a) - self.advance(b)
+        return k
+
+    def width(self, text):
+        """Advance width of text, as font.getlength(text) returns it."""
+        w = self._strings.get(text)
+        if w is None:
+            if not self._pairwise:
+                w = self.font.getlength(text)
+            else:
+                w = sum(map(self.advance, text))
+                w += sum(self.kern(a, b) for a, b in zip(text, text[1:]))
+            self._strings[text] = w
+        return w
+
+    def extend(self, w, text, more):
+        """width(text + more) given w = width(text), from the cached width of more."""
+        if not text or not more or not self._pairwise:
+            return self.width(text + more)
+        return w + self.kern(text[-1], more[0]) + self.width(more)
+
+    def bbox(self, text):
+        box = self._bbox.get(text)
+        if box is None:
+            box = self._bbox[text] = self.font.getbbox(text)
+        return box
+
+    @property
+    def line_height(self):
+        return self.ascent + self.descent
+
+
+_metrics = {}
+
+
+def metrics(font):
+    """The shared FontMetrics of a font (one per font file and size)."""
+    key = _font_key(font)
+    m = _metrics.get(key)
+    if m is None:
+        m = _metrics[key] = FontMetrics(font)
+    return m
+
+
+def clear_cache():
+    _metrics.clear()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Layout
+# ═══════════════════════════════════════════════════════════════
+def ellipsize(text, font, width):
+    """text, or its longest prefix ending in an ellipsis, that fits in width."""
+    m = metrics(font)
+    if m.width(text) <= width:
+        return text
+    # The most whole words that fit with the ellipsis, else the most
+    # characters of the first word
+    tokens = text.split(" ")
+    fit, w = None, m.width(tokens[0])
+    prefix = tokens[0]
+    for token in tokens[1:] + [None]:
+        if m.extend(w, prefix, ELLIPSIS) > width:
+            break
+        fit = prefix
+        if token is None:
+            break
+        w = m.extend(w, prefix, " " + token)
+        prefix += " " + token
+    if fit is None:
+        fit = tokens[0]
+        while fit and m.width(fit + ELLIPSIS) > width:
+            fit = fit[:-1]
+    return fit.rstrip(_TRIM) + ELLIPSIS
+
+
+def wrap(text, font, width, max_lines=None, ellipsis=True):
+    """
+    Greedy word wrap; returns (lines, truncated). Words wider than the box
+    are broken between characters. When max_lines cuts the text, the last
+    line ends in an ellipsis (or just stops, with ellipsis=False).
+    """
+    m = metrics(font)
+    words = text.split()
+    lines = []
+    i = 0
+    while i < len(words) and (max_lines is None or len(lines) < max_lines):
+        line, i = words[i], i + 1
+        while m.width(line) > width and len(line) > 1:
+            # Break an over-long word at the widest prefix that fits
+            cut = len(line) - 1
+            while cut > 1 and m.width(line[:cut]) > width:
+                cut -= 1
+            words.insert(i, line[cut:])
+            line = line[:cut]
+        w = m.width(line)
+        while i < len(words):
+            nw = m.extend(w, line, " " + words[i])
+            if nw > width:
+                break
+            line, w = line + " " + words[i], nw
+            i += 1
+        lines.append(line)
+    truncated = i < len(words)
+    if truncated and ellipsis:
+        lines[-1] = ellipsize(lines[-1] + " " + " ".join(words[i:]), font, width)
+    return lines, truncated
+
+
+def _line_height(font, line_spacing):
+    size = getattr(font, "size", None)
+    return round(size * line_spacing) if line_spacing and size else metrics(font).line_height
+
+
+def _block(font, lines, truncated, line_spacing):
+    m = metrics(font)
+    line_height = _line_height(font, line_spacing)
+    width = max((m.width(line) for line in lines), default=0)
+    return TextBlock(font, lines, line_height, width, line_height * len(lines), truncated)
+
+
+def fit_text(text, fonts, width, height=None, max_lines=None, line_spacing=1.15, ellipsis=True):
+    """
+    Lay text out in a width x height box: the first of fonts (largest
+    first) at which it wraps into the box without being cut, else the last
+    font with the overflow ellipsized. height (optional) caps the line
+    count at height // line_height; max_lines caps it directly.
+    """
+    if not isinstance(fonts, (list, tuple)):
+        fonts = [fonts]
+    for n, font in enumerate(fonts):
+        line_height = _line_height(font, line_spacing)
+        limit = max_lines
+        if height is not None:
+            limit = max(1, min(limit or height, height // line_height))
+        lines, truncated = wrap(text, font, width, limit, ellipsis)
+        if not truncated or n == len(fonts) - 1:
+            return _block(font, lines, truncated, line_spacing)
+
+
+def fit_line(text, fonts, width, ellipsis=True):
+    """fit_text for a single line."""
+    return fit_text(text, fonts, width, max_lines=1, ellipsis=ellipsis)
+
+
+def fit_lines(lines, fonts, width):
+    """The first of fonts at which every line fits in width, else the last."""
+    if not isinstance(fonts, (list, tuple)):
+        return fonts
+    for font in fonts:
+        m = metrics(font)
+        if all(m.width(line) <= width for line in lines):
+            return font
+    return fonts[-1]
+
+
+def draw_block(draw, xy, block, fill, anchor=None, spacing=None):
+    """
+    Draw a TextBlock line by line from xy, every line with the same
+    anchor (e.g. "mt" to centre lines on x); returns the y after it.
+    """
+    x, y = xy
+    step = block.line_height if spacing is None else spacing
+    for line in block.lines:
+        draw.text((x, y), line, fill=fill, font=block.font, anchor=anchor)
+        y += step
+    return y